@@ -0,0 +1,56 @@
+"""
+Throughput benchmark for TextChunker
+
+Chunks synthetic multi-MB texts (built from the saved scraped content)
+and reports MB/s per size; roughly constant MB/s means linear time.
+
+Usage: python benchmarks/bench_chunker.py [sizes in MB...]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from text_chunker import TextChunker  # noqa: E402
+from token_counter import is_exact  # noqa: E402
+
+SCRAPED_DIR = Path(__file__).parent.parent / "src" / "scraped_content"
+DEFAULT_SIZES = [1, 2, 4, 8]
+SAMPLE_PARAGRAPH = (
+    "The Prophet (peace be upon him) said: 'The best of you are those who learn the Quran "
+    "and teach it.' Allah says: 'Indeed, prayer prohibits immorality and wrongdoing' (29:45). "
+    "Scholars explain that consistency in small deeds is beloved to Allah. "
+    "إِنَّ اللَّهَ مَعَ الصَّابِرِينَ ﴿١٥٣﴾ "
+)
+
+
+def build_text(megabytes):
+    """Repeat the saved scraped content (plus a sample paragraph) to the requested size"""
+    paragraphs = [SAMPLE_PARAGRAPH]
+    for path in sorted(SCRAPED_DIR.glob("*.txt")):
+        paragraphs.extend(p for p in path.read_text(encoding='utf-8', errors='ignore').split("\n\n") if p.strip())
+    base = "\n\n".join(paragraphs) + "\n\n"
+    target = megabytes * 1024 * 1024
+    return (base * (target // len(base) + 1))[:target]
+
+
+def main():
+    """Time chunking at each size and print a table"""
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    chunker = TextChunker(max_tokens=2000, overlap_tokens=100)
+    tokenizer = "tiktoken o200k_base" if is_exact() else "estimate (tiktoken not available)"
+    print(f"Tokenizer: {tokenizer}")
+    print(f"{'size':>6} | {'chunks':>7} | {'seconds':>8} | {'MB/s':>6}")
+    print("-" * 38)
+    for megabytes in sizes:
+        text = build_text(megabytes)
+        start = time.perf_counter()
+        count = sum(1 for _ in chunker.chunks(text))
+        elapsed = time.perf_counter() - start
+        print(f"{megabytes:>4}MB | {count:>7} | {elapsed:>8.2f} | {megabytes / elapsed:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
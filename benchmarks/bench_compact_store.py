@@ -0,0 +1,92 @@
+"""
+Memory benchmark: list-of-dicts vs CompactExampleStore
+
+Each measurement runs in a fresh subprocess and reports the Python heap
+held by the built representation (tracemalloc). The list-of-dicts
+baseline mirrors DataManager before the compact store: one decoded dict
+per JSONL line, each with its own copy of the system prompt.
+
+Usage: python benchmarks/bench_compact_store.py [sizes...]
+"""
+
+import subprocess
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from compact_store import CompactExampleStore  # noqa: E402
+
+SYSTEM_PROMPT = "You are an Islamic scholar assistant specializing in Quran and the 6 Sahih Hadith collections (Bukhari, Muslim, Abu Dawood, Tirmidhi, Nasa'i, Ibn Majah). Always provide exact verse/hadith references. For non-Islamic questions, politely indicate you can search for general information."
+CATEGORIES = ["Prayer", "Charity", "Character", "Pillars of Islam", "Family Relations",
+              "Quran Recitation", "Religious Practices", "Hajj Rituals", "Knowledge", "Ethics"]
+SOURCES = ["Quran", "Sahih al-Bukhari", "Sahih Muslim", "Sunan Abu Dawood",
+           "Jami` at-Tirmidhi", "Sunan an-Nasa'i", "Sunan Ibn Majah"]
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+def _fresh(text):
+    """Return an equal but distinct string object (as json.loads would)"""
+    return (text + " ")[:-1]
+
+
+def generate_examples(count):
+    """Yield synthetic examples shaped like DataManager.create_training_example"""
+    for i in range(count):
+        category = CATEGORIES[i % len(CATEGORIES)]
+        source = SOURCES[i % len(SOURCES)]
+        reference = f"{i % 114 + 1}:{i % 286 + 1}" if source == "Quran" else str(i % 7563 + 1)
+        question = f"What guidance is given about {category.lower()} in teaching number {i}?"
+        answer = (f"Teaching {i} explains that {category.lower()} is an essential part of a "
+                  f"believer's life. Scholars have described its conditions, its virtues and "
+                  f"its etiquette in detail, and the narration encourages consistency and "
+                  f"sincerity in practice (example {i * 7919 % 100003}).")
+        yield {
+            "messages": [
+                {"role": "system", "content": _fresh(SYSTEM_PROMPT)},
+                {"role": "user", "content": question},
+                {"role": "assistant", "content": f"{answer}\n\n**Reference:** {_fresh(source)} {reference}"},
+            ],
+            "category": _fresh(category),
+            "created_at": f"2025-06-{i % 28 + 1:02d}T{i % 24:02d}:{i % 60:02d}:{i % 60:02d}.{i % 1000000:06d}",
+        }
+
+
+def measure(kind, count):
+    """Build one representation and return the bytes it holds"""
+    tracemalloc.start()
+    if kind == "dicts":
+        data = list(generate_examples(count))
+    else:
+        data = CompactExampleStore.from_examples(generate_examples(count))
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(data) == count
+    return current
+
+
+def main():
+    """Run each configuration in its own process and print a table"""
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        print(measure(sys.argv[2], int(sys.argv[3])))
+        return
+
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    print(f"{'examples':>10} | {'list-of-dicts':>14} | {'compact store':>14} | {'ratio':>6}")
+    print("-" * 56)
+    for count in sizes:
+        results = {}
+        for kind in ("dicts", "compact"):
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", kind, str(count)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            results[kind] = int(output)
+        ratio = results["dicts"] / results["compact"]
+        print(f"{count:>10,} | {results['dicts'] / 2**20:>11.1f} MB | "
+              f"{results['compact'] / 2**20:>11.1f} MB | {ratio:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Throughput and memory benchmark for the streaming training data validator
+
+Writes a synthetic chat-format JSONL file (one bad line in a hundred),
+then validates it in a child process with data_validator.validate_file
+and, for comparison, the way DataManager.validate_data_format used to:
+every example decoded into a list first, then checked one at a time.
+Reports examples per second and each child's peak resident memory.
+
+Usage: python benchmarks/bench_data_validator.py [examples] [workers]
+"""
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+from data_manager import SYSTEM_PROMPT  # noqa: E402
+
+
+def write_corpus(path, count):
+    """Synthetic training file with a mix of issues"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            example = {"messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": f"What does hadith {i} teach about patience and prayer?"},
+                {"role": "assistant", "content": f"Hadith {i} teaches steadfastness in prayer. " * 8},
+            ], "category": "Hadith"}
+            if i % 100 == 50:
+                example["messages"][2]["content"] = " "
+            f.write(json.dumps(example) + "\n")
+
+
+def load_all(path):
+    """Old approach: decode everything, then check each example"""
+    examples = [json.loads(line) for line in open(path, encoding='utf-8') if line.strip()]
+    valid = 0
+    for example in examples:
+        roles = [m['role'] for m in example['messages']]
+        if roles == ['system', 'user', 'assistant'] and all(m['content'].strip() for m in example['messages']):
+            valid += 1
+    return valid
+
+
+def streaming(path, workers):
+    """New approach"""
+    from data_validator import validate_file
+    return validate_file(path, workers=workers)['valid']
+
+
+def child(mode, path, workers):
+    """Run one approach and print valid count, seconds and peak RSS (MB)"""
+    started = time.perf_counter()
+    valid = load_all(path) if mode == 'load' else streaming(path, workers)
+    seconds = time.perf_counter() - started
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) / 1024
+    print(json.dumps([valid, seconds, peak]))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "train.jsonl"
+        write_corpus(path, count)
+        size_mb = path.stat().st_size / 2 ** 20
+        print(f"{count:,} examples, {size_mb:.0f} MB")
+        print(f"{'approach':>22} | {'valid':>8} | {'seconds':>7} | {'examples/s':>10} | {'peak MB':>7}")
+        print("-" * 68)
+        runs = [('load', 'load all + loop', 1), ('stream', 'streaming, 1 worker', 1)]
+        if workers > 1:
+            runs.append(('stream', f'streaming, {workers} workers', workers))
+        for mode, label, n in runs:
+            output = subprocess.run([sys.executable, __file__, '--child', mode, str(path), str(n)],
+                                    capture_output=True, text=True, check=True).stdout
+            valid, seconds, peak = json.loads(output.strip().splitlines()[-1])
+            print(f"{label:>22} | {valid:>8,} | {seconds:>7.1f} | {count / seconds:>10,.0f} | {peak:>7.0f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        child(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+    else:
+        main()
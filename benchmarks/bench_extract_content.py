@@ -0,0 +1,93 @@
+"""
+Benchmark for WebScraper.extract_content extraction modes
+
+Compares 'elements' (get_text() on every p/div/span/... element, the
+previous behaviour) with 'blocks' (one walk, each text node under its
+nearest block ancestor) on the saved HTML fixtures in tests/fixtures/html
+and on synthetic pages of growing nesting depth. Recall is the share of
+distinct words of the page's visible body text present in the output.
+
+Usage: python benchmarks/bench_extract_content.py
+"""
+
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from bs4 import BeautifulSoup  # noqa: E402
+from llm_cache import LLMCache  # noqa: E402
+from http_cache import HTTPCache  # noqa: E402
+from web_scraper import WebScraper  # noqa: E402
+
+FIXTURES_DIR = Path(__file__).parent.parent / "tests" / "fixtures" / "html"
+DEPTHS = [25, 50, 100, 200]
+REPEAT = 20
+UNWANTED = ['script', 'style', 'noscript', 'nav', 'header', 'footer', 'aside']
+_WORD_RE = re.compile(r"\w+")
+
+
+def words(text):
+    """Distinct lower-cased words of a text"""
+    return set(_WORD_RE.findall(text.lower()))
+
+
+def visible_words(html):
+    """Distinct words of the body text with the same elements removed as extract_content"""
+    soup = BeautifulSoup(html, 'lxml')
+    for element in soup(UNWANTED):
+        element.decompose()
+    body = soup.find('body') or soup
+    return words(body.get_text(" "))
+
+
+def nested_page(depth):
+    """A page with `depth` nested divs, each holding a sentence"""
+    opening = "".join(f"<div><p>Sentence number {i} explains a ruling about prayer and fasting.</p>" for i in range(depth))
+    return f"<html><head><title>Nested</title></head><body>{opening}{'</div>' * depth}</body></html>"
+
+
+def run(scraper, mode, html):
+    """Return (output, seconds per call) for one mode, parsing outside the timer"""
+    scraper.extraction_mode = mode
+    elapsed = 0.0
+    for _ in range(REPEAT):
+        soup = BeautifulSoup(html, 'lxml')
+        start = time.perf_counter()
+        output = scraper.extract_content(soup, "http://example.com/")
+        elapsed += time.perf_counter() - start
+    return output, elapsed / REPEAT
+
+
+def main():
+    """Print fixture and depth-scaling tables"""
+    with tempfile.TemporaryDirectory() as tmp:
+        scraper = WebScraper(llm_cache=LLMCache(Path(tmp) / "llm.sqlite"),
+                             http_cache=HTTPCache(Path(tmp) / "http.sqlite"))
+
+        print(f"{'fixture':<22} | {'mode':<8} | {'ms':>7} | {'chars':>6} | {'recall':>6}")
+        print("-" * 62)
+        for path in sorted(FIXTURES_DIR.glob("*.html")):
+            html = path.read_text(encoding='utf-8')
+            reference = visible_words(html)
+            for mode in ('elements', 'blocks'):
+                output, seconds = run(scraper, mode, html)
+                recall = len(words(output) & reference) / len(reference)
+                print(f"{path.stem:<22} | {mode:<8} | {seconds * 1000:>7.2f} | {len(output):>6} | {recall:>6.1%}")
+
+        print()
+        print(f"{'depth':>5} | {'elements ms':>11} | {'chars':>7} | {'blocks ms':>9} | {'chars':>6}")
+        print("-" * 52)
+        for depth in DEPTHS:
+            html = nested_page(depth)
+            legacy, legacy_seconds = run(scraper, 'elements', html)
+            blocks, blocks_seconds = run(scraper, 'blocks', html)
+            print(f"{depth:>5} | {legacy_seconds * 1000:>11.2f} | {len(legacy):>7} | "
+                  f"{blocks_seconds * 1000:>9.2f} | {len(blocks):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark for the streaming lxml parse path on large pages
+
+Compares the BeautifulSoup path (build the tree, decompose unwanted
+elements, 'blocks' extraction, collect links) with
+WebScraper.extract_content_stream on synthetic fatwa-archive pages of
+growing size. Peak memory is the Python heap measured by tracemalloc.
+
+Usage: python benchmarks/bench_html_stream.py
+"""
+
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from llm_cache import LLMCache  # noqa: E402
+from http_cache import HTTPCache  # noqa: E402
+from web_scraper import WebScraper  # noqa: E402
+
+SIZES_MB = [1, 4, 16]
+ENTRY = (
+    "<article class='fatwa'><h2>Question {i}</h2>"
+    "<p>Is it permissible to combine <b>Zuhr</b> and <b>Asr</b> while travelling? "
+    "<a href='/fatwa/{i}'>Read the full answer</a></p>"
+    "<div class='answer'><p>Praise be to Allah. The Prophet (peace be upon him) combined prayers "
+    "on journeys, as narrated in Sahih al-Bukhari and Sahih Muslim.</p>"
+    "<script>track({i});</script><aside>Related questions and adverts</aside></div></article>\n"
+)
+
+
+def archive_page(megabytes):
+    """A fatwa archive page of roughly the requested size"""
+    head = ("<html><head><title>Fatwa archive</title><style>p {}</style></head><body>"
+            "<header><nav><a href='/'>Home</a></nav></header><main>")
+    entries = []
+    size = len(head)
+    i = 0
+    while size < megabytes * 1024 * 1024:
+        entry = ENTRY.format(i=i)
+        entries.append(entry)
+        size += len(entry)
+        i += 1
+    return (head + "".join(entries) + "</main><footer>Copyright</footer></body></html>").encode('utf-8')
+
+
+def tree_path(scraper, body):
+    """Previous path: BeautifulSoup tree, decompose, then extraction and links"""
+    soup = scraper._parse_html(body)
+    content = scraper.extract_content(soup, "http://example.com/")
+    return content, [link['href'] for link in soup.find_all('a', href=True)[:20]]
+
+
+def measure(func, *args):
+    """Return (result, seconds, peak MB of Python allocations)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / 1024 / 1024
+
+
+def main():
+    """Print time and peak memory per page size for both paths"""
+    with tempfile.TemporaryDirectory() as tmp:
+        scraper = WebScraper(llm_cache=LLMCache(Path(tmp) / "llm.sqlite"),
+                             http_cache=HTTPCache(Path(tmp) / "http.sqlite"))
+
+        print(f"{'page MB':>7} | {'tree s':>7} | {'tree peak MB':>12} | {'stream s':>8} | {'stream peak MB':>14} | same")
+        print("-" * 72)
+        for megabytes in SIZES_MB:
+            body = archive_page(megabytes)
+            tree, tree_seconds, tree_peak = measure(tree_path, scraper, body)
+            stream, stream_seconds, stream_peak = measure(scraper.extract_content_stream, body)
+            print(f"{megabytes:>7} | {tree_seconds:>7.2f} | {tree_peak:>12.1f} | "
+                  f"{stream_seconds:>8.2f} | {stream_peak:>14.1f} | {tree == stream}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Throughput benchmark for Islamic content detection
+
+Compares the previous WebScraper.detect_islamic_content (one str.count per
+keyword plus separate re.findall passes) with islamic_detector on the
+same multi-MB text, as one string and fed in 64 KB chunks.
+
+Usage: python benchmarks/bench_islamic_detector.py [size in MB]
+"""
+
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from islamic_detector import detect_islamic_content  # noqa: E402
+
+SCRAPED_DIR = Path(__file__).parent.parent / "src" / "scraped_content"
+SAMPLE_PARAGRAPH = (
+    "The Prophet (peace be upon him) said: 'The best of you are those who learn the Quran "
+    "and teach it.' Allah says: 'Indeed, prayer prohibits immorality and wrongdoing' (29:45). "
+    "This is narrated in Sahih al-Bukhari and Sunan Abu Dawood. Muslims recite Surah Al-Fatiha "
+    "in every prayer, and Islamic scholars explain its meaning in chapter 1 of their books. "
+)
+CHUNK_SIZE = 64 * 1024
+
+
+def legacy_detect_islamic_content(text):
+    """The previous implementation, kept verbatim for comparison"""
+    islamic_keywords = [
+        'allah', 'muhammad', 'quran', 'qur\'an', 'hadith', 'hadis', 'sunnah',
+        'islam', 'muslim', 'islamic', 'prophet', 'messenger',
+        'salah', 'prayer', 'zakat', 'charity', 'hajj', 'pilgrimage', 'sawm', 'fasting',
+        'shahada', 'faith', 'iman', 'tawhid', 'shirk',
+        'bukhari', 'muslim', 'abu dawood', 'tirmidhi', 'nasa\'i', 'ibn majah',
+        'sahih', 'sunan', 'jami', 'musnad',
+        'surah', 'ayah', 'verse', 'chapter', 'revelation',
+        'mosque', 'masjid', 'imam', 'khutbah', 'dua', 'dhikr',
+        'halal', 'haram', 'makruh', 'mustahab', 'fiqh', 'sharia'
+    ]
+    text_lower = text.lower()
+    islamic_score = 0
+    total_words = len(text.split())
+    for keyword in islamic_keywords:
+        islamic_score += text_lower.count(keyword)
+    islamic_ratio = islamic_score / max(total_words, 1) * 100
+    quran_patterns = [r'\b\d{1,3}:\d{1,3}\b', r'surah\s+[\w\-]+', r'chapter\s+\d+']
+    quran_refs = 0
+    for pattern in quran_patterns:
+        quran_refs += len(re.findall(pattern, text_lower))
+    hadith_patterns = [
+        r'sahih\s+(bukhari|muslim)',
+        r'sunan\s+(abu\s+dawood|tirmidhi|nasa\'?i|ibn\s+majah)',
+        r'jami\s+tirmidhi',
+        r'musnad\s+ahmad'
+    ]
+    hadith_refs = 0
+    for pattern in hadith_patterns:
+        hadith_refs += len(re.findall(pattern, text_lower))
+    return {
+        'is_islamic': islamic_ratio > 0.5 or quran_refs > 0 or hadith_refs > 0,
+        'islamic_score': islamic_ratio,
+        'quran_references': quran_refs,
+        'hadith_references': hadith_refs,
+        'total_islamic_keywords': islamic_score
+    }
+
+
+def build_text(megabytes):
+    """Repeat the saved scraped content (plus a sample paragraph) to the requested size"""
+    paragraphs = [SAMPLE_PARAGRAPH]
+    for path in sorted(SCRAPED_DIR.glob("*.txt")):
+        paragraphs.extend(p for p in path.read_text(encoding='utf-8', errors='ignore').split("\n\n") if p.strip())
+    base = "\n\n".join(paragraphs) + "\n\n"
+    target = megabytes * 1024 * 1024
+    return (base * (target // len(base) + 1))[:target]
+
+
+def timed(func, *args):
+    """Return (result, seconds) of the best of three runs"""
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    """Time both detectors and print throughput and counts"""
+    megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    text = build_text(megabytes)
+    chunks = [text[i:i + CHUNK_SIZE] for i in range(0, len(text), CHUNK_SIZE)]
+
+    runs = [
+        ("legacy (str.count x 52 + 7 findall)", legacy_detect_islamic_content, text),
+        ("single pass, one string", detect_islamic_content, text),
+        ("single pass, 64 KB chunks", detect_islamic_content, chunks),
+    ]
+    print(f"Corpus: {megabytes} MB")
+    print(f"{'detector':<38} | {'seconds':>7} | {'MB/s':>6} | {'keywords':>9} | {'quran':>6} | {'hadith':>6}")
+    print("-" * 88)
+    for name, func, source in runs:
+        result, elapsed = timed(func, source)
+        print(f"{name:<38} | {elapsed:>7.2f} | {megabytes / elapsed:>6.1f} | "
+              f"{result['total_islamic_keywords']:>9} | {result['quran_references']:>6} | {result['hadith_references']:>6}")
+
+
+if __name__ == "__main__":
+    main()
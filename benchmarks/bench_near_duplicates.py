@@ -0,0 +1,95 @@
+"""
+Scaling benchmark for the near-duplicate index
+
+Indexes synthetic Q&A examples built from the sample data vocabulary,
+with one in ten being a paraphrase (a few words dropped or replaced) of
+an earlier example. Reports indexing time per example as the corpus
+grows, and recall on the planted paraphrases whose exact shingle Jaccard
+similarity reaches the index threshold. Pairs reported below 0.5 exact
+similarity count as false.
+
+Usage: python benchmarks/bench_near_duplicates.py [max examples]
+"""
+
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from near_duplicates import NearDuplicateIndex  # noqa: E402
+
+SAMPLE_FILE = Path(__file__).parent.parent / "src" / "data_manager.py"
+PARAPHRASE_EVERY = 10
+
+
+def vocabulary():
+    """Words of the sample questions and answers"""
+    return sorted(set(re.findall(r"[A-Za-z]{3,}", SAMPLE_FILE.read_text(encoding='utf-8'))))
+
+
+def paraphrase(text, rng):
+    """Drop or replace a few words of a text"""
+    words = text.split()
+    for _ in range(3):
+        position = rng.randrange(len(words))
+        if rng.random() < 0.5:
+            del words[position]
+        else:
+            words[position] = rng.choice(["the", "a", "indeed", "also"])
+    return " ".join(words)
+
+
+def shingles(text, size=3):
+    """Exact word shingles, as the index builds them"""
+    words = re.findall(r"\w+", text.lower())
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def jaccard(a, b):
+    """Exact Jaccard similarity of the shingle sets of two texts"""
+    a, b = shingles(a), shingles(b)
+    return len(a & b) / len(a | b)
+
+
+def corpus(size, rng):
+    """Yield (text, all texts so far, index of the paraphrased original or None)"""
+    words = vocabulary()
+    texts = []
+    for i in range(size):
+        if i and i % PARAPHRASE_EVERY == 0:
+            original = rng.randrange(len(texts))
+            texts.append(paraphrase(texts[original], rng))
+            yield texts[-1], texts, original
+        else:
+            texts.append(" ".join(rng.choice(words) for _ in range(rng.randint(40, 90))))
+            yield texts[-1], texts, None
+
+
+def main():
+    """Print indexing time per example at growing corpus sizes"""
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    checkpoints = [n for n in (10_000, 50_000, 100_000, 200_000, 500_000, 1_000_000) if n <= limit]
+    rng = random.Random(42)
+    index = NearDuplicateIndex()
+
+    print(f"{'examples':>9} | {'seconds':>8} | {'us/example':>10} | {'planted >= threshold':>20} | {'found':>6} | {'false':>5}")
+    print("-" * 75)
+    elapsed = 0.0
+    planted = found = false = 0
+    for i, (text, texts, original) in enumerate(corpus(checkpoints[-1], rng), 1):
+        start = time.perf_counter()
+        _, duplicates = index.add(text)
+        elapsed += time.perf_counter() - start
+        if original is not None and jaccard(text, texts[original]) >= index.threshold:
+            planted += 1
+            found += original in duplicates
+        false += sum(1 for other in duplicates if jaccard(text, texts[other]) < 0.5)
+        if i in checkpoints:
+            print(f"{i:>9,} | {elapsed:>8.1f} | {elapsed / i * 1e6:>10.0f} | {planted:>20} | {found:>6} | {false:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Latency benchmark for the BM25 retrieval index
+
+Appends synthetic training examples (40-90 words drawn from the sample
+data vocabulary) to a JSONL file in batches, syncing the index after
+each batch the way DataManager does. It then times searches with
+four-word queries. Reports indexing cost per example and median/p95
+query latency as the corpus grows.
+
+Usage: python benchmarks/bench_retrieval_index.py [max examples]
+"""
+
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from jsonl_store import append_jsonl  # noqa: E402
+from retrieval_index import RetrievalIndex  # noqa: E402
+
+SAMPLE_FILE = Path(__file__).parent.parent / "src" / "data_manager.py"
+QUERIES = 200
+
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    rng = random.Random(7)
+    words = sorted(set(re.findall(r"[A-Za-z]{3,}", SAMPLE_FILE.read_text(encoding='utf-8'))))
+
+    def example(i):
+        answer = " ".join(rng.choice(words) for _ in range(rng.randint(40, 90)))
+        return {"messages": [
+            {"role": "system", "content": "You are an Islamic scholar assistant."},
+            {"role": "user", "content": " ".join(rng.choice(words) for _ in range(8)) + "?"},
+            {"role": "assistant", "content": f"{answer}\n\n**Reference:** Quran {i % 114 + 1}:{i % 200 + 1}"},
+        ]}
+
+    sizes = [size for size in (10_000, 50_000, 100_000, 200_000, 500_000) if size <= limit]
+    print(f"{'examples':>9} | {'index us/example':>16} | {'query p50 ms':>12} | {'query p95 ms':>12}")
+    print("-" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        train = Path(tmp) / "train.jsonl"
+        index = RetrievalIndex(Path(tmp) / "retrieval.sqlite")
+        index.watch_jsonl(train)
+        count = 0
+        for size in sizes:
+            indexing = 0.0
+            while count < size:
+                batch = [example(count + i) for i in range(1000)]
+                append_jsonl(train, batch)
+                started = time.perf_counter()
+                index.sync_jsonl(train)
+                indexing += time.perf_counter() - started
+                count += len(batch)
+
+            latencies = []
+            for _ in range(QUERIES):
+                query = " ".join(rng.choice(words) for _ in range(4))
+                started = time.perf_counter()
+                index.search(query, k=4)
+                latencies.append((time.perf_counter() - started) * 1000)
+            latencies.sort()
+            added = size - (sizes[sizes.index(size) - 1] if sizes.index(size) else 0)
+            print(f"{size:>9,} | {indexing / added * 1e6:>16.0f} | "
+                  f"{statistics.median(latencies):>12.2f} | {latencies[int(QUERIES * 0.95)]:>12.2f}")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Micro-benchmark for scraped text cleaning
+
+Cleans element-sized texts (paragraphs of the saved scraped content, as
+extract_content sees them) with the previous WebScraper.clean_text, the
+precompiled text_cleaner.clean_text, and the batch text_cleaner.clean_texts,
+and checks that all three produce the same output.
+
+Usage: python benchmarks/bench_text_cleaner.py [number of texts]
+"""
+
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from text_cleaner import clean_text, clean_texts  # noqa: E402
+
+SCRAPED_DIR = Path(__file__).parent.parent / "src" / "scraped_content"
+SAMPLES = [
+    "  Subscribe to our Newsletter\n\n for weekly   reminders  ",
+    "Download the   App today! Get it on the Play Store",
+    "The Prophet (peace be upon him) said:\n\t'The strong believer is better and more beloved to Allah.'",
+    "Copyright 2024 IslamQA. All Rights Reserved. Follow us on Social Media",
+    "Share your thoughts: Help us enhance our Privacy Policy and Terms of Service",
+]
+
+
+def legacy_clean_text(text):
+    """The previous implementation, kept verbatim for comparison"""
+    if not text:
+        return ""
+    text = re.sub(r'\s+', ' ', text.strip())
+    unwanted_patterns = [
+        r'Cookie Policy|Privacy Policy|Terms of Service',
+        r'Subscribe|Newsletter|Advertisement',
+        r'Share your thoughts|Help us enhance',
+        r'Download.*App|Get it on.*Store',
+        r'Follow us on|Social Media',
+        r'Copyright.*Reserved|All Rights Reserved'
+    ]
+    for pattern in unwanted_patterns:
+        text = re.sub(pattern, '', text, flags=re.IGNORECASE)
+    return text.strip()
+
+
+def build_texts(count, words_per_text=None):
+    """Element-sized texts from the saved scraped content plus boilerplate samples
+
+    With words_per_text, lines are cut into short fragments like the text of
+    inline elements (span, a, td).
+    """
+    texts = list(SAMPLES)
+    for path in sorted(SCRAPED_DIR.glob("*.txt")):
+        texts.extend(line for line in path.read_text(encoding='utf-8', errors='ignore').splitlines() if line.strip())
+    if words_per_text:
+        texts = [" ".join(words[i:i + words_per_text])
+                 for words in (text.split() for text in texts)
+                 for i in range(0, len(words), words_per_text)]
+    return (texts * (count // len(texts) + 1))[:count]
+
+
+def timed(func):
+    """Return (result, seconds) of the best of three runs"""
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def run(texts, label):
+    """Time the three cleaners on texts and print a table"""
+    megabytes = sum(len(text) for text in texts) / (1024 * 1024)
+    runs = [
+        ("legacy clean_text per element", lambda: [legacy_clean_text(t) for t in texts]),
+        ("clean_text per element", lambda: [clean_text(t) for t in texts]),
+        ("clean_texts batch", lambda: clean_texts(texts)),
+    ]
+    print(f"{label}: {len(texts):,} texts, {megabytes:.1f} MB")
+    print(f"{'cleaner':<32} | {'seconds':>7} | {'texts/s':>10} | {'speedup':>7}")
+    print("-" * 66)
+    expected = None
+    baseline = None
+    for name, func in runs:
+        result, elapsed = timed(func)
+        expected = expected or result
+        baseline = baseline or elapsed
+        assert result == expected, f"{name} output differs from legacy"
+        print(f"{name:<32} | {elapsed:>7.3f} | {len(texts) / elapsed:>10,.0f} | {baseline / elapsed:>6.1f}x")
+    print()
+
+
+def main():
+    """Benchmark paragraph-sized and inline-sized element texts"""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    run(build_texts(count), "Paragraph texts")
+    run(build_texts(count, words_per_text=4), "Inline texts (4 words)")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,48 +4,37 @@ Helps users validate their JSON files before upload
 """
 
 import json
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from data_validator import QA, validate_file
+
 def validate_json_file(file_path):
-    """Validate JSON file format for training data"""
+    """Validate JSON file format for training data
+
+    The file is streamed through src/data_validator, one item at a time.
+    Only the first DEFAULT_MAX_ISSUES issues are listed, followed by a
+    count of the rest.
+    """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        if not isinstance(data, list):
-            return False, "JSON must be an array/list of objects"
-        
-        required_fields = ['question', 'answer', 'source', 'reference']
-        valid_count = 0
-        issues = []
-        
-        for i, item in enumerate(data):
-            if not isinstance(item, dict):
-                issues.append(f"Item {i+1}: Must be an object/dictionary")
-                continue
-            
-            missing_fields = []
-            for field in required_fields:
-                if field not in item:
-                    missing_fields.append(field)
-                elif not item[field] or not str(item[field]).strip():
-                    missing_fields.append(f"{field} (empty)")
-            
-            if missing_fields:
-                issues.append(f"Item {i+1}: Missing fields: {', '.join(missing_fields)}")
-            else:
-                valid_count += 1
-        
-        return True, {
-            'total_items': len(data),
-            'valid_items': valid_count,
-            'issues': issues
-        }
-        
-    except json.JSONDecodeError as e:
-        return False, f"Invalid JSON format: {e}"
+        report = validate_file(file_path, schema=QA, file_format='json')
     except Exception as e:
         return False, f"Error reading file: {e}"
+    
+    if report['issue_counts'].get('invalid_json') and report['issues'][-1]['line'] is None:
+        return False, report['issues'][-1]['message']
+    
+    issues = [f"Item {issue['record']}: {issue['message']}" for issue in report['issues']]
+    if report['issues_truncated']:
+        issues.append(f"... and {sum(report['issue_counts'].values()) - len(report['issues'])} more issues")
+    
+    return True, {
+        'total_items': report['records'],
+        'valid_items': report['valid'],
+        'issues': issues
+    }
 
 def create_sample_json():
     """Create a sample JSON file for users"""
@@ -0,0 +1,220 @@
+"""
+AI Extraction
+Concurrent, rate-limited Q&A extraction from text chunks with OpenAI
+"""
+
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from llm_cache import make_cache_key
+
+ISLAMIC_EXTRACTION_PROMPT = """You are an Islamic scholar assistant. Extract question-answer pairs from the provided text that are related to Islamic knowledge (Quran, Hadith, Islamic practices, etc.).
+
+For each Q&A pair, you MUST provide:
+1. A clear question
+2. A comprehensive answer
+3. The Islamic source (Quran, Sahih al-Bukhari, Sahih Muslim, etc.)
+4. The specific reference (verse number, hadith number, etc.)
+5. A category (e.g., Prayer, Charity, Character, etc.)
+
+Only extract content that has proper Islamic sources and references. If no Islamic Q&A pairs can be found, return an empty array.
+
+Return the result as a JSON array in this exact format:
+[
+  {
+    "question": "What are the five pillars of Islam?",
+    "answer": "The five pillars of Islam are...",
+    "source": "Sahih al-Bukhari",
+    "reference": "8",
+    "category": "Pillars of Islam"
+  }
+]"""
+
+GENERAL_EXTRACTION_PROMPT = """Extract question-answer pairs from the provided text. Create educational Q&A pairs that would be useful for training.
+
+For each Q&A pair, provide:
+1. A clear question
+2. A comprehensive answer
+3. A source (can be the document title, website, or "General Knowledge")
+4. A reference (page number, section, or "N/A")
+5. A category
+
+Return the result as a JSON array in this exact format:
+[
+  {
+    "question": "What is the main topic discussed?",
+    "answer": "The main topic is...",
+    "source": "Document Title or General Knowledge",
+    "reference": "Page 1 or N/A",
+    "category": "General"
+  }
+]"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter"""
+
+    def __init__(self, rate, capacity=None):
+        """Allow `rate` acquisitions per second with bursts up to `capacity`"""
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def is_retryable_error(error):
+    """Return True for rate limits (429), server errors (5xx) and connection failures"""
+    status = getattr(error, 'status_code', None)
+    if status is not None:
+        return status == 429 or status >= 500
+    name = type(error).__name__
+    return 'Timeout' in name or 'Connection' in name
+
+
+def _retry_after(error):
+    """Read a Retry-After header (seconds) from an API error, if any"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+def call_with_retry(func, max_retries=5, base_delay=1.0, max_delay=30.0, on_retry=None):
+    """Call func, retrying retryable errors with exponential backoff and jitter"""
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable_error(e):
+                raise
+            delay = _retry_after(e)
+            if delay is None:
+                delay = min(max_delay, base_delay * (2 ** attempt)) * random.uniform(0.5, 1.0)
+            attempt += 1
+            if on_retry:
+                on_retry(e, attempt, delay)
+            time.sleep(delay)
+
+
+def parse_qa_response(ai_response):
+    """Parse a model reply into a list of Q&A dicts (None if unparseable)"""
+    ai_response = ai_response.strip()
+    if '```json' in ai_response:
+        ai_response = ai_response.split('```json')[1].split('```')[0]
+    elif '```' in ai_response:
+        ai_response = ai_response.split('```')[1]
+
+    try:
+        qa_pairs = json.loads(ai_response)
+    except json.JSONDecodeError:
+        return None
+    return qa_pairs if isinstance(qa_pairs, list) else []
+
+
+class QAExtractor:
+    """Extract Q&A pairs from many chunks with bounded concurrency
+
+    Chunks are sent to the chat completions API from a thread pool of
+    `max_workers` threads. A shared token bucket spaces out requests,
+    429/5xx responses are retried with backoff, and results are returned
+    in chunk order. With an LLMCache, chunks already extracted with the
+    same model, prompt and parameters are served from disk.
+    """
+
+    def __init__(self, client, model="gpt-4o-mini", max_workers=4, requests_per_second=2.0,
+                 max_retries=5, max_tokens=2000, temperature=0.3, base_delay=1.0, cache=None):
+        """Configure the extractor around an OpenAI-compatible client"""
+        # Retries are handled here, so turn off the client's own retry loop
+        if hasattr(client, 'with_options'):
+            client = client.with_options(max_retries=0)
+        self.client = client
+        self.model = model
+        self.max_workers = max(1, int(max_workers))
+        self.rate_limiter = TokenBucket(requests_per_second)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.cache = cache
+
+    def _request(self, system_prompt, chunk):
+        """Send one rate-limited chat completion request"""
+        self.rate_limiter.acquire()
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": f"Extract Q&A pairs from this text:\n\n{chunk}"}
+            ],
+            max_tokens=self.max_tokens,
+            temperature=self.temperature
+        )
+        return response.choices[0].message.content
+
+    def extract_chunk(self, system_prompt, chunk, on_retry=None):
+        """Extract Q&A pairs from a single chunk (cached, with retries)"""
+        def compute():
+            ai_response = call_with_retry(
+                lambda: self._request(system_prompt, chunk),
+                max_retries=self.max_retries,
+                base_delay=self.base_delay,
+                on_retry=on_retry
+            )
+            return parse_qa_response(ai_response or "")
+
+        if self.cache is None:
+            return compute()
+        key = make_cache_key(self.model, system_prompt, chunk, self.max_tokens, self.temperature)
+        return self.cache.get_or_compute(key, compute)
+
+    def extract(self, chunks, system_prompt, progress=None, on_retry=None):
+        """Extract Q&A pairs from all chunks in chunk order
+
+        Returns (results, errors): results[i] is the list of Q&A dicts for
+        chunk i, or None when it failed or the reply could not be parsed;
+        errors maps failed chunk indices to the error message.
+        `progress(done, total)` is called as chunks complete.
+        """
+        chunks = list(chunks)
+        results = [None] * len(chunks)
+        errors = {}
+        done = 0
+        done_lock = threading.Lock()
+
+        def work(index):
+            nonlocal done
+            try:
+                results[index] = self.extract_chunk(system_prompt, chunks[index], on_retry)
+                if results[index] is None:
+                    errors[index] = "Could not parse AI response as JSON"
+            except Exception as e:
+                errors[index] = str(e)
+            with done_lock:
+                done += 1
+                if progress:
+                    progress(done, len(chunks))
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, max(1, len(chunks)))) as executor:
+            list(executor.map(work, range(len(chunks))))
+
+        return results, errors
@@ -0,0 +1,75 @@
+"""
+Chat Stream
+Streamed chat completions with time-to-first-token and throughput
+"""
+
+import time
+
+# Minimum seconds between partial answers handed to the UI
+DEFAULT_UPDATE_INTERVAL = 0.05
+
+
+def stream_chat(client, model, messages, max_tokens=300, temperature=0.7,
+                update_interval=DEFAULT_UPDATE_INTERVAL):
+    """Yield (answer so far, stats) while a chat completion streams in
+
+    stats has first_token (seconds until the first content arrived),
+    tokens (completion tokens, from the final usage chunk when the server
+    sends one, else the number of content chunks), tokens_per_second
+    (after the first token) and seconds in total. Partial answers are
+    yielded at most every `update_interval` seconds so a UI does not
+    re-render for every token; the last yield always holds the full answer.
+    Pass one long-lived client so its connection pool can reuse open
+    connections instead of a new TLS handshake per question.
+    """
+    started = time.perf_counter()
+    stream = client.chat.completions.create(
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+    parts = []
+    stats = {'first_token': None, 'tokens': 0, 'tokens_per_second': None, 'seconds': None}
+    first_at = last_yield = None
+    chunks = usage_tokens = 0
+    try:
+        for chunk in stream:
+            if chunk.usage is not None:
+                usage_tokens = chunk.usage.completion_tokens
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            now = time.perf_counter()
+            if first_at is None:
+                first_at = now
+                stats['first_token'] = now - started
+            parts.append(chunk.choices[0].delta.content)
+            chunks += 1
+            stats['tokens'] = chunks
+            if last_yield is None or now - last_yield >= update_interval:
+                last_yield = now
+                yield "".join(parts), dict(stats)
+    finally:
+        stream.close()
+
+    finished = time.perf_counter()
+    stats['tokens'] = usage_tokens or chunks
+    stats['seconds'] = finished - started
+    if first_at is not None and finished > first_at:
+        stats['tokens_per_second'] = stats['tokens'] / (finished - first_at)
+    yield "".join(parts), stats
+
+
+def format_stream_stats(stats):
+    """One-line summary like '⏱️ First token 0.42s · 38.5 tok/s · 120 tokens · 3.54s total'"""
+    if stats['first_token'] is None:
+        return "⏱️ No tokens received yet"
+    parts = [f"⏱️ First token {stats['first_token']:.2f}s"]
+    if stats['tokens_per_second'] is not None:
+        parts.append(f"{stats['tokens_per_second']:.1f} tok/s")
+    parts.append(f"{stats['tokens']} tokens")
+    if stats['seconds'] is not None:
+        parts.append(f"{stats['seconds']:.2f}s total")
+    return " · ".join(parts)
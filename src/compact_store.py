@@ -0,0 +1,235 @@
+"""
+Compact Example Store
+Columnar in-memory representation of training examples
+"""
+
+import re
+from array import array
+from datetime import datetime, timedelta
+
+from jsonl_store import atomic_write_jsonl
+
+REFERENCE_MARKER = "\n\n**Reference:** "
+# Where the reference starts in "{source} {reference}": the first later word
+# that is a number or a reference keyword ("Quran 2:255", "Bukhari, Book 2, Hadith 8")
+_REFERENCE_START_RE = re.compile(
+    r"\s+(?=[#\d]|(?:book|hadith|volume|vol|number|chapter|verse|none)\b|no\.|n/a\b)",
+    re.IGNORECASE
+)
+EXPECTED_ROLES = ("system", "user", "assistant")
+_EPOCH = datetime(1970, 1, 1)
+_NO_TIMESTAMP = -1
+
+
+class _Dictionary:
+    """Dictionary encoding for low-cardinality string columns"""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def encode(self, value):
+        """Return the code for a value, adding it if new"""
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+
+class CompactExampleStore:
+    """Column store for question/answer training examples
+
+    Free text (questions, answers, references) lives in plain string
+    columns; categories, sources and system prompts are dictionary-encoded
+    into integer arrays, so the long system prompt is stored once. Full
+    OpenAI ``messages`` dicts are only built when an example is read back
+    or exported.
+
+    Examples that don't follow the standard system/user/assistant layout
+    are kept verbatim in a side table, so the store is lossless.
+    """
+
+    def __init__(self):
+        """Create an empty store"""
+        self.questions = []
+        self.answers = []
+        self.references = []
+        self.sources = _Dictionary()
+        self.categories = _Dictionary()
+        self.system_prompts = _Dictionary()
+        self._source_codes = array('I')
+        self._category_codes = array('I')
+        self._prompt_codes = array('I')
+        self._created_at = array('q')
+        self._extras = {}
+        self._raw = {}
+
+    @classmethod
+    def from_examples(cls, examples):
+        """Build a store from an iterable of example dicts"""
+        store = cls()
+        for example in examples:
+            store.add_example(example)
+        return store
+
+    def __len__(self):
+        return len(self.questions)
+
+    def add(self, question, answer, source, reference, category, system_prompt, created_at=None):
+        """Add one example from its fields"""
+        self.questions.append(question)
+        self.answers.append(answer)
+        self.references.append(reference)
+        self._source_codes.append(self.sources.encode(source))
+        self._category_codes.append(self.categories.encode(category))
+        self._prompt_codes.append(self.system_prompts.encode(system_prompt))
+        self._created_at.append(_encode_timestamp(created_at))
+        return len(self.questions) - 1
+
+    def add_example(self, example):
+        """Add one example in the OpenAI chat format"""
+        fields = _parse_example(example)
+        if fields is None:
+            index = self.add("", "", "", "", example.get('category', 'Unknown'), "")
+            self._raw[index] = example
+            return index
+
+        index = self.add(*fields)
+        created_at = example.get('created_at')
+        if created_at is not None and _decode_timestamp(self._created_at[index]) != created_at:
+            self._extras.setdefault(index, {})['created_at'] = created_at
+
+        extras = {k: v for k, v in example.items() if k not in ('messages', 'category', 'created_at')}
+        if extras:
+            self._extras.setdefault(index, {}).update(extras)
+        return index
+
+    def row(self, index):
+        """Return the stored fields of an example as a flat dict"""
+        return {
+            'question': self.questions[index],
+            'answer': self.answers[index],
+            'source': self.sources.values[self._source_codes[index]],
+            'reference': self.references[index],
+            'category': self.categories.values[self._category_codes[index]],
+        }
+
+    def __getitem__(self, index):
+        """Materialize an example as an OpenAI chat-format dict"""
+        if index < 0:
+            index += len(self)
+        if index in self._raw:
+            return self._raw[index]
+
+        row = self.row(index)
+        example = {
+            "messages": [
+                {
+                    "role": "system",
+                    "content": self.system_prompts.values[self._prompt_codes[index]]
+                },
+                {
+                    "role": "user",
+                    "content": row['question']
+                },
+                {
+                    "role": "assistant",
+                    "content": f"{row['answer']}{REFERENCE_MARKER}{row['source']} {row['reference']}"
+                }
+            ],
+            "category": row['category'],
+        }
+        created_at = _decode_timestamp(self._created_at[index])
+        if created_at is not None:
+            example["created_at"] = created_at
+        example.update(self._extras.get(index, {}))
+        return example
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def category_counts(self):
+        """Count examples per category straight from the encoded column"""
+        counts = [0] * len(self.categories.values)
+        for code in self._category_codes:
+            counts[code] += 1
+        return {value: counts[code] for code, value in enumerate(self.categories.values) if counts[code]}
+
+    def write_jsonl(self, file_path):
+        """Export all examples to a JSONL file atomically"""
+        return atomic_write_jsonl(file_path, iter(self))
+
+
+def split_citation(citation):
+    """Split the "{source} {reference}" text after the reference marker
+
+    Sources may contain spaces ("Sahih al-Bukhari") and so may references
+    ("Book 2, Hadith 8"), so the split is made before the first number or
+    reference keyword after the first word. A citation with neither, such
+    as "System Guidance Scope Definition", is all source.
+    """
+    citation = citation.strip()
+    match = _REFERENCE_START_RE.search(citation)
+    if match is None:
+        return citation, ''
+    return citation[:match.start()].rstrip(',;'), citation[match.end():]
+
+
+def example_citation(example):
+    """(answer, source, reference) of a chat example's assistant message, or None without a reference"""
+    messages = example.get('messages') or []
+    answer = next((m.get('content') or '' for m in messages if m.get('role') == 'assistant'), '')
+    if REFERENCE_MARKER.strip() not in answer:
+        return None
+    answer, citation = answer.rsplit(REFERENCE_MARKER.strip(), 1)
+    return (answer, *split_citation(citation))
+
+
+def _parse_example(example):
+    """Split a standard chat example into store fields, or None"""
+    messages = example.get('messages')
+    if 'category' not in example or not isinstance(messages, list) or len(messages) != 3:
+        return None
+    if any(not isinstance(m, dict) or len(m) != 2 for m in messages):
+        return None
+    if tuple(m.get('role') for m in messages) != EXPECTED_ROLES:
+        return None
+
+    assistant = messages[2].get('content', '')
+    if REFERENCE_MARKER not in assistant:
+        return None
+    answer, citation = assistant.split(REFERENCE_MARKER, 1)
+    source, _, reference = citation.rpartition(' ')
+    if f"{answer}{REFERENCE_MARKER}{source} {reference}" != assistant:
+        return None
+
+    return (
+        messages[1].get('content', ''),
+        answer,
+        source,
+        reference,
+        example['category'],
+        messages[0].get('content', ''),
+        example.get('created_at'),
+    )
+
+
+def _encode_timestamp(created_at):
+    """Encode an ISO timestamp as microseconds since the epoch"""
+    if not created_at:
+        return _NO_TIMESTAMP
+    try:
+        delta = datetime.fromisoformat(created_at) - _EPOCH
+    except (TypeError, ValueError):
+        return _NO_TIMESTAMP
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _decode_timestamp(micros):
+    """Decode microseconds since the epoch back to an ISO timestamp"""
+    if micros == _NO_TIMESTAMP:
+        return None
+    return (_EPOCH + timedelta(microseconds=micros)).isoformat()
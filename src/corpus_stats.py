@@ -0,0 +1,117 @@
+"""
+Corpus Stats
+Running training-data statistics, updated per example and persisted as JSON
+"""
+
+import json
+import os
+from pathlib import Path
+
+from compact_store import example_citation
+
+# Bumped when the way stats are derived changes, so stored stats are rebuilt
+STATS_VERSION = 2
+
+# Upper bounds (tokens) of the example length histogram buckets
+LENGTH_BUCKETS = [64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 65536]
+
+
+def length_bucket(tokens):
+    """Histogram bucket label for an example length"""
+    for bound in LENGTH_BUCKETS:
+        if tokens <= bound:
+            return f"≤{bound}"
+    return f">{LENGTH_BUCKETS[-1]}"
+
+
+def _citation(example):
+    """(source, reference) cited by an example's answer, or None"""
+    citation = example_citation(example)
+    return None if citation is None else citation[1:]
+
+
+def _bump(counter, key, delta):
+    """Add delta to a count, dropping keys that reach zero"""
+    value = counter.get(key, 0) + delta
+    if value:
+        counter[key] = value
+    else:
+        counter.pop(key, None)
+
+
+class CorpusStats:
+    """Totals for one corpus that add() and remove() keep current in O(1)
+
+    Tracks example, character and token totals, the category distribution,
+    a histogram of example lengths in tokens, and citation coverage (how
+    many answers carry a source, how many also a reference number, and
+    the count per source). Token counts come from the caller, normally
+    ExampleTokenCounter, so they match the cost estimate.
+    """
+
+    def __init__(self):
+        """Start from an empty corpus"""
+        self.examples = 0
+        self.chars = 0
+        self.tokens = 0
+        self.categories = {}
+        self.lengths = {}
+        self.sources = {}
+        self.cited = 0
+        self.with_reference = 0
+
+    def _apply(self, example, tokens, sign):
+        """Add (sign=1) or subtract (sign=-1) one example"""
+        self.examples += sign
+        self.tokens += sign * tokens
+        self.chars += sign * sum(len(m.get('content') or '') for m in example.get('messages') or [])
+        _bump(self.categories, example.get('category', 'Unknown'), sign)
+        _bump(self.lengths, length_bucket(tokens), sign)
+
+        citation = _citation(example)
+        if citation is not None:
+            source, reference = citation
+            self.cited += sign
+            self.with_reference += sign * bool(reference)
+            _bump(self.sources, source, sign)
+
+    def add(self, example, tokens):
+        """Count one example in"""
+        self._apply(example, tokens, 1)
+
+    def remove(self, example, tokens):
+        """Count one example out"""
+        self._apply(example, tokens, -1)
+
+    def to_dict(self):
+        """JSON-serializable state"""
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, data):
+        """Restore from to_dict() output"""
+        stats = cls()
+        for name in vars(stats):
+            setattr(stats, name, data[name])
+        return stats
+
+
+def load_stats(stats_path, fingerprint, tokenizer):
+    """Stored stats if they describe this corpus state and tokenizer, else None"""
+    try:
+        data = json.loads(Path(stats_path).read_text(encoding='utf-8'))
+        if (data.get('version') != STATS_VERSION or data['fingerprint'] != fingerprint
+                or data['tokenizer'] != tokenizer):
+            return None
+        return CorpusStats.from_dict(data['stats'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_stats(stats_path, stats, fingerprint, tokenizer):
+    """Atomically store stats with the corpus fingerprint and tokenizer they match"""
+    stats_path = Path(stats_path)
+    tmp_path = stats_path.with_name(stats_path.name + ".tmp")
+    payload = {'version': STATS_VERSION, 'fingerprint': fingerprint, 'tokenizer': tokenizer, 'stats': stats.to_dict()}
+    tmp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding='utf-8')
+    os.replace(tmp_path, stats_path)
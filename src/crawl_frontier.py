@@ -0,0 +1,181 @@
+"""
+Crawl Frontier
+SQLite-backed crawl queue with a visited-set index and resumable state
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+PENDING = 'pending'
+IN_PROGRESS = 'in_progress'
+DONE = 'done'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+
+MEMORY = ':memory:'
+
+
+class CrawlFrontier:
+    """Persistent queue of URLs for one crawl
+
+    Every URL ever discovered for `crawl_id` is a row keyed by
+    (crawl, url), so discovery dedup is a unique-index lookup rather than
+    a list scan. Rows carry status, depth and priority; `claim` hands out
+    pending URLs by priority, then discovery order. Results of finished
+    pages are stored with their row, so a crawl that was interrupted can
+    be reopened and resumed: URLs left in progress go back to pending.
+    """
+
+    def __init__(self, db_path, crawl_id):
+        """Open (or create) the frontier database and resume crawl_id"""
+        self.db_path = db_path
+        if db_path != MEMORY:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.crawl_id = crawl_id
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS frontier ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " crawl TEXT NOT NULL,"
+            " url TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " depth INTEGER NOT NULL,"
+            " priority INTEGER NOT NULL,"
+            " result TEXT,"
+            " error TEXT,"
+            " updated_at REAL NOT NULL,"
+            " UNIQUE (crawl, url))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS frontier_queue ON frontier (crawl, status, priority DESC, seq)"
+        )
+        self._conn.commit()
+        self._size = self._conn.execute(
+            "SELECT COUNT(*) FROM frontier WHERE crawl = ?", (crawl_id,)
+        ).fetchone()[0]
+        self.resumed = self.resume()
+
+    def __len__(self):
+        """Number of distinct URLs discovered so far"""
+        return self._size
+
+    def add(self, url, depth=0, priority=0):
+        """Queue url unless it was seen before; return True if it was new"""
+        return self.add_many([url], depth, priority) == 1
+
+    def add_many(self, urls, depth=0, priority=0, limit=None):
+        """Queue unseen urls in order, stopping once `limit` URLs are known"""
+        added = 0
+        now = time.time()
+        with self._lock:
+            for url in urls:
+                if limit is not None and self._size >= limit:
+                    break
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO frontier (crawl, url, status, depth, priority, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.crawl_id, url, PENDING, depth, priority, now)
+                )
+                if cursor.rowcount:
+                    added += 1
+                    self._size += 1
+            self._conn.commit()
+        return added
+
+    def claim(self, count=1):
+        """Mark up to `count` pending URLs in progress and return [(url, depth)]"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, url, depth FROM frontier WHERE crawl = ? AND status = ?"
+                " ORDER BY priority DESC, seq LIMIT ?",
+                (self.crawl_id, PENDING, count)
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE frontier SET status = ?, updated_at = ? WHERE seq = ?",
+                [(IN_PROGRESS, time.time(), seq) for seq, _, _ in rows]
+            )
+            self._conn.commit()
+        return [(url, depth) for _, url, depth in rows]
+
+    def complete(self, url, result=None, error=None):
+        """Record a finished URL: done with a result, skipped without one, or failed"""
+        if error is not None:
+            status = FAILED
+        elif result is None:
+            status = SKIPPED
+        else:
+            status = DONE
+        with self._lock:
+            self._conn.execute(
+                "UPDATE frontier SET status = ?, result = ?, error = ?, updated_at = ?"
+                " WHERE crawl = ? AND url = ?",
+                (status, json.dumps(result, ensure_ascii=False) if result is not None else None,
+                 error, time.time(), self.crawl_id, url)
+            )
+            self._conn.commit()
+
+    def resume(self):
+        """Return URLs left in progress by an interrupted run to the queue"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE frontier SET status = ? WHERE crawl = ? AND status = ?",
+                (PENDING, self.crawl_id, IN_PROGRESS)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def skip_pending(self):
+        """Mark every URL still pending as skipped; return how many were"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE frontier SET status = ?, updated_at = ? WHERE crawl = ? AND status = ?",
+                (SKIPPED, time.time(), self.crawl_id, PENDING)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def counts(self):
+        """Return {status: number of URLs}"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM frontier WHERE crawl = ? GROUP BY status", (self.crawl_id,)
+            ).fetchall()
+        return dict(rows)
+
+    def is_finished(self):
+        """True once URLs exist and none are pending or in progress"""
+        counts = self.counts()
+        return bool(counts) and not counts.get(PENDING) and not counts.get(IN_PROGRESS)
+
+    def results(self, batch_size=500):
+        """Yield stored results of done URLs in discovery order"""
+        last_seq = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT seq, result FROM frontier WHERE crawl = ? AND status = ? AND seq > ?"
+                    " ORDER BY seq LIMIT ?",
+                    (self.crawl_id, DONE, last_seq, batch_size)
+                ).fetchall()
+            for last_seq, result in rows:
+                yield json.loads(result)
+            if len(rows) < batch_size:
+                return
+
+    def reset(self):
+        """Forget every URL of this crawl"""
+        with self._lock:
+            self._conn.execute("DELETE FROM frontier WHERE crawl = ?", (self.crawl_id,))
+            self._conn.commit()
+            self._size = 0
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,128 @@
+"""
+Crawler
+Asyncio crawl engine with per-host politeness and a global concurrency cap
+"""
+
+import asyncio
+import time
+from urllib.parse import urlparse
+
+from requests.adapters import HTTPAdapter
+
+from crawl_frontier import CrawlFrontier, DONE, MEMORY
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_HOST_DELAY = 1.0
+
+
+def configure_session(session, pool_size=DEFAULT_MAX_CONCURRENCY):
+    """Mount connection pools large enough for `pool_size` concurrent requests"""
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class CrawlEngine:
+    """Fetch pages concurrently over a shared requests.Session
+
+    Requests to different hosts run in parallel, up to `max_concurrency`
+    at once. Each host gets at most `max_per_host` requests in flight and
+    request starts are spaced at least `per_host_delay` seconds apart.
+    Blocking I/O and page processing run in worker threads so the event
+    loop only schedules. With an HTTPCache, requests for pages fetched
+    before carry conditional headers. Create the engine inside the running
+    event loop.
+    """
+
+    def __init__(self, session, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 per_host_delay=DEFAULT_HOST_DELAY, max_per_host=1, timeout=15, http_cache=None):
+        """Configure limits around a shared session"""
+        self.session = session
+        self.http_cache = http_cache
+        self.per_host_delay = per_host_delay
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._global = asyncio.Semaphore(self.max_concurrency)
+        self._hosts = {}
+
+    def _host(self, url):
+        """Return (semaphore, lock, state) for the URL's host"""
+        host = urlparse(url).netloc.lower()
+        if host not in self._hosts:
+            self._hosts[host] = (asyncio.Semaphore(self.max_per_host), asyncio.Lock(), {'next_start': 0.0})
+        return self._hosts[host]
+
+    async def _wait_for_turn(self, url):
+        """Sleep until the host's politeness delay allows another request"""
+        _, lock, state = self._host(url)
+        async with lock:
+            now = time.monotonic()
+            start = max(now, state['next_start'])
+            state['next_start'] = start + self.per_host_delay
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def fetch(self, url):
+        """GET url once the host and global limits allow it (conditionally if cached)"""
+        headers = self.http_cache.conditional_headers(url) if self.http_cache else None
+        host_slots, _, _ = self._host(url)
+        async with host_slots:
+            await self._wait_for_turn(url)
+            async with self._global:
+                return await asyncio.to_thread(
+                    self.session.get, url, headers=headers, timeout=self.timeout, allow_redirects=True
+                )
+
+    async def crawl(self, start_url, process, max_pages=1, on_error=None, frontier=None):
+        """Crawl from start_url until max_pages pages were scraped successfully
+
+        `process(url, response)` runs in a worker thread and returns
+        (item, links): item is stored unless None, and links are queued
+        one level deeper. Only pages that produced an item count towards
+        max_pages, so failed or skipped pages are replaced by other
+        discovered URLs; no more pages are fetched than could still be
+        needed. Pages are fetched and processed concurrently; items come
+        back in discovery order. With a persistent CrawlFrontier an
+        interrupted crawl picks up where it stopped. `on_error(url, error)`
+        is called for failed pages.
+        """
+        if frontier is None:
+            frontier = CrawlFrontier(MEMORY, start_url)
+        frontier.add(start_url, depth=0)
+        scraped = frontier.counts().get(DONE, 0)
+        pending = {}
+
+        async def visit(url):
+            response = await self.fetch(url)
+            return await asyncio.to_thread(process, url, response)
+
+        while True:
+            slots = min(self.max_concurrency, max_pages - scraped) - len(pending)
+            if slots > 0:
+                for url, depth in frontier.claim(slots):
+                    pending[asyncio.ensure_future(visit(url))] = (url, depth)
+            if not pending:
+                break
+
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                url, depth = pending.pop(task)
+                try:
+                    item, links = task.result()
+                except Exception as e:
+                    frontier.complete(url, error=str(e))
+                    if on_error:
+                        on_error(url, e)
+                    continue
+
+                frontier.complete(url, item)
+                if item is not None:
+                    scraped += 1
+                if scraped < max_pages:
+                    frontier.add_many(links, depth=depth + 1)
+
+        # URLs still queued once max_pages succeeded are not needed
+        frontier.skip_pending()
+        return list(frontier.results())
@@ -7,12 +7,21 @@ import json
 import csv
 from pathlib import Path
 from datetime import datetime
-from utils import print_success, print_error, print_info, print_warning
+from utils import print_success, print_error, print_info, print_warning, SYSTEM_PROMPT
+from jsonl_store import JsonlCorpus, file_fingerprint
+from compact_store import CompactExampleStore
+from reference_index import ReferenceIndex, QURAN, format_citation
+from near_duplicates import NearDuplicateIndex, example_text
+from dedup_index import DedupIndex
+from dataset_split import split_jsonl, DEFAULT_SEED
+from token_counter import ExampleTokenCounter, training_cost, DEFAULT_TRAINING_MODEL, DEFAULT_EPOCHS
+from data_validator import validate_file
+from corpus_stats import CorpusStats, LENGTH_BUCKETS, length_bucket, load_stats, save_stats
 from tabulate import tabulate
-import random
+import shutil
 
 class DataManager:
-    def __init__(self):
+    def __init__(self, retrieval_index=None):
         """Initialize data manager"""
         self.project_root = Path(__file__).parent.parent
         self.data_dir = self.project_root / "data"
@@ -22,9 +31,34 @@ class DataManager:
         # Create data directory if it doesn't exist
         self.data_dir.mkdir(exist_ok=True)
         
-        # Training data storage
-        self.training_data = []
-        self.validation_data = []
+        # Training data storage (lazy, memory-mapped views over the JSONL files)
+        self.training_data = None
+        self.validation_data = None
+        
+        # Digests of the training and validation examples, so duplicates are rejected on insert
+        self.dedup_index = DedupIndex(self.training_file, Path(__file__).parent / "cache" / "islamic_training.dedup")
+        self.validation_dedup_index = DedupIndex(self.validation_file,
+                                                 Path(__file__).parent / "cache" / "islamic_validation.dedup")
+        
+        # Exact chat-format token counts, cached per example
+        self.token_counter = ExampleTokenCounter(Path(__file__).parent / "cache" / "token_counts.sqlite")
+        
+        # Running statistics per data file: (stats, fingerprint, tokenizer)
+        self._stats = {}
+        
+        # Optional search index for prompt grounding; new examples are indexed on append
+        self.retrieval_index = retrieval_index
+        if retrieval_index is not None:
+            retrieval_index.watch_jsonl(self.training_file)
+        
+        # Citation index over the training set, built on first use
+        self._references = None
+        self._references_generation = None
+        self._references_indexed = 0
+        
+        # Near-duplicate index over the training set, built on first use
+        self._near_duplicates = None
+        self._near_duplicates_generation = None
         
         # Load existing data if available
         self._load_existing_data()
@@ -32,26 +66,15 @@ class DataManager:
         print_success("📊 Data Manager initialized")
 
     def _load_existing_data(self):
-        """Load existing training data"""
-        if self.training_file.exists():
-            try:
-                with open(self.training_file, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        if line.strip():
-                            self.training_data.append(json.loads(line))
-                print_info(f"📥 Loaded {len(self.training_data)} existing training examples")
-            except Exception as e:
-                print_warning(f"⚠️ Could not load existing training data: {e}")
-        
-        if self.validation_file.exists():
-            try:
-                with open(self.validation_file, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        if line.strip():
-                            self.validation_data.append(json.loads(line))
-                print_info(f"📥 Loaded {len(self.validation_data)} existing validation examples")
-            except Exception as e:
-                print_warning(f"⚠️ Could not load existing validation data: {e}")
+        """Index existing training data without keeping it in memory"""
+        self.training_data = JsonlCorpus(self.training_file)
+        self.validation_data = JsonlCorpus(self.validation_file)
+        
+        for name, corpus in (("training", self.training_data), ("validation", self.validation_data)):
+            if corpus:
+                print_info(f"📥 Indexed {len(corpus)} existing {name} examples")
+            if corpus.skipped_lines:
+                print_warning(f"⚠️ Skipped {corpus.skipped_lines} unreadable lines in {corpus.file_path.name}")
 
     def create_training_example(self, question, answer, source, reference, category="General"):
         """Create a single training example"""
@@ -59,7 +82,7 @@ class DataManager:
             "messages": [
                 {
                     "role": "system",
-                    "content": "You are an Islamic scholar assistant specializing in Quran and the 6 Sahih Hadith collections (Bukhari, Muslim, Abu Dawood, Tirmidhi, Nasa'i, Ibn Majah). Always provide exact verse/hadith references. For non-Islamic questions, politely indicate you can search for general information."
+                    "content": SYSTEM_PROMPT
                 },
                 {
                     "role": "user",
@@ -75,6 +98,78 @@ class DataManager:
         }
         return example
 
+    def load_compact_store(self, validation=False):
+        """Load the training (or validation) set into a compact column store
+
+        The store keeps one copy of the system prompt and each category and
+        only rebuilds full chat examples on access or export; see
+        CompactExampleStore.write_jsonl.
+        """
+        corpus = self.validation_data if validation else self.training_data
+        store = CompactExampleStore.from_examples(corpus)
+        print_info(f"🗜️ Loaded {len(store)} examples into compact store")
+        return store
+
+    def add_training_examples(self, examples):
+        """Append examples to the training file, skipping ones already present
+
+        Examples already in the validation file are skipped as well, so a
+        split's evaluation set never leaks back into training. Returns the
+        number of examples actually added.
+        """
+        new, duplicates = self.dedup_index.filter_new(examples, also=[self.validation_dedup_index])
+        if duplicates:
+            print_warning(f"⚠️ Skipped {duplicates} duplicate examples")
+        if not new:
+            return 0
+
+        stats = self.corpus_stats()
+        appended = self._append_training_data(example for example, _ in new)
+        if appended:
+            self.dedup_index.record(digest for _, digest in new)
+            self._record_stats(stats, self.training_data, added=[example for example, _ in new])
+            if self.retrieval_index is not None:
+                self.retrieval_index.sync_jsonl(self.training_file)
+        return appended
+
+    def _stats_path(self, corpus):
+        """Statistics file kept next to a JSONL file"""
+        return corpus.file_path.with_name(corpus.file_path.stem + ".stats.json")
+
+    def corpus_stats(self, validation=False):
+        """Current statistics of the training (or validation) set
+
+        Served from memory or the stats file next to the data; the corpus
+        is only walked when the file changed behind our back (or was split).
+        """
+        corpus = self.validation_data if validation else self.training_data
+        fingerprint = file_fingerprint(corpus.file_path)
+        tokenizer = self.token_counter.tokenizer
+        cached = self._stats.get(corpus.file_path)
+        if cached is not None and cached[1:] == (fingerprint, tokenizer):
+            return cached[0]
+        
+        stats = load_stats(self._stats_path(corpus), fingerprint, tokenizer)
+        if stats is None:
+            stats = CorpusStats()
+            for example, tokens in self.token_counter.count_examples(corpus):
+                stats.add(example, tokens)
+            save_stats(self._stats_path(corpus), stats, fingerprint, tokenizer)
+        self._stats[corpus.file_path] = (stats, fingerprint, tokenizer)
+        return stats
+
+    def _record_stats(self, stats, corpus, added=(), removed=()):
+        """Apply inserted/deleted examples to stats taken before the change, and persist them"""
+        for example, tokens in self.token_counter.count_examples(added):
+            stats.add(example, tokens)
+        for example, tokens in self.token_counter.count_examples(removed):
+            stats.remove(example, tokens)
+        
+        fingerprint = file_fingerprint(corpus.file_path)
+        tokenizer = self.token_counter.tokenizer
+        save_stats(self._stats_path(corpus), stats, fingerprint, tokenizer)
+        self._stats[corpus.file_path] = (stats, fingerprint, tokenizer)
+
     def generate_sample_data(self, count=30):
         """Generate sample training data"""
         sample_data = [
@@ -153,6 +248,7 @@ class DataManager:
         # Generate more examples by cycling through the base set
         generated_count = 0
         base_count = len(sample_data)
+        new_examples = []
         
         while generated_count < count:
             for base_example in sample_data:
@@ -167,11 +263,12 @@ class DataManager:
                     base_example["category"]
                 )
                 
-                self.training_data.append(example)
+                new_examples.append(example)
                 generated_count += 1
         
-        self._save_training_data()
-        print_success(f"✅ Generated {count} training examples")
+        added = self.add_training_examples(new_examples)
+        print_success(f"✅ Generated {added} new training examples")
+        return added
 
     def manual_data_entry(self):
         """Manual training data entry"""
@@ -203,9 +300,8 @@ class DataManager:
                 
                 # Create and add example
                 example = self.create_training_example(question, answer, source, reference, category)
-                self.training_data.append(example)
-                
-                print_success("✅ Example added successfully!")
+                if self.add_training_examples([example]):
+                    print_success("✅ Example added successfully!")
                 
                 continue_entry = input("➕ Add another example? (y/n): ").strip().lower()
                 if continue_entry != 'y':
@@ -216,7 +312,6 @@ class DataManager:
                 break
         
         if self.training_data:
-            self._save_training_data()
             print_success(f"💾 Saved {len(self.training_data)} training examples")
 
     def load_from_template(self):
@@ -233,6 +328,7 @@ class DataManager:
             with open(template_file, 'r', encoding='utf-8') as f:
                 template_data = json.load(f)
             
+            new_examples = []
             for item in template_data:
                 example = self.create_training_example(
                     item["question"],
@@ -241,9 +337,9 @@ class DataManager:
                     item["reference"],
                     item.get("category", "General")
                 )
-                self.training_data.append(example)
+                new_examples.append(example)
             
-            self._save_training_data()
+            self.add_training_examples(new_examples)
             print_success(f"✅ Loaded {len(template_data)} examples from template")
             
         except Exception as e:
@@ -283,6 +379,7 @@ class DataManager:
             with open(csv_path, 'r', encoding='utf-8') as f:
                 reader = csv.DictReader(f)
                 loaded_count = 0
+                new_examples = []
                 
                 for row in reader:
                     if all(key in row for key in ['question', 'answer', 'source', 'reference']):
@@ -293,12 +390,12 @@ class DataManager:
                             row['reference'],
                             row.get('category', 'General')
                         )
-                        self.training_data.append(example)
+                        new_examples.append(example)
                         loaded_count += 1
                     else:
                         print_warning(f"⚠️ Skipping row with missing required fields: {row}")
                 
-                self._save_training_data()
+                self.add_training_examples(new_examples)
                 print_success(f"✅ Loaded {loaded_count} examples from CSV")
                 
         except Exception as e:
@@ -334,102 +431,103 @@ class DataManager:
         except Exception as e:
             print_error(f"❌ Failed to export CSV: {e}")
 
-    def split_train_validation(self, validation_ratio=0.2):
-        """Split data into training and validation sets"""
-        if not self.training_data:
+    def split_train_validation(self, validation_ratio=0.2, seed=DEFAULT_SEED, stratify=True):
+        """Split data into training and validation sets
+
+        Re-splits the union of both files without loading them. Each example
+        is assigned by hash(example, seed), so examples keep their side as the
+        corpus grows; with `stratify`, every category gets its share of
+        validation examples, and at least one if it has two or more.
+        """
+        if not self.training_data and not self.validation_data:
             print_warning("⚠️ No training data to split")
             return
         
-        # Shuffle data
-        shuffled_data = self.training_data.copy()
-        random.shuffle(shuffled_data)
-        
-        # Calculate split point
-        total_count = len(shuffled_data)
-        validation_count = int(total_count * validation_ratio)
-        train_count = total_count - validation_count
-        
-        # Split data
-        self.validation_data = shuffled_data[:validation_count]
-        self.training_data = shuffled_data[validation_count:]
-        
-        # Save both sets
-        self._save_training_data()
-        self._save_validation_data()
+        splitter, skipped = split_jsonl([self.training_file, self.validation_file], self.training_file,
+                                        self.validation_file, validation_ratio, seed, stratify)
+        self.training_data.refresh()
+        self.validation_data.refresh()
         
+        if skipped:
+            print_warning(f"⚠️ Skipped {skipped} unreadable lines")
+        train_count = sum(train for train, _ in splitter.counts.values())
+        validation_count = sum(validation for _, validation in splitter.counts.values())
         print_success(f"✅ Split data: {train_count} training, {validation_count} validation examples")
+        return splitter.counts
 
-    def _save_training_data(self):
-        """Save training data to JSONL file"""
+    def _append_training_data(self, examples):
+        """Append new examples to the training JSONL file; return how many were written"""
         try:
-            with open(self.training_file, 'w', encoding='utf-8') as f:
-                for example in self.training_data:
-                    f.write(json.dumps(example, ensure_ascii=False) + '\n')
+            appended = self.training_data.extend(examples)
+            print_info(f"💾 Appended {appended} training examples")
+            return appended
+        except Exception as e:
+            print_error(f"❌ Failed to append training data: {e}")
+            return 0
+
+    def _save_training_data(self, examples):
+        """Compact the training JSONL file to the given examples
+
+        Only needed after destructive operations (cleaning, splitting);
+        new examples go through the append-only path instead.
+        """
+        try:
+            self.training_data.rewrite(examples)
             print_info(f"💾 Saved {len(self.training_data)} training examples")
+            return True
         except Exception as e:
             print_error(f"❌ Failed to save training data: {e}")
+            return False
 
-    def _save_validation_data(self):
+    def _save_validation_data(self, examples):
         """Save validation data to JSONL file"""
         try:
-            with open(self.validation_file, 'w', encoding='utf-8') as f:
-                for example in self.validation_data:
-                    f.write(json.dumps(example, ensure_ascii=False) + '\n')
+            self.validation_data.rewrite(examples)
             print_info(f"💾 Saved {len(self.validation_data)} validation examples")
         except Exception as e:
             print_error(f"❌ Failed to save validation data: {e}")
 
-    def validate_data_format(self):
-        """Validate training data format for OpenAI fine-tuning"""
+    def validate_data_format(self, workers=None):
+        """Validate training data format for OpenAI fine-tuning
+
+        Streams the training file through data_validator and writes the
+        full report to data/<name>.validation.json.
+        """
         if not self.training_data:
             print_warning("⚠️ No training data to validate")
             return False
         
-        valid_count = 0
-        issues = []
-        
-        for i, example in enumerate(self.training_data):
-            try:
-                # Check required structure
-                if 'messages' not in example:
-                    issues.append(f"Example {i}: Missing 'messages' field")
-                    continue
-                
-                messages = example['messages']
-                if len(messages) != 3:
-                    issues.append(f"Example {i}: Should have exactly 3 messages (system, user, assistant)")
-                    continue
-                
-                # Check message roles
-                expected_roles = ['system', 'user', 'assistant']
-                for j, msg in enumerate(messages):
-                    if 'role' not in msg or 'content' not in msg:
-                        issues.append(f"Example {i}, Message {j}: Missing 'role' or 'content'")
-                        continue
-                    
-                    if msg['role'] != expected_roles[j]:
-                        issues.append(f"Example {i}, Message {j}: Expected role '{expected_roles[j]}', got '{msg['role']}'")
-                        continue
-                
-                valid_count += 1
-                
-            except Exception as e:
-                issues.append(f"Example {i}: Validation error - {e}")
+        report_path = self.training_file.with_suffix(".validation.json")
+        report = validate_file(self.training_file, workers=workers, report_path=report_path)
+        issue_total = sum(report['issue_counts'].values())
         
         # Print validation results
         print_info(f"📊 Validation Results:")
-        print_info(f"   Valid examples: {valid_count}/{len(self.training_data)}")
-        
-        if issues:
-            print_warning(f"⚠️ Found {len(issues)} issues:")
-            for issue in issues[:10]:  # Show first 10 issues
-                print_warning(f"   - {issue}")
-            if len(issues) > 10:
-                print_warning(f"   ... and {len(issues) - 10} more issues")
+        print_info(f"   Valid examples: {report['valid']}/{report['records']} ({report['seconds']:.2f}s)")
+        
+        if issue_total:
+            print_warning(f"⚠️ Found {issue_total} issues:")
+            for issue in report['issues'][:10]:  # Show first 10 issues
+                print_warning(f"   - Line {issue['line']}: {issue['message']}")
+            if issue_total > 10:
+                print_warning(f"   ... and {issue_total - 10} more issues")
+            print_info(f"📄 Full report: {report_path}")
         else:
             print_success("✅ All training data is valid!")
         
-        return len(issues) == 0
+        return issue_total == 0
+
+    def token_usage(self, model=DEFAULT_TRAINING_MODEL):
+        """Token totals of both sets and the projected fine-tuning cost per epoch"""
+        training = self.corpus_stats()
+        validation = self.corpus_stats(validation=True)
+        return {
+            'training_tokens': training.tokens,
+            'validation_tokens': validation.tokens,
+            'exact': self.token_counter.exact,
+            'model': model,
+            'cost_per_epoch': training_cost(training.tokens, model)
+        }
 
     def get_statistics(self):
         """Get statistics about the training data"""
@@ -437,39 +535,50 @@ class DataManager:
             print_warning("⚠️ No training data available")
             return
         
-        # Category distribution
-        categories = {}
-        total_chars = 0
-        total_tokens_estimate = 0
-        
-        for example in self.training_data:
-            category = example.get('category', 'Unknown')
-            categories[category] = categories.get(category, 0) + 1
-            
-            # Estimate character and token counts
-            for message in example['messages']:
-                content = message['content']
-                total_chars += len(content)
-                total_tokens_estimate += len(content.split()) * 1.3  # Rough token estimate
+        stats = self.corpus_stats()
+        usage = self.token_usage()
+        token_label = "Tokens" if usage['exact'] else "Tokens (estimated)"
         
         # Create statistics table
         stats_data = [
-            ["Total Examples", len(self.training_data)],
+            ["Total Examples", stats.examples],
             ["Validation Examples", len(self.validation_data)],
-            ["Total Characters", f"{total_chars:,}"],
-            ["Estimated Tokens", f"{int(total_tokens_estimate):,}"],
-            ["Average Chars/Example", f"{total_chars // len(self.training_data):,}"]
+            ["Total Characters", f"{stats.chars:,}"],
+            [f"Training {token_label}", f"{usage['training_tokens']:,}"],
+            [f"Validation {token_label}", f"{usage['validation_tokens']:,}"],
+            ["Average Chars/Example", f"{stats.chars // max(stats.examples, 1):,}"],
+            ["Answers Citing a Source", f"{stats.cited:,} ({stats.cited / max(stats.examples, 1) * 100:.1f}%)"],
+            ["Citations With Reference", f"{stats.with_reference:,}"]
         ]
         
         print_info("📊 Training Data Statistics:")
         print(tabulate(stats_data, headers=["Metric", "Value"], tablefmt="grid"))
         
+        # Fine-tuning cost projection
+        if usage['cost_per_epoch'] is not None:
+            print_info(f"\n💰 Fine-tuning Cost ({usage['model']}):")
+            cost_data = [[epochs, f"{usage['training_tokens'] * epochs:,}", f"${usage['cost_per_epoch'] * epochs:,.2f}"]
+                         for epochs in range(1, DEFAULT_EPOCHS + 2)]
+            print(tabulate(cost_data, headers=["Epochs", "Billed Tokens", "Cost"], tablefmt="grid"))
+        
+        # Example length histogram
+        print_info("\n📏 Example Length (tokens):")
+        labels = [length_bucket(bound) for bound in LENGTH_BUCKETS] + [length_bucket(LENGTH_BUCKETS[-1] + 1)]
+        length_data = [[label, stats.lengths[label]] for label in labels if label in stats.lengths]
+        print(tabulate(length_data, headers=["Length", "Examples"], tablefmt="grid"))
+        
         # Category distribution
-        if categories:
+        if stats.categories:
             print_info("\n📂 Category Distribution:")
-            category_data = [[cat, count, f"{count/len(self.training_data)*100:.1f}%"] 
-                           for cat, count in sorted(categories.items(), key=lambda x: x[1], reverse=True)]
+            category_data = [[cat, count, f"{count/stats.examples*100:.1f}%"] 
+                           for cat, count in sorted(stats.categories.items(), key=lambda x: x[1], reverse=True)]
             print(tabulate(category_data, headers=["Category", "Count", "Percentage"], tablefmt="grid"))
+        
+        # Most cited sources
+        if stats.sources:
+            print_info("\n📚 Top Sources:")
+            source_data = sorted(stats.sources.items(), key=lambda x: x[1], reverse=True)[:10]
+            print(tabulate(source_data, headers=["Source", "Examples"], tablefmt="grid"))
 
     def clean_data(self):
         """Clean and deduplicate training data"""
@@ -481,23 +590,98 @@ class DataManager:
         
         # Remove duplicates based on question content
         seen_questions = set()
-        cleaned_data = []
+        kept_indices = []
+        removed = []
         
-        for example in self.training_data:
+        for i, example in enumerate(self.training_data):
             question = example['messages'][1]['content'].strip().lower()
             if question not in seen_questions:
                 seen_questions.add(question)
-                cleaned_data.append(example)
+                kept_indices.append(i)
+            else:
+                removed.append(example)
         
-        self.training_data = cleaned_data
-        removed_count = original_count - len(cleaned_data)
+        removed_count = original_count - len(kept_indices)
         
         if removed_count > 0:
-            self._save_training_data()
+            stats = self.corpus_stats()
+            if self._save_training_data(self.training_data[i] for i in kept_indices):
+                self._record_stats(stats, self.training_data, removed=removed)
             print_success(f"✅ Removed {removed_count} duplicate examples")
         else:
             print_info("ℹ️ No duplicates found")
 
+    def near_duplicate_index(self):
+        """Return the near-duplicate index, indexing only examples added since the last call"""
+        corpus = self.training_data
+        index = self._near_duplicates
+        if index is None or self._near_duplicates_generation != corpus.generation or len(index) > len(corpus):
+            # First use, or the file was rewritten (cleaned, split, cleared)
+            index = NearDuplicateIndex()
+            self._near_duplicates = index
+            self._near_duplicates_generation = corpus.generation
+        
+        if len(index) < len(corpus):
+            new_count = len(corpus) - len(index)
+            index.add_many(example_text(corpus[i]) for i in range(len(index), len(corpus)))
+            print_info(f"🔍 Indexed {new_count} examples for near-duplicate detection")
+        return index
+
+    def reference_index(self):
+        """Return the citation index, indexing only examples added since the last call
+
+        Scraped files can be added to the same index with sync_directory().
+        """
+        corpus = self.training_data
+        origin = self.training_file.name
+        if self._references is None:
+            self._references = ReferenceIndex()
+        if self._references_generation != corpus.generation or self._references_indexed > len(corpus):
+            # First use, or the file was rewritten (cleaned, split, cleared)
+            self._references.remove_origin(origin)
+            self._references_generation = corpus.generation
+            self._references_indexed = 0
+        
+        if self._references_indexed < len(corpus):
+            new_count = len(corpus) - self._references_indexed
+            for i in range(self._references_indexed, len(corpus)):
+                self._references.add_example(corpus[i], origin, i + 1)
+            self._references_indexed = len(corpus)
+            print_info(f"🔖 Indexed citations of {new_count} examples")
+        return self._references
+
+    def citation_report(self):
+        """Print citation coverage per collection and the most cited references"""
+        index = self.reference_index()
+        coverage = index.coverage()
+        table = [[entry['name'], entry['citations'], entry['distinct']] for entry in coverage.values()]
+        print_info("🔖 Citation coverage:")
+        print(tabulate(table, headers=["Collection", "Citations", "Distinct cited"], tablefmt="grid"))
+        quran = coverage[QURAN]
+        print_info(f"📖 Quran: {quran['distinct']}/{quran['total']} ayat cited ({quran['percent']:.2f}%)")
+        for citation, count in index.most_cited(5):
+            print_info(f"   {format_citation(citation)}: cited by {count} documents")
+        return coverage
+
+    def find_near_duplicates(self, max_clusters=10):
+        """Report clusters of near-duplicate (paraphrased) training examples"""
+        if not self.training_data:
+            print_warning("⚠️ No training data available")
+            return []
+        
+        clusters = self.near_duplicate_index().clusters()
+        if not clusters:
+            print_info("ℹ️ No near-duplicates found")
+            return clusters
+        
+        redundant = sum(len(cluster) - 1 for cluster in clusters)
+        print_info(f"🔍 Found {len(clusters)} near-duplicate clusters ({redundant} redundant examples)")
+        cluster_data = [[len(cluster), ", ".join(str(i) for i in cluster[:5]),
+                         self.training_data[cluster[0]]['messages'][1]['content'][:60]]
+                        for cluster in clusters[:max_clusters]]
+        print(tabulate(cluster_data, headers=["Size", "Examples", "Question"], tablefmt="grid"))
+        return clusters
+
     def backup_data(self):
         """Create a backup of current training data"""
         if not self.training_data:
@@ -508,9 +692,7 @@ class DataManager:
         backup_file = self.data_dir / f"backup_training_{timestamp}.jsonl"
         
         try:
-            with open(backup_file, 'w', encoding='utf-8') as f:
-                for example in self.training_data:
-                    f.write(json.dumps(example, ensure_ascii=False) + '\n')
+            shutil.copyfile(self.training_file, backup_file)
             
             print_success(f"✅ Backup created: {backup_file}")
             
@@ -526,14 +708,11 @@ class DataManager:
         confirm = input(f"⚠️ Are you sure you want to delete all {len(self.training_data)} training examples? (yes/no): ").strip().lower()
         
         if confirm == 'yes':
-            self.training_data = []
-            self.validation_data = []
-            
             # Remove files
-            if self.training_file.exists():
-                self.training_file.unlink()
-            if self.validation_file.exists():
-                self.validation_file.unlink()
+            self.training_data.clear()
+            self.validation_data.clear()
+            self._record_stats(CorpusStats(), self.training_data)
+            self._record_stats(CorpusStats(), self.validation_data)
             
             print_success("✅ All training data cleared")
         else:
@@ -0,0 +1,335 @@
+"""
+Data Validator
+Streaming, process-parallel validation of JSONL/JSON training files
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import deque
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from token_counter import DEFAULT_ENCODING, count_message_tokens, is_exact
+
+CHAT = 'chat'  # {"messages": [...]} fine-tuning examples
+QA = 'qa'      # {"question", "answer", "source", "reference"} upload records
+
+QA_REQUIRED_FIELDS = ['question', 'answer', 'source', 'reference']
+VALID_ROLES = ('system', 'user', 'assistant')
+
+# OpenAI rejects training examples longer than this (gpt-4o-mini)
+DEFAULT_MAX_TOKENS = 65536
+DEFAULT_CHUNK_LINES = 2000
+DEFAULT_MAX_ISSUES = 1000
+
+_READ_SIZE = 1024 * 1024
+# Longest token prefix that can sit undecodable at the buffer end ("fals", "\\u00e", "-1.5e")
+_PARTIAL_TOKEN = 8
+
+
+def _digest(*parts):
+    """8-byte content digest used for duplicate detection"""
+    payload = "\x00".join(" ".join(str(part).lower().split()) for part in parts)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=8).digest()
+
+
+def _check_chat(record, max_tokens, encoding_name):
+    """Issues of one chat example, plus its token count and digest"""
+    messages = record.get('messages')
+    if messages is None:
+        return [('missing_messages', "Missing 'messages' field")], 0, None
+    if not isinstance(messages, list) or not messages:
+        return [('invalid_messages', "'messages' must be a non-empty list")], 0, None
+
+    issues = []
+    roles = []
+    for position, message in enumerate(messages):
+        if not isinstance(message, dict):
+            issues.append(('invalid_message', f"Message {position}: must be an object"))
+            continue
+        if 'role' not in message or 'content' not in message:
+            issues.append(('missing_field', f"Message {position}: Missing 'role' or 'content'"))
+            continue
+        role, content = message['role'], message['content']
+        if role not in VALID_ROLES:
+            issues.append(('invalid_role', f"Message {position}: Unknown role '{role}'"))
+        if not isinstance(content, str) or not content.strip():
+            issues.append(('empty_content', f"Message {position}: Empty '{role}' content"))
+        roles.append(role)
+
+    # Optional system prompt, then user/assistant turns ending with the assistant
+    conversation = roles[1:] if roles[:1] == ['system'] else roles
+    expected = ['user', 'assistant'] * (len(conversation) // 2 + 1)
+    if not conversation or conversation != expected[:len(conversation)] or conversation[-1] != 'assistant':
+        issues.append(('role_order', f"Roles {roles} must be [system,] user, assistant, ... ending with assistant"))
+
+    if issues:
+        return issues, 0, None
+
+    tokens = count_message_tokens(messages, encoding_name)
+    if tokens > max_tokens:
+        issues.append(('too_many_tokens', f"{tokens} tokens exceeds the {max_tokens} token limit"))
+    question = next(m['content'] for m in messages if m['role'] == 'user')
+    answer = next(m['content'] for m in messages if m['role'] == 'assistant')
+    return issues, tokens, _digest(question, answer)
+
+
+def _check_qa(record, max_tokens, encoding_name):
+    """Issues of one question/answer upload record, plus its digest"""
+    missing = []
+    for field in QA_REQUIRED_FIELDS:
+        if field not in record:
+            missing.append(field)
+        elif not record[field] or not str(record[field]).strip():
+            missing.append(f"{field} (empty)")
+    if missing:
+        return [('missing_field', f"Missing fields: {', '.join(missing)}")], 0, None
+    return [], 0, _digest(record['question'], record['answer'])
+
+
+_CHECKS = {CHAT: _check_chat, QA: _check_qa}
+
+
+def validate_records(records, schema=CHAT, max_tokens=DEFAULT_MAX_TOKENS, encoding_name=DEFAULT_ENCODING):
+    """Validate (line, record index, raw line or decoded record) items
+
+    Runs in worker processes. Returns (issues, digests, ids, tokens) where
+    issues are (line, record, code, message) tuples and digests/ids are
+    (line, record, value) tuples for the parent's duplicate check.
+    """
+    check = _CHECKS[schema]
+    issues = []
+    digests = []
+    ids = []
+    tokens = 0
+    for line, index, item in records:
+        if isinstance(item, (str, bytes)):
+            try:
+                item = json.loads(item)
+            except ValueError as e:
+                issues.append((line, index, 'invalid_json', f"Invalid JSON: {e}"))
+                continue
+        if not isinstance(item, dict):
+            issues.append((line, index, 'not_object', "Must be an object/dictionary"))
+            continue
+
+        found, count, digest = check(item, max_tokens, encoding_name)
+        issues.extend((line, index, code, message) for code, message in found)
+        tokens += count
+        if digest is not None:
+            digests.append((line, index, digest))
+        if 'id' in item:
+            ids.append((line, index, item['id']))
+    return issues, digests, ids, tokens
+
+
+def _iter_jsonl(path):
+    """Yield (line number, record index, raw line) for non-blank lines"""
+    index = 0
+    with open(path, 'rb') as f:
+        for line_number, line in enumerate(f, 1):
+            if line.strip():
+                index += 1
+                yield line_number, index, line
+
+
+def _iter_json_array(path):
+    """Yield (line number, record index, record) from a top-level JSON array
+
+    The file is decoded one element at a time from a sliding buffer, so
+    the whole array is never held in memory. The buffer only grows while
+    an element runs past its end; a malformed element stops the stream.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = f.read(_READ_SIZE)
+        line = 1
+        pos = 0
+        eof = len(buffer) < _READ_SIZE
+        index = 0
+        started = False
+
+        while True:
+            # Skip whitespace and separators, refilling the buffer as needed
+            while True:
+                while pos < len(buffer) and buffer[pos] in ' \t\r\n,[' and (started or buffer[pos] != ','):
+                    if buffer[pos] == '\n':
+                        line += 1
+                    elif buffer[pos] == '[':
+                        if started:
+                            break
+                        started = True
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    break
+                buffer, pos = f.read(_READ_SIZE), 0
+                eof = len(buffer) < _READ_SIZE
+
+            if pos >= len(buffer) or buffer[pos] == ']':
+                if not started:
+                    raise ValueError("JSON must be an array/list of objects")
+                return
+            if not started:
+                raise ValueError("JSON must be an array/list of objects")
+
+            while True:
+                try:
+                    record, end = decoder.raw_decode(buffer, pos)
+                    break
+                except json.JSONDecodeError as e:
+                    # Only an element cut off by the buffer end is worth reading more for;
+                    # a malformed one fails here instead of pulling in the rest of the file
+                    cut_off = e.pos >= len(buffer) - _PARTIAL_TOKEN or e.msg.startswith("Unterminated string")
+                    if eof or not cut_off:
+                        raise
+                    more = f.read(_READ_SIZE)
+                    eof = len(more) < _READ_SIZE
+                    buffer, pos = buffer[pos:] + more, 0
+
+            index += 1
+            yield line, index, record
+            line += buffer.count('\n', pos, end)
+            pos = end
+
+
+def _detect_format(path):
+    """'json' if the file starts with a JSON array, else 'jsonl'"""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        head = f.read(4096).lstrip()
+    return 'json' if head.startswith('[') else 'jsonl'
+
+
+def _until_error(items, errors):
+    """Yield from items, stopping at (and keeping) a JSON decoding error"""
+    try:
+        yield from items
+    except ValueError as e:
+        errors.append(e)
+
+
+def _chunks(items, size):
+    """Group an iterator into lists of `size` items"""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class _Report:
+    """Accumulates worker results in file order"""
+
+    def __init__(self, max_issues):
+        self.max_issues = max_issues
+        self.issues = []
+        self.issue_counts = {}
+        self.invalid = 0
+        self.records = 0
+        self.tokens = 0
+        self._digests = {}
+        self._ids = {}
+
+    def add_issue(self, line, index, code, message):
+        """Record one issue (details capped at max_issues, except file-level ones)"""
+        self.issue_counts[code] = self.issue_counts.get(code, 0) + 1
+        if len(self.issues) < self.max_issues or (line is None and index is None):
+            self.issues.append({'line': line, 'record': index, 'code': code, 'message': message})
+
+    def merge(self, chunk, result):
+        """Fold one chunk's result in; duplicates are judged against earlier lines
+
+        A record only ever belongs to one chunk, so invalid records are
+        counted per chunk rather than remembered for the whole file.
+        """
+        issues, digests, ids, tokens = result
+        self.records += len(chunk)
+        self.tokens += tokens
+        invalid = set()
+        for issue in issues:
+            self.add_issue(*issue)
+            invalid.add(issue[1])
+        for line, index, digest in digests:
+            first = self._digests.setdefault(digest, line)
+            if first != line:
+                self.add_issue(line, index, 'duplicate_example', f"Same question and answer as line {first}")
+                invalid.add(index)
+        for line, index, value in ids:
+            key = json.dumps(value, sort_keys=True)
+            first = self._ids.setdefault(key, line)
+            if first != line:
+                self.add_issue(line, index, 'duplicate_id', f"id {key} already used on line {first}")
+                invalid.add(index)
+        invalid.discard(None)
+        self.invalid += len(invalid)
+
+
+def validate_file(path, schema=CHAT, workers=None, chunk_lines=DEFAULT_CHUNK_LINES,
+                  max_tokens=DEFAULT_MAX_TOKENS, max_issues=DEFAULT_MAX_ISSUES,
+                  file_format=None, report_path=None):
+    """Validate a JSONL or JSON-array training file and return a report dict
+
+    Records are streamed from disk in chunks of `chunk_lines` and fanned out
+    to `workers` processes (one per CPU by default), with at most two
+    chunks per worker in flight. Beyond those chunks, memory grows only
+    with duplicate detection: a dict entry mapping an 8-byte digest to a
+    line number per distinct record, about 125 bytes each in CPython, plus
+    one entry per distinct id. Files that fit in one chunk are checked
+    in-process.
+    `file_format` ('jsonl' or 'json') is sniffed from the first bytes if
+    not given. The report lists issues with line numbers (the first
+    `max_issues` in full plus any file-level error, all of them in
+    `issue_counts`) and is also written as JSON to `report_path` if given.
+    """
+    path = Path(path)
+    started = time.monotonic()
+    file_format = file_format or _detect_format(path)
+    items = _iter_json_array(path) if file_format == 'json' else _iter_jsonl(path)
+    errors = []
+    chunks = _chunks(_until_error(items, errors), chunk_lines)
+    report = _Report(max_issues)
+    workers = workers or os.cpu_count() or 1
+
+    head = [chunk for chunk in (next(chunks, None), next(chunks, None)) if chunk is not None]
+    if workers == 1 or len(head) < 2:
+        for chunk in chain(head, chunks):
+            report.merge(chunk, validate_records(chunk, schema, max_tokens))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for chunk in chain(head, chunks):
+                pending.append((chunk, executor.submit(validate_records, chunk, schema, max_tokens)))
+                if len(pending) >= workers * 2:
+                    done_chunk, future = pending.popleft()
+                    report.merge(done_chunk, future.result())
+            while pending:
+                done_chunk, future = pending.popleft()
+                report.merge(done_chunk, future.result())
+
+    # A malformed JSON array ends the stream; what was read before it is kept
+    for e in errors:
+        message = f"Invalid JSON format: {e}" if isinstance(e, json.JSONDecodeError) else str(e)
+        report.add_issue(None, None, 'invalid_json', message)
+
+    result = {
+        'file': str(path),
+        'format': file_format,
+        'schema': schema,
+        'records': report.records,
+        'valid': report.records - report.invalid,
+        'invalid': report.invalid,
+        'tokens': report.tokens,
+        'tokens_exact': is_exact() if schema == CHAT else None,
+        'issue_counts': report.issue_counts,
+        'issues': report.issues,
+        'issues_truncated': sum(report.issue_counts.values()) > len(report.issues),
+        'seconds': round(time.monotonic() - started, 3),
+    }
+    if report_path is not None:
+        Path(report_path).write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding='utf-8')
+    return result
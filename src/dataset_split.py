@@ -0,0 +1,162 @@
+"""
+Dataset Split
+Deterministic, stratified train/validation split over streamed JSONL files
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+
+from dedup_index import example_digest
+from jsonl_store import read_jsonl
+
+DEFAULT_SEED = 42
+
+
+def validation_score(example, seed=DEFAULT_SEED):
+    """Uniform value in [0, 1) from hash(example id, seed)
+
+    The example id is its content digest (normalized question and answer),
+    so the score never depends on file order or on other examples.
+    """
+    keyed = hashlib.blake2b(example_digest(example), digest_size=8, key=str(seed).encode('ascii'))
+    return int.from_bytes(keyed.digest(), 'big') / 2 ** 64
+
+
+class StratifiedSplitter:
+    """Assign examples to training or validation one at a time
+
+    Without `stratify`, an example goes to validation when its score is
+    below `ratio`, so its side depends only on its content and the seed.
+    With `stratify`, `fit` first streams over the examples and fixes a
+    score threshold per category: the round(size * ratio) lowest-scoring
+    examples of each category go to validation. Each category with at
+    least two examples gets at least one validation example and keeps at
+    least `min_train` training examples. Assignments do not depend on file
+    order, except which identical copies of an example at a threshold go
+    to validation, and re-splitting a grown corpus only moves examples
+    near a category's threshold.
+    """
+
+    def __init__(self, ratio, seed=DEFAULT_SEED, stratify=True, min_train=1):
+        """Start with empty per-category counts"""
+        if not 0 < ratio < 1:
+            raise ValueError("validation ratio must be between 0 and 1")
+        self.ratio = ratio
+        self.seed = seed
+        self.stratify = stratify
+        self.min_train = min_train
+        self.thresholds = {}  # category -> (highest validation score, copies of it that go to validation)
+        self.counts = {}  # category -> [training, validation]
+        self._at_threshold = {}  # category -> copies of the threshold score assigned so far
+
+    def fit(self, examples):
+        """Compute per-category validation thresholds from one pass over examples
+
+        Only the scores are kept (8 bytes per example), not the examples.
+        Identical examples share a score; when copies sit at a threshold,
+        only as many as the quota has room for go to validation, the first
+        ones `assign` sees.
+        """
+        scores = {}
+        for example in examples:
+            category = example.get('category', 'General')
+            scores.setdefault(category, array('d')).append(validation_score(example, self.seed))
+
+        self.thresholds = {}
+        self._at_threshold = {}
+        for category, category_scores in scores.items():
+            size = len(category_scores)
+            quota = round(size * self.ratio)
+            if size >= 2:
+                quota = max(quota, 1)
+            quota = min(quota, max(size - self.min_train, 0))
+            if not quota:
+                self.thresholds[category] = (-1.0, 0)
+                continue
+            ranked = sorted(category_scores)
+            threshold = ranked[quota - 1]
+            below = bisect_left(ranked, threshold)
+            self.thresholds[category] = (threshold, quota - below)
+        return self
+
+    def assign(self, example):
+        """Return True if the example belongs in validation
+
+        Categories `fit` has not seen fall back to the unstratified rule.
+        """
+        score = validation_score(example, self.seed)
+        category = example.get('category', 'General')
+        if self.stratify and category in self.thresholds:
+            threshold, copies = self.thresholds[category]
+            if score == threshold:
+                taken = self._at_threshold.get(category, 0)
+                to_validation = taken < copies
+                self._at_threshold[category] = taken + 1
+            else:
+                to_validation = score < threshold
+        else:
+            to_validation = score < self.ratio
+
+        counts = self.counts.setdefault(category, [0, 0])
+        counts[1 if to_validation else 0] += 1
+        return to_validation
+
+
+def _temp_for(file_path):
+    """Open a temp file next to the target; return (file object, temp name)"""
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{file_path.name}.", suffix=".tmp", dir=file_path.parent)
+    return os.fdopen(fd, 'w', encoding='utf-8'), tmp_name
+
+
+def split_jsonl(sources, train_path, validation_path, ratio, seed=DEFAULT_SEED, stratify=True):
+    """Stream examples from the source JSONL files into training and validation files
+
+    With `stratify` the sources are read twice: once to fit the
+    per-category thresholds, once to write. Sources may include the
+    targets themselves (re-splitting the current training and validation
+    sets): both outputs are written to temp files and moved into place
+    only after the pass completes. Lines are read and
+    written one at a time, so files larger than memory are fine.
+    Returns the splitter, whose `counts` hold the per-category result, and
+    the number of unreadable lines skipped.
+    """
+    train_path, validation_path = Path(train_path), Path(validation_path)
+    sources = [source for source in sources if Path(source).exists()]
+    splitter = StratifiedSplitter(ratio, seed, stratify)
+    if stratify:
+        splitter.fit(example for source in sources
+                     for _, example in read_jsonl(source) if example is not None)
+    skipped = 0
+    outputs = []
+    try:
+        for target in (train_path, validation_path):
+            outputs.append(_temp_for(target))
+        train_file, validation_file = outputs[0][0], outputs[1][0]
+
+        for source in sources:
+            for _, example in read_jsonl(source):
+                if example is None:
+                    skipped += 1
+                    continue
+                output = validation_file if splitter.assign(example) else train_file
+                output.write(json.dumps(example, ensure_ascii=False) + '\n')
+
+        for output, _ in outputs:
+            output.flush()
+            os.fsync(output.fileno())
+            output.close()
+        os.replace(outputs[0][1], train_path)
+        os.replace(outputs[1][1], validation_path)
+    except BaseException:
+        for output, tmp_name in outputs:
+            output.close()
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+        raise
+
+    return splitter, skipped
@@ -0,0 +1,129 @@
+"""
+Dedup Index
+Persistent digest set of training examples for duplicate rejection on insert
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from jsonl_store import file_fingerprint, read_jsonl
+
+DIGEST_SIZE = 16
+
+
+def _normalize(text):
+    """Lower-case and collapse whitespace"""
+    return " ".join(str(text).lower().split())
+
+
+def example_digest(example):
+    """Digest of an example's normalized question and answer"""
+    messages = example.get('messages') or []
+    question = next((m.get('content', '') for m in messages if m.get('role') == 'user'), '')
+    answer = next((m.get('content', '') for m in messages if m.get('role') == 'assistant'), '')
+    payload = _normalize(question) + "\x00" + _normalize(answer)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=DIGEST_SIZE).digest()
+
+
+class DedupIndex:
+    """Set of example digests for a JSONL corpus, kept on disk next to a cache
+
+    Digests live in `<index_path>` (16 bytes each, append-only) and the
+    corpus fingerprint (size, mtime, inode) they describe in
+    `<index_path>.json`. The index is loaded on first use and rebuilt from
+    the JSONL file when it is missing or its fingerprint no longer matches,
+    e.g. after the corpus was cleaned, split or edited by hand.
+    """
+
+    def __init__(self, corpus_path, index_path):
+        """Point the index at a corpus; nothing is read until first use"""
+        self.corpus_path = Path(corpus_path)
+        self.index_path = Path(index_path)
+        self.meta_path = self.index_path.with_name(self.index_path.name + ".json")
+        self.rebuilds = 0
+        self._digests = None
+        self._fingerprint = None
+
+    def __len__(self):
+        self._ensure_current()
+        return len(self._digests)
+
+    def __contains__(self, example):
+        self._ensure_current()
+        return example_digest(example) in self._digests
+
+    def _ensure_current(self):
+        """Load or rebuild the digests if the corpus changed underneath us"""
+        fingerprint = file_fingerprint(self.corpus_path)
+        if self._digests is not None and fingerprint == self._fingerprint:
+            return
+        if not self._load(fingerprint):
+            self._rebuild(fingerprint)
+
+    def _load(self, fingerprint):
+        """Read the stored digests if they describe the current corpus"""
+        try:
+            meta = json.loads(self.meta_path.read_text(encoding='utf-8'))
+            data = self.index_path.read_bytes()
+        except (OSError, ValueError):
+            return False
+        if meta.get('fingerprint') != fingerprint or len(data) != meta.get('count', -1) * DIGEST_SIZE:
+            return False
+
+        self._digests = {data[i:i + DIGEST_SIZE] for i in range(0, len(data), DIGEST_SIZE)}
+        self._fingerprint = fingerprint
+        return True
+
+    def _rebuild(self, fingerprint):
+        """Hash every example of the corpus and store the digests"""
+        digests = set()
+        if fingerprint is not None:
+            for _, example in read_jsonl(self.corpus_path):
+                if example is not None:
+                    digests.add(example_digest(example))
+
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self.index_path.write_bytes(b"".join(digests))
+        self._digests = digests
+        self._write_meta(fingerprint)
+        self.rebuilds += 1
+
+    def _write_meta(self, fingerprint):
+        """Atomically record which corpus state the digests describe"""
+        self._fingerprint = fingerprint
+        tmp_path = self.meta_path.with_name(self.meta_path.name + ".tmp")
+        tmp_path.write_text(json.dumps({'fingerprint': fingerprint, 'count': len(self._digests)}), encoding='utf-8')
+        os.replace(tmp_path, self.meta_path)
+
+    def filter_new(self, examples, also=()):
+        """Split examples into (new, duplicate count), also dropping repeats within the batch
+
+        Examples found in any index of `also` (e.g. the validation set's)
+        count as duplicates too. Returns the new examples paired with their
+        digests, to pass to record() once they have been written to the corpus.
+        """
+        self._ensure_current()
+        for other in also:
+            other._ensure_current()
+        new = []
+        seen = set()
+        duplicates = 0
+        for example in examples:
+            digest = example_digest(example)
+            if digest in self._digests or digest in seen or any(digest in other._digests for other in also):
+                duplicates += 1
+                continue
+            seen.add(digest)
+            new.append((example, digest))
+        return new, duplicates
+
+    def record(self, digests):
+        """Add digests of examples just appended to the corpus"""
+        digests = [digest for digest in digests if digest not in self._digests]
+        if digests:
+            with open(self.index_path, 'ab') as f:
+                f.write(b"".join(digests))
+            self._digests.update(digests)
+        self._write_meta(file_fingerprint(self.corpus_path))
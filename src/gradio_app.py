@@ -11,64 +11,78 @@ from datetime import datetime
 from data_manager import DataManager
 from islamic_aitrainer import IslamicAITrainer
 from web_scraper import WebScraper
+from ai_extraction import QAExtractor, ISLAMIC_EXTRACTION_PROMPT, GENERAL_EXTRACTION_PROMPT
+from llm_cache import LLMCache
+from text_chunker import TextChunker
+from token_counter import DEFAULT_EPOCHS
+from pdf_extractor import extract_pdf_to_file
+from reference_index import parse_reference, format_citation
+from retrieval_index import RetrievalIndex, load_embedder, grounding_prompt, DEFAULT_TOP_K
+from chat_stream import stream_chat, format_stream_stats
+from model_evaluator import ModelEvaluator, comparison_markdown
 from utils import print_success, print_error, print_info, print_warning
 import pandas as pd
-import PyPDF2
-import pdfplumber
 from openai import OpenAI
 
 class GradioApp:
     def __init__(self):
         """Initialize the Gradio application"""
-        self.data_manager = DataManager()
+        self.project_root = Path(__file__).parent
+        
+        # Local passage search over training Q&A and scraped texts, for grounding answers
+        embedding_model = os.getenv("RETRIEVAL_EMBEDDING_MODEL", "")
+        self.retrieval_index = RetrievalIndex(
+            self.project_root / "cache" / "retrieval.sqlite",
+            embedder=load_embedder(embedding_model) if embedding_model else None
+        )
+        self.retrieval_top_k = int(os.getenv("RETRIEVAL_TOP_K", str(DEFAULT_TOP_K)))
+        
+        self.data_manager = DataManager(retrieval_index=self.retrieval_index)
         self.trainer = None
-        self.web_scraper = WebScraper()
+        self.openai_client = None
+        
+        # On-disk cache of LLM results, shared with the web scraper
+        self.llm_cache = LLMCache(
+            self.project_root / "cache" / "llm_cache.sqlite",
+            max_bytes=int(os.getenv("LLM_CACHE_MAX_MB", "512")) * 1024 * 1024,
+            max_age=float(os.getenv("LLM_CACHE_MAX_AGE_DAYS", "30")) * 24 * 3600
+        )
+        self.web_scraper = WebScraper(
+            llm_cache=self.llm_cache,
+            max_concurrency=int(os.getenv("SCRAPER_MAX_CONCURRENCY", "8")),
+            per_host_delay=float(os.getenv("SCRAPER_HOST_DELAY", "1")),
+            stream_threshold=int(os.getenv("SCRAPER_STREAM_KB", "1024")) * 1024,
+            retrieval_index=self.retrieval_index
+        )
+        
+        # Concurrency and rate limit for AI extraction requests
+        self.ai_workers = int(os.getenv("AI_EXTRACTION_WORKERS", "4"))
+        self.ai_requests_per_second = float(os.getenv("AI_REQUESTS_PER_SECOND", "2"))
+        self.chunker = TextChunker(max_tokens=2000, overlap_tokens=100)
+        
+        # Worker processes for PDF page extraction (default: one per CPU)
+        self.pdf_workers = int(os.getenv("PDF_WORKERS", "0")) or None
+        
+        # Side-by-side model comparison, answers cached in the LLM cache
+        self.model_evaluator = None
         
         # Initialize trainer only if API key is available
         if os.getenv("OPENAI_API_KEY"):
             try:
                 self.trainer = IslamicAITrainer()
                 self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+                self.model_evaluator = ModelEvaluator(
+                    self.trainer.client,
+                    max_workers=int(os.getenv("EVAL_WORKERS", "4")),
+                    requests_per_second=float(os.getenv("EVAL_REQUESTS_PER_SECOND", "2")),
+                    cache=self.llm_cache
+                )
             except Exception as e:
                 print_warning(f"⚠️ Could not initialize trainer: {e}")
         
-        self.project_root = Path(__file__).parent
         self.scraped_dir = self.project_root / "scraped_content"
         self.scraped_dir.mkdir(exist_ok=True)
 
-    def extract_pdf_text(self, pdf_path):
-        """Extract text from PDF file using multiple methods"""
-        text_content = ""
-        
-        try:
-            # Method 1: Try pdfplumber first (better for complex PDFs)
-            with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_content += page_text + "\n\n"
-            
-            if text_content.strip():
-                return text_content
-                
-        except Exception as e:
-            print_warning(f"⚠️ pdfplumber failed: {e}")
-        
-        try:
-            # Method 2: Fallback to PyPDF2
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_content += page_text + "\n\n"
-                        
-        except Exception as e:
-            print_warning(f"⚠️ PyPDF2 failed: {e}")
-            return None
-        
-        return text_content if text_content.strip() else None
-
     def process_text_with_ai(self, text_content, islamic_sources_required=False):
         """Process text content using OpenAI to extract Q&A pairs"""
         if not self.openai_client:
@@ -79,118 +93,43 @@ class GradioApp:
             }
         
         try:
-            # Split text into chunks if too long
-            max_chunk_size = 8000  # Leave room for prompt
-            text_chunks = []
-            
-            if len(text_content) > max_chunk_size:
-                words = text_content.split()
-                current_chunk = []
-                current_size = 0
-                
-                for word in words:
-                    if current_size + len(word) > max_chunk_size:
-                        text_chunks.append(' '.join(current_chunk))
-                        current_chunk = [word]
-                        current_size = len(word)
-                    else:
-                        current_chunk.append(word)
-                        current_size += len(word) + 1
-                
-                if current_chunk:
-                    text_chunks.append(' '.join(current_chunk))
-            else:
-                text_chunks = [text_content]
+            # Split text into token-budgeted chunks on sentence/paragraph boundaries
+            text_chunks = self.chunker.split(text_content)
             
-            all_qa_pairs = []
+            system_prompt = ISLAMIC_EXTRACTION_PROMPT if islamic_sources_required else GENERAL_EXTRACTION_PROMPT
             
-            for i, chunk in enumerate(text_chunks):
-                print_info(f"🤖 Processing chunk {i+1}/{len(text_chunks)} with AI...")
-                
-                if islamic_sources_required:
-                    system_prompt = """You are an Islamic scholar assistant. Extract question-answer pairs from the provided text that are related to Islamic knowledge (Quran, Hadith, Islamic practices, etc.).
-
-For each Q&A pair, you MUST provide:
-1. A clear question
-2. A comprehensive answer
-3. The Islamic source (Quran, Sahih al-Bukhari, Sahih Muslim, etc.)
-4. The specific reference (verse number, hadith number, etc.)
-5. A category (e.g., Prayer, Charity, Character, etc.)
-
-Only extract content that has proper Islamic sources and references. If no Islamic Q&A pairs can be found, return an empty array.
-
-Return the result as a JSON array in this exact format:
-[
-  {
-    "question": "What are the five pillars of Islam?",
-    "answer": "The five pillars of Islam are...",
-    "source": "Sahih al-Bukhari",
-    "reference": "8",
-    "category": "Pillars of Islam"
-  }
-]"""
-                else:
-                    system_prompt = """Extract question-answer pairs from the provided text. Create educational Q&A pairs that would be useful for training.
-
-For each Q&A pair, provide:
-1. A clear question
-2. A comprehensive answer
-3. A source (can be the document title, website, or "General Knowledge")
-4. A reference (page number, section, or "N/A")
-5. A category
-
-Return the result as a JSON array in this exact format:
-[
-  {
-    "question": "What is the main topic discussed?",
-    "answer": "The main topic is...",
-    "source": "Document Title or General Knowledge",
-    "reference": "Page 1 or N/A",
-    "category": "General"
-  }
-]"""
-                
-                try:
-                    response = self.openai_client.chat.completions.create(
-                        model="gpt-4o-mini",
-                        messages=[
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": f"Extract Q&A pairs from this text:\n\n{chunk}"}
-                        ],
-                        max_tokens=2000,
-                        temperature=0.3
-                    )
-                    
-                    ai_response = response.choices[0].message.content.strip()
-                    
-                    # Try to parse JSON response
-                    try:
-                        # Clean the response to extract JSON
-                        if '```json' in ai_response:
-                            ai_response = ai_response.split('```json')[1].split('```')[0]
-                        elif '```' in ai_response:
-                            ai_response = ai_response.split('```')[1]
-                        
-                        qa_pairs = json.loads(ai_response)
-                        
-                        if isinstance(qa_pairs, list):
-                            all_qa_pairs.extend(qa_pairs)
-                        
-                    except json.JSONDecodeError:
-                        print_warning(f"⚠️ Could not parse AI response as JSON for chunk {i+1}")
-                        continue
-                
-                except Exception as e:
-                    print_warning(f"⚠️ AI processing failed for chunk {i+1}: {e}")
-                    continue
-                
-                # Add delay between API calls
-                time.sleep(1)
+            extractor = QAExtractor(
+                self.openai_client,
+                max_workers=self.ai_workers,
+                requests_per_second=self.ai_requests_per_second,
+                cache=self.llm_cache
+            )
+            
+            print_info(f"🤖 Processing {len(text_chunks)} chunks with AI ({extractor.max_workers} workers)...")
+            cache_hits, cache_misses = self.llm_cache.hits, self.llm_cache.misses
+            results, errors = extractor.extract(
+                text_chunks,
+                system_prompt,
+                progress=lambda done, total: print_info(f"🤖 Processed chunk {done}/{total}"),
+                on_retry=lambda e, attempt, delay: print_warning(f"⚠️ API error ({e}), retry {attempt} in {delay:.1f}s")
+            )
+            
+            for i, error in sorted(errors.items()):
+                print_warning(f"⚠️ AI processing failed for chunk {i+1}: {error}")
+            
+            all_qa_pairs = []
+            for qa_pairs in results:
+                if qa_pairs:
+                    all_qa_pairs.extend(qa_pairs)
             
+            hits = self.llm_cache.hits - cache_hits
+            misses = self.llm_cache.misses - cache_misses
             return {
                 'success': True,
-                'message': f'Successfully extracted {len(all_qa_pairs)} Q&A pairs',
-                'qa_pairs': all_qa_pairs
+                'message': f'Successfully extracted {len(all_qa_pairs)} Q&A pairs (cache: {hits} hits, {misses} misses)',
+                'qa_pairs': all_qa_pairs,
+                'cache_hits': hits,
+                'cache_misses': misses
             }
             
         except Exception as e:
@@ -200,7 +139,7 @@ Return the result as a JSON array in this exact format:
                 'qa_pairs': []
             }
 
-    def upload_file(self, file, islamic_sources_toggle):
+    def upload_file(self, file, islamic_sources_toggle, progress=gr.Progress()):
         """Process uploaded file (JSON, TXT, or PDF)"""
         if file is None:
             return "❌ No file uploaded", "", ""
@@ -218,7 +157,7 @@ Return the result as a JSON array in this exact format:
                 return self.upload_txt_file(file, islamic_sources_toggle)
             
             elif file_extension == '.pdf':
-                return self.upload_pdf_file(file, islamic_sources_toggle)
+                return self.upload_pdf_file(file, islamic_sources_toggle, progress)
             
             else:
                 return f"❌ Unsupported file type: {file_extension}", "", ""
@@ -233,7 +172,7 @@ Return the result as a JSON array in this exact format:
                 data = json.load(f)
             
             # Process the JSON data
-            added_count = 0
+            new_examples = []
             for item in data:
                 if all(key in item for key in ['question', 'answer', 'source', 'reference']):
                     example = self.data_manager.create_training_example(
@@ -243,13 +182,14 @@ Return the result as a JSON array in this exact format:
                         item['reference'],
                         item.get('category', 'General')
                     )
-                    self.data_manager.training_data.append(example)
-                    added_count += 1
+                    new_examples.append(example)
             
+            added_count = self.data_manager.add_training_examples(new_examples)
             if added_count > 0:
-                self.data_manager._save_training_data()
                 stats = self.get_data_statistics()
                 return f"✅ Successfully added {added_count} training examples from JSON file", stats, ""
+            elif new_examples:
+                return f"⚠️ All {len(new_examples)} examples in the JSON file are already in the training or validation data", "", ""
             else:
                 return "⚠️ No valid training examples found in JSON file", "", ""
                 
@@ -281,30 +221,39 @@ Return the result as a JSON array in this exact format:
         except Exception as e:
             return f"❌ Error processing TXT file: {str(e)}", "", ""
 
-    def upload_pdf_file(self, file, islamic_sources_required):
+    def upload_pdf_file(self, file, islamic_sources_required, progress=None):
         """Process uploaded PDF file with AI formatting"""
         try:
-            # Extract text from PDF
-            pdf_text = self.extract_pdf_text(file.name)
-            
-            if not pdf_text:
-                return "❌ Could not extract text from PDF file", "", ""
-            
-            # Save extracted content
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_file = self.scraped_dir / f"uploaded_pdf_{timestamp}.txt"
+            header = (
+                f"Extracted from PDF: {Path(file.name).name}\n"
+                f"Extraction date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                + "="*80 + "\n\n"
+            )
             
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(f"Extracted from PDF: {Path(file.name).name}\n")
-                f.write(f"Extraction date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write("="*80 + "\n\n")
-                f.write(pdf_text)
+            def report(done, total):
+                if progress is not None:
+                    progress(done / total, desc=f"Extracting pages {done}/{total}")
             
-            # Show preview
-            preview = pdf_text[:1000] + "..." if len(pdf_text) > 1000 else pdf_text
+            # Pages are extracted in parallel and written to disk in page order
+            result = extract_pdf_to_file(
+                file.name, output_file, header=header, workers=self.pdf_workers, progress=report
+            )
+            
+            if not result['chars']:
+                output_file.unlink(missing_ok=True)
+                return "❌ Could not extract text from PDF file", "", ""
+            
+            # Show preview from the head of the saved file
+            with open(output_file, 'r', encoding='utf-8') as f:
+                f.read(len(header))
+                preview = f.read(1001)
+            if len(preview) > 1000:
+                preview = preview[:1000] + "..."
             
             return (
-                f"✅ PDF file processed successfully!\n📁 Saved to: {output_file.name}\n📊 Extracted text length: {len(pdf_text):,} characters",
+                f"✅ PDF file processed successfully!\n📁 Saved to: {output_file.name}\n📄 Pages with text: {result['pages_with_text']}/{result['pages']}\n📊 Extracted text length: {result['chars']:,} characters",
                 self.get_data_statistics(),
                 preview
             )
@@ -333,7 +282,7 @@ Return the result as a JSON array in this exact format:
             
             if result['success'] and result['qa_pairs']:
                 # Add to training data
-                added_count = 0
+                new_examples = []
                 for qa_pair in result['qa_pairs']:
                     if all(key in qa_pair for key in ['question', 'answer', 'source', 'reference']):
                         example = self.data_manager.create_training_example(
@@ -343,13 +292,16 @@ Return the result as a JSON array in this exact format:
                             qa_pair['reference'],
                             qa_pair.get('category', 'General')
                         )
-                        self.data_manager.training_data.append(example)
-                        added_count += 1
+                        new_examples.append(example)
                 
+                added_count = self.data_manager.add_training_examples(new_examples)
+                duplicate_count = len(new_examples) - added_count
+                counts = f"📊 Extracted {len(result['qa_pairs'])} Q&A pairs, {len(new_examples)} valid: added {added_count}, skipped {duplicate_count} already in the training or validation data"
                 if added_count > 0:
-                    self.data_manager._save_training_data()
                     stats = self.get_data_statistics()
-                    return f"✅ AI processed content successfully!\n📊 Added {added_count} training examples\n🤖 Processed file: {latest_file.name}", stats
+                    return f"✅ AI processed content successfully!\n{counts}\n🤖 Processed file: {latest_file.name}\n💾 Cache: {result['cache_hits']} hits, {result['cache_misses']} misses", stats
+                elif new_examples:
+                    return f"⚠️ AI processed content but every extracted example is already in the dataset\n{counts}", ""
                 else:
                     return "⚠️ AI processed content but no valid Q&A pairs were extracted", ""
             else:
@@ -393,8 +345,8 @@ Return the result as a JSON array in this exact format:
                 category.strip() or "General"
             )
             
-            self.data_manager.training_data.append(example)
-            self.data_manager._save_training_data()
+            if not self.data_manager.add_training_examples([example]):
+                return "⚠️ This example is already in the training or validation data", ""
             
             stats = self.get_data_statistics()
             return f"✅ Training example added successfully!", stats
@@ -406,9 +358,9 @@ Return the result as a JSON array in this exact format:
         """Generate sample training data"""
         try:
             count = int(count) if count else 30
-            self.data_manager.generate_sample_data(count)
+            added = self.data_manager.generate_sample_data(count)
             stats = self.get_data_statistics()
-            return f"✅ Generated {count} sample training examples", stats
+            return f"✅ Generated {count} sample training examples ({added} new, {count - added} duplicates skipped)", stats
         except Exception as e:
             return f"❌ Error generating sample data: {str(e)}", ""
 
@@ -420,26 +372,106 @@ Return the result as a JSON array in this exact format:
         if training_count == 0:
             return "📊 No training data available"
         
-        # Category distribution
-        categories = {}
-        for example in self.data_manager.training_data:
-            category = example.get('category', 'Unknown')
-            categories[category] = categories.get(category, 0) + 1
+        # Maintained incrementally by the data manager; no corpus walk here
+        corpus_stats = self.data_manager.corpus_stats()
+        categories = corpus_stats.categories
+        
+        usage = self.data_manager.token_usage()
+        estimated = "" if usage['exact'] else " (estimated)"
         
         stats = f"""
 📊 **Training Data Statistics:**
 • Total Training Examples: {training_count}
 • Total Validation Examples: {validation_count}
 • Categories: {len(categories)}
-
-📂 **Category Distribution:**
+• Training Tokens{estimated}: {usage['training_tokens']:,}
+• Validation Tokens{estimated}: {usage['validation_tokens']:,}
+• Answers Citing a Source: {corpus_stats.cited} ({corpus_stats.cited / training_count * 100:.1f}%)
+"""
+        if usage['cost_per_epoch'] is not None:
+            stats += f"""
+💰 **Fine-tuning Cost ({usage['model']}):**
+• Per Epoch: ${usage['cost_per_epoch']:,.2f}
+• {DEFAULT_EPOCHS} Epochs: ${usage['cost_per_epoch'] * DEFAULT_EPOCHS:,.2f}
 """
+        
+        stats += "\n📂 **Category Distribution:**\n"
         for category, count in sorted(categories.items(), key=lambda x: x[1], reverse=True):
             percentage = (count / training_count) * 100
             stats += f"• {category}: {count} ({percentage:.1f}%)\n"
         
         return stats
 
+    def find_near_duplicates(self):
+        """Report clusters of paraphrased training examples"""
+        try:
+            if len(self.data_manager.training_data) == 0:
+                return "📊 No training data available"
+            
+            training_data = self.data_manager.training_data
+            clusters = self.data_manager.near_duplicate_index().clusters()
+            if not clusters:
+                return f"✅ No near-duplicates among {len(training_data)} training examples"
+            
+            redundant = sum(len(cluster) - 1 for cluster in clusters)
+            report = f"""
+🔍 **Near-Duplicate Clusters:**
+• Clusters: {len(clusters)}
+• Redundant Examples: {redundant} of {len(training_data)} ({redundant / len(training_data) * 100:.1f}%)
+
+📋 **Largest Clusters:**
+"""
+            for cluster in clusters[:10]:
+                question = training_data[cluster[0]]['messages'][1]['content']
+                examples = ", ".join(str(i + 1) for i in cluster[:8])
+                more = f" (+{len(cluster) - 8} more)" if len(cluster) > 8 else ""
+                report += f"• {len(cluster)} × \"{question[:80]}\" — examples {examples}{more}\n"
+            
+            return report
+            
+        except Exception as e:
+            return f"❌ Error finding near-duplicates: {str(e)}"
+
+    def lookup_citation(self, reference):
+        """List training examples and scraped pages citing a reference, or show citation coverage"""
+        try:
+            index = self.data_manager.reference_index()
+            index.sync_directory(self.scraped_dir)
+            
+            if not reference or not reference.strip():
+                coverage = index.coverage()
+                report = "🔖 **Citation Coverage:**\n"
+                for entry in coverage.values():
+                    report += f"• {entry['name']}: {entry['distinct']} distinct cited ({entry['citations']} citations)\n"
+                quran = coverage['quran']
+                report += f"\n📖 Quran ayat cited: {quran['distinct']}/{quran['total']} ({quran['percent']:.2f}%)\n"
+                cited = index.most_cited(10)
+                if cited:
+                    report += "\n📋 **Most Cited:**\n"
+                    for citation, count in cited:
+                        report += f"• {format_citation(citation)} — {count} documents\n"
+                return report
+            
+            citations = parse_reference(reference.strip())
+            if not citations:
+                return f"❌ Could not parse \"{reference.strip()}\" as a Quran verse or hadith reference"
+            
+            documents = index.documents_citing(reference.strip())
+            label = format_citation(citations[0]) + (f" – {citations[-1][2]}" if len(citations) > 1 else "")
+            if not documents:
+                return f"ℹ️ Nothing cites {label} yet"
+            
+            report = f"🔖 **{label}** is cited by {len(documents)} documents:\n"
+            for origin, locator in documents[:50]:
+                where = f"example {locator}" if origin == self.data_manager.training_file.name else locator
+                report += f"• {origin} — {where}\n"
+            if len(documents) > 50:
+                report += f"... and {len(documents) - 50} more\n"
+            return report
+            
+        except Exception as e:
+            return f"❌ Error looking up citation: {str(e)}"
+
     def split_data(self, validation_ratio):
         """Split data into training and validation sets"""
         try:
@@ -543,29 +575,81 @@ Return the result as a JSON array in this exact format:
         except Exception as e:
             return f"❌ Error listing models: {str(e)}"
 
-    def test_model(self, model_name, test_question):
-        """Test a fine-tuned model"""
+    def comparison_models(self):
+        """Base model plus the fine-tuned models, newest first, as comparison choices"""
         if not self.trainer:
+            return []
+        try:
+            models = [model['model_name'] for model in reversed(self.trainer.list_available_models())]
+        except Exception as e:
+            print_warning(f"⚠️ Could not list fine-tuned models: {e}")
+            models = []
+        return [self.trainer.base_model] + models
+
+    def refresh_comparison_models(self):
+        """Reload the model choices of the comparison checkbox group"""
+        return gr.update(choices=self.comparison_models())
+
+    def compare_models(self, model_names, questions_text, progress=gr.Progress()):
+        """Ask several models the same questions concurrently and show the answers side by side"""
+        if not self.model_evaluator:
             return "❌ Trainer not initialized. Please check your OpenAI API key."
         
-        if not model_name or not test_question:
-            return "❌ Please provide both model name and test question"
+        model_names = list(dict.fromkeys(name.strip() for name in model_names or [] if name.strip()))
+        questions = [line.strip() for line in (questions_text or "").splitlines() if line.strip()]
+        if len(model_names) < 2 or not questions:
+            return "❌ Please select at least two models and enter at least one question"
         
         try:
-            response = self.trainer.client.chat.completions.create(
-                model=model_name.strip(),
-                messages=[
-                    {"role": "user", "content": test_question.strip()}
-                ],
-                max_tokens=300,
-                temperature=0.7
+            started = time.perf_counter()
+            comparison = self.model_evaluator.compare(
+                model_names, questions,
+                progress=lambda done, total: progress(done / total, desc=f"Answered {done}/{total}")
             )
+            elapsed = time.perf_counter() - started
             
-            answer = response.choices[0].message.content
-            return f"🤖 **Model Response:**\n\n{answer}"
+            requests = len(model_names) * len(questions)
+            cached = sum(1 for item in comparison for answer in item['answers'].values() if answer.get('cached'))
+            summary = (f"⚖️ **{len(model_names)} models × {len(questions)} question(s)** answered in "
+                       f"{elapsed:.1f}s ({cached}/{requests} from cache)")
+            return f"{summary}\n\n{comparison_markdown(comparison)}"
             
         except Exception as e:
-            return f"❌ Error testing model: {str(e)}"
+            return f"❌ Error comparing models: {str(e)}"
+
+    def test_model(self, model_name, test_question, ground=False):
+        """Stream a fine-tuned model's answer, optionally grounded on locally retrieved passages"""
+        if not self.trainer:
+            yield "❌ Trainer not initialized. Please check your OpenAI API key."
+            return
+        
+        if not model_name or not test_question:
+            yield "❌ Please provide both model name and test question"
+            return
+        
+        try:
+            messages = [{"role": "user", "content": test_question.strip()}]
+            passages = []
+            if ground:
+                passages = self.retrieval_index.search(test_question.strip(), k=self.retrieval_top_k)
+                if passages:
+                    messages.insert(0, {"role": "system", "content": grounding_prompt(passages)})
+            
+            grounding = ""
+            if passages:
+                grounding = "\n\n📚 **Grounding passages:**\n"
+                for i, passage in enumerate(passages, 1):
+                    citation = " ".join(part for part in (passage['source'], passage['reference']) if part)
+                    grounding += f"{i}. {citation} ({passage['origin']})\n"
+            
+            yield "⏳ Waiting for the first token..."
+            # The trainer's client lives as long as the app, so its pooled connection is reused
+            for answer, stats in stream_chat(self.trainer.client, model_name.strip(), messages,
+                                             max_tokens=300, temperature=0.7):
+                yield f"🤖 **Model Response:**\n\n{answer}\n\n{format_stream_stats(stats)}{grounding}"
+            
+        except Exception as e:
+            yield f"❌ Error testing model: {str(e)}"
 
     def export_data(self):
         """Export training data to CSV"""
@@ -682,6 +766,18 @@ def create_gradio_interface():
                 stats_display = gr.Markdown(value="Click 'Refresh Statistics' to view current data")
                 refresh_stats_btn = gr.Button("Refresh Statistics", variant="primary")
                 
+                near_duplicates_display = gr.Markdown()
+                near_duplicates_btn = gr.Button("🔍 Find Near-Duplicates", variant="secondary")
+                
+                gr.Markdown("### Citation Lookup")
+                with gr.Row():
+                    citation_input = gr.Textbox(
+                        label="Reference",
+                        placeholder="2:255, Quran 2:155-157, Sahih al-Bukhari 1 (leave empty for coverage)"
+                    )
+                    citation_btn = gr.Button("🔖 Look Up Citation", variant="secondary")
+                citation_display = gr.Markdown()
+                
                 gr.Markdown("### Data Operations")
                 with gr.Row():
                     with gr.Column():
@@ -746,10 +842,33 @@ def create_gradio_interface():
                             placeholder="What are the five pillars of Islam?",
                             lines=2
                         )
+                        ground_toggle = gr.Checkbox(
+                            label="📚 Ground answer on training data and scraped content",
+                            value=False
+                        )
                     
                     with gr.Column():
                         test_btn = gr.Button("Test Model", variant="primary")
                         test_output = gr.Markdown(label="Model Response")
+                
+                gr.Markdown("### Compare Models")
+                with gr.Row():
+                    with gr.Column():
+                        compare_models_input = gr.CheckboxGroup(
+                            label="Models",
+                            choices=app.comparison_models()
+                        )
+                        refresh_compare_btn = gr.Button("Refresh Models", variant="secondary")
+                    
+                    with gr.Column():
+                        compare_questions_input = gr.Textbox(
+                            label="Questions (one per line)",
+                            placeholder="What are the five pillars of Islam?\nWhat does the Quran say about charity?",
+                            lines=4
+                        )
+                        compare_btn = gr.Button("Compare Models", variant="primary")
+                
+                compare_output = gr.Markdown(label="Comparison")
         
         # Event handlers
         upload_btn.click(
@@ -787,6 +906,17 @@ def create_gradio_interface():
             outputs=[stats_display]
         )
         
+        near_duplicates_btn.click(
+            app.find_near_duplicates,
+            outputs=[near_duplicates_display]
+        )
+        
+        citation_btn.click(
+            app.lookup_citation,
+            inputs=[citation_input],
+            outputs=[citation_display]
+        )
+        
         split_btn.click(
             app.split_data,
             inputs=[validation_ratio],
@@ -821,9 +951,20 @@ def create_gradio_interface():
         
         test_btn.click(
             app.test_model,
-            inputs=[model_name_input, test_question_input],
+            inputs=[model_name_input, test_question_input, ground_toggle],
             outputs=[test_output]
         )
+        
+        refresh_compare_btn.click(
+            app.refresh_comparison_models,
+            outputs=[compare_models_input]
+        )
+        
+        compare_btn.click(
+            app.compare_models,
+            inputs=[compare_models_input, compare_questions_input],
+            outputs=[compare_output]
+        )
     
     return interface
 
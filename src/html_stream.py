@@ -0,0 +1,171 @@
+"""
+HTML Stream
+Tree-free lxml parse that collects title, block texts and links in one pass
+"""
+
+import codecs
+import re
+
+try:
+    from lxml import etree
+except ImportError:  # pragma: no cover - depends on the environment
+    etree = None
+
+FEED_SIZE = 64 * 1024
+
+_HEADER_CHARSET_RE = re.compile(r"charset=[\"']?([\w.:-]+)", re.IGNORECASE)
+_META_CHARSET_RE = re.compile(rb"<meta[^>]+charset=[\"']?([\w.:-]+)", re.IGNORECASE)
+
+# Subtrees dropped while streaming (extract_content decomposes the same tags)
+SKIP_TAGS = frozenset(['script', 'style', 'noscript', 'nav', 'header', 'footer', 'aside'])
+
+# Elements that start a new block of text
+BLOCK_TAGS = frozenset([
+    'p', 'div', 'article', 'section', 'main', 'aside', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'li', 'ul', 'ol', 'dl', 'dt', 'dd', 'td', 'th', 'tr', 'table', 'blockquote', 'pre',
+    'figure', 'figcaption', 'form', 'fieldset', 'address', 'details', 'summary'
+])
+
+# Main-content containers in priority order (tag, .class or #id)
+PRIORITY_SELECTORS = [
+    'main', 'article', '.content', '.main-content',
+    '.post-content', '.entry-content', '#content', '#main'
+]
+
+
+def available():
+    """Return True if lxml is installed"""
+    return etree is not None
+
+
+def sniff_encoding(body, content_type=""):
+    """Charset from the Content-Type header, else a <meta> tag near the top, else UTF-8"""
+    match = _HEADER_CHARSET_RE.search(content_type or "") or _META_CHARSET_RE.search(body[:4096])
+    if match is None:
+        return 'utf-8'
+    charset = match.group(1)
+    charset = charset.decode('ascii') if isinstance(charset, bytes) else charset
+    try:
+        codecs.lookup(charset)
+    except LookupError:
+        return 'utf-8'
+    return charset
+
+
+def _selector_matcher(selector):
+    """Return a predicate (tag, attrib) -> bool for a simple selector"""
+    if selector.startswith('.'):
+        name = selector[1:]
+        return lambda tag, attrib: name in (attrib.get('class') or '').split()
+    if selector.startswith('#'):
+        name = selector[1:]
+        return lambda tag, attrib: attrib.get('id') == name
+    return lambda tag, attrib: tag == selector
+
+
+_MATCHERS = [_selector_matcher(selector) for selector in PRIORITY_SELECTORS]
+
+
+class _StreamTarget:
+    """lxml parser target: tracks open elements instead of building a tree
+
+    Each text run is stored with the id of its nearest block ancestor and a
+    bitmask of the main-content candidates it sits in (the first element
+    matching each priority selector), so the best container can be picked
+    once the document ends.
+    """
+
+    def __init__(self, max_links):
+        self.max_links = max_links
+        self.title = []
+        self.links = []
+        self.segments = []  # [block_id, candidate_mask, [pieces]]
+        self._stack = []  # (tag, block_id, candidate_mask, skipping, in_title)
+        self._next_block = 1
+        self._found = 0  # bitmask of selectors already matched
+
+    def start(self, tag, attrib):
+        """Open an element"""
+        if self._stack:
+            _, block_id, mask, skipping, in_title = self._stack[-1]
+        else:
+            block_id, mask, skipping, in_title = 0, 0, False, False
+
+        if skipping or tag in SKIP_TAGS:
+            self._stack.append((tag, block_id, mask, True, False))
+            return
+
+        if tag == 'a' and len(self.links) < self.max_links:
+            href = attrib.get('href')
+            if href is not None:
+                self.links.append(href)
+
+        if tag in BLOCK_TAGS:
+            block_id = self._next_block
+            self._next_block += 1
+
+        for index, matches in enumerate(_MATCHERS):
+            bit = 1 << index
+            if not self._found & bit and matches(tag, attrib):
+                self._found |= bit
+                mask |= bit
+
+        self._stack.append((tag, block_id, mask, False, in_title or tag == 'title'))
+
+    def end(self, tag):
+        """Close an element (and any implicitly closed ones inside it)"""
+        for depth in range(len(self._stack) - 1, -1, -1):
+            if self._stack[depth][0] == tag:
+                del self._stack[depth:]
+                return
+
+    def data(self, text):
+        """Attach text to the nearest block ancestor"""
+        if not self._stack:
+            return
+        _, block_id, mask, skipping, in_title = self._stack[-1]
+        if skipping:
+            return
+        if in_title:
+            self.title.append(text)
+            return
+        if self.segments and self.segments[-1][0] == block_id:
+            self.segments[-1][2].append(text)
+        else:
+            self.segments.append([block_id, mask, [text]])
+
+    def comment(self, text):
+        """Ignore comments"""
+
+    def close(self):
+        """Pick the main content and return (title, texts, links)"""
+        best = next((1 << index for index in range(len(_MATCHERS)) if self._found & (1 << index)), 0)
+        texts = ["".join(pieces) for _, mask, pieces in self.segments if not best or mask & best]
+        return "".join(self.title), texts, self.links
+
+
+def parse_html(body, encoding=None, max_links=20):
+    """Stream-parse HTML bytes into (title, block texts, links)
+
+    Nothing but the texts is kept: script/style/nav/header/footer/aside
+    subtrees are skipped as they stream past, text runs are grouped under
+    their nearest block ancestor, and the first `max_links` hrefs outside
+    skipped subtrees are collected. Texts come from the first main-content
+    container found (by selector priority) or the whole body.
+    """
+    if etree is None:
+        raise ImportError("lxml is required for streaming HTML parsing")
+
+    if isinstance(body, str):
+        body, encoding = body.encode('utf-8'), 'utf-8'
+    elif encoding is None:
+        encoding = sniff_encoding(body)
+    if not body.strip():
+        # libxml2 refuses to close a parser that never saw an element
+        return "", [], []
+
+    parser = etree.HTMLParser(target=_StreamTarget(max_links), encoding=encoding,
+                              remove_comments=True, no_network=True)
+    for start in range(0, len(body), FEED_SIZE):
+        parser.feed(body[start:start + FEED_SIZE])
+    return parser.close()
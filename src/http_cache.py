@@ -0,0 +1,134 @@
+"""
+HTTP Cache
+On-disk store of fetched pages for conditional re-crawls (ETag / Last-Modified)
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+
+class HTTPCache:
+    """SQLite store of page bodies, validators and processed results
+
+    A page is stored only when the server sent an ETag or Last-Modified
+    header. On the next crawl `conditional_headers` turns those into
+    If-None-Match / If-Modified-Since; when the server answers 304 the
+    processed result saved under the same `variant` (the processing
+    options) can be reused as is, or the stored body reprocessed without
+    downloading it again. `cost` is the seconds the original fetch and
+    processing took, which is what a 304 saves. Oldest pages are evicted
+    once bodies exceed `max_bytes`.
+    """
+
+    def __init__(self, db_path, max_bytes=DEFAULT_MAX_BYTES):
+        """Open (or create) the cache database"""
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " content_type TEXT NOT NULL,"
+            " body BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " cost REAL NOT NULL,"
+            " variant TEXT,"
+            " result TEXT,"
+            " stored_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_stored ON pages (stored_at)")
+        self._conn.commit()
+        self._total_size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    def conditional_headers(self, url):
+        """Return If-None-Match / If-Modified-Since headers for a stored page"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        headers = {}
+        if row and row[0]:
+            headers['If-None-Match'] = row[0]
+        if row and row[1]:
+            headers['If-Modified-Since'] = row[1]
+        return headers
+
+    def lookup(self, url, variant):
+        """Return (size, cost, result) for a stored page; result is None unless variant matches"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, cost, variant, result FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        size, cost, stored_variant, result = row
+        if stored_variant != variant or result is None:
+            return size, cost, None
+        return size, cost, json.loads(result)
+
+    def body(self, url):
+        """Return (content_type, body bytes) for a stored page, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_type, body FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        return (row[0], bytes(row[1])) if row else None
+
+    def store(self, url, headers, content_type, body, cost, variant=None, result=None):
+        """Store a 200 response and its processed result if it has validators"""
+        etag = headers.get('etag')
+        last_modified = headers.get('last-modified')
+        if not etag and not last_modified:
+            return False
+
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM pages WHERE url = ?", (url,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages"
+                " (url, etag, last_modified, content_type, body, size, cost, variant, result, stored_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, content_type, body, len(body), cost, variant,
+                 json.dumps(result, ensure_ascii=False) if result is not None else None, time.time())
+            )
+            self._total_size += len(body) - (old[0] if old else 0)
+            self._evict()
+            self._conn.commit()
+        return True
+
+    def update_result(self, url, variant, result):
+        """Replace the processed result of a stored page"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pages SET variant = ?, result = ? WHERE url = ?",
+                (variant, json.dumps(result, ensure_ascii=False), url)
+            )
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop the oldest pages while over the size budget (caller holds the lock)"""
+        if self._total_size <= self.max_bytes:
+            return
+        victims = []
+        excess = self._total_size - self.max_bytes
+        for url, size in self._conn.execute("SELECT url, size FROM pages ORDER BY stored_at"):
+            if excess <= 0:
+                break
+            victims.append((url,))
+            excess -= size
+            self._total_size -= size
+        self._conn.executemany("DELETE FROM pages WHERE url = ?", victims)
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
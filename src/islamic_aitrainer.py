@@ -11,6 +11,7 @@ from pathlib import Path
 from openai import OpenAI
 from utils import print_success, print_error, print_info, print_warning
 from tabulate import tabulate
+from model_evaluator import ModelEvaluator, load_eval_cases, build_report, comparison_table, save_report
 
 class IslamicAITrainer:
     def __init__(self):
@@ -201,6 +202,71 @@ class IslamicAITrainer:
         
         print_info("\n🎯 Testing completed!")
 
+    def evaluate_models(self, model_names, validation_file, limit=None, max_workers=4, requests_per_second=2.0):
+        """Score models on the validation set with concurrent requests; print and save the comparison"""
+        cases = load_eval_cases(validation_file, limit)
+        evaluator = ModelEvaluator(self.client, max_workers=max_workers, requests_per_second=requests_per_second)
+        print_info(f"🧪 Evaluating {len(model_names)} models on {len(cases)} questions...")
+        
+        def progress(done, total):
+            if done % 20 == 0 or done == total:
+                print_info(f"   {done}/{total} answers")
+        
+        report = evaluator.evaluate(model_names, cases, progress)
+        return self._finish_evaluation(report)
+
+    def submit_evaluation_batch(self, model_names, validation_file, limit=None):
+        """Submit the evaluation as a Batch API job; return the batch id"""
+        cases = load_eval_cases(validation_file, limit)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        evaluator = ModelEvaluator(self.client)
+        try:
+            batch_id = evaluator.submit_batch(model_names, cases, self.logs_dir / f"eval_batch_{timestamp}.jsonl")
+        except Exception as e:
+            print_error(f"❌ Batch submission failed: {e}")
+            return None
+        
+        # The cases are needed again to score the answers when the batch completes
+        pending_file = self.logs_dir / f"eval_batch_{batch_id}.json"
+        with open(pending_file, 'w', encoding='utf-8') as f:
+            json.dump({"batch_id": batch_id, "models": model_names, "cases": cases}, f, indent=2, ensure_ascii=False)
+        
+        print_success(f"✅ Evaluation batch submitted: {batch_id} ({len(model_names) * len(cases)} requests)")
+        print_info("💡 Collect the results with the same menu option once the batch has completed")
+        return batch_id
+
+    def collect_evaluation_batch(self, batch_id):
+        """Score a completed evaluation batch; return the report, or None if it is not done yet"""
+        pending_file = self.logs_dir / f"eval_batch_{batch_id}.json"
+        if not pending_file.exists():
+            print_error(f"❌ No submitted evaluation found for batch {batch_id}")
+            return None
+        with open(pending_file, 'r', encoding='utf-8') as f:
+            pending = json.load(f)
+        
+        try:
+            status, answers = ModelEvaluator(self.client).collect_batch(batch_id)
+        except Exception as e:
+            print_error(f"❌ Could not retrieve batch: {e}")
+            return None
+        if answers is None:
+            print_info(f"⏳ Batch {batch_id} is {status}")
+            return None
+        if status != 'completed':
+            print_warning(f"⚠️ Batch {batch_id} {status}; scoring the {len(answers)} requests that finished")
+        
+        report = build_report(pending["models"], pending["cases"], answers, mode='batch')
+        return self._finish_evaluation(report)
+
+    def _finish_evaluation(self, report):
+        """Print the comparison table and save the JSON report"""
+        print_info("\n📊 Evaluation Results:")
+        print(comparison_table(report))
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        report_file = save_report(report, self.logs_dir / f"evaluation_{timestamp}.json")
+        print_success(f"💾 Evaluation report saved: {report_file}")
+        return report
+
     def _log_job_details(self, job):
         """Log job details to file"""
         log_file = self.logs_dir / f"training_job_{job.id}.json"
@@ -0,0 +1,170 @@
+"""
+Islamic Detector
+Single-pass, streaming keyword and reference scoring for Islamic content
+"""
+
+import re
+
+ISLAMIC_KEYWORDS = [
+    # Arabic terms
+    'allah', 'muhammad', 'quran', "qur'an", 'hadith', 'hadis', 'sunnah',
+    'islam', 'muslim', 'islamic', 'prophet', 'messenger',
+
+    # Religious concepts
+    'salah', 'prayer', 'zakat', 'charity', 'hajj', 'pilgrimage', 'sawm', 'fasting',
+    'shahada', 'faith', 'iman', 'tawhid', 'shirk',
+
+    # Sources
+    'bukhari', 'abu dawood', 'tirmidhi', "nasa'i", 'ibn majah',
+    'sahih', 'sunan', 'jami', 'musnad',
+
+    # Quranic terms
+    'surah', 'ayah', 'verse', 'chapter', 'revelation',
+
+    # Islamic practices
+    'mosque', 'masjid', 'imam', 'khutbah', 'dua', 'dhikr',
+    'halal', 'haram', 'makruh', 'mustahab', 'fiqh', 'sharia'
+]
+
+# Quran and hadith references start with one of these keywords; the rest of
+# the reference is matched right after the keyword, within the same scan
+REFERENCE_TAILS = {
+    'surah': ('quran', r"\s{1,5}[\w\-]{1,40}"),
+    'chapter': ('quran', r"\s{1,5}\d{1,6}"),
+    'sahih': ('hadith', r"\s{1,5}(?:al-)?(?:bukhari|muslim)"),
+    'sunan': ('hadith', r"\s{1,5}(?:abu\s{1,5}dawood|tirmidhi|nasa'?i|ibn\s{1,5}majah)"),
+    'jami': ('hadith', r"\s{1,5}(?:at-)?tirmidhi"),
+    'musnad': ('hadith', r"\s{1,5}ahmad"),
+}
+_TAIL_RES = {keyword: (kind, re.compile(tail + r"\b")) for keyword, (kind, tail) in REFERENCE_TAILS.items()}
+
+
+def _trie_pattern(words):
+    """Alternation of words factored by common prefix, so matching walks a trie"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [
+            (r"\s{1,5}" if char == ' ' else re.escape(char)) + build(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if '' in node else body
+
+    return build(trie)
+
+
+# One scan: a keyword with an optional plural, or a verse number like 2:255
+# ((?<!\w) is a word boundary at the start that the regex engine checks faster)
+DETECTOR_RE = re.compile(
+    rf"(?<!\w)(?:(?P<keyword>{_trie_pattern(set(ISLAMIC_KEYWORDS))})(?:e?s)?|(?P<verse>\d{{1,3}}:\d{{1,3}}))\b"
+)
+
+# No match (keyword plus reference tail) can be longer than this, so text further back is final
+MAX_MATCH = 80
+
+FEED_SIZE = 64 * 1024
+
+_WHITESPACE_RE = re.compile(r"\s")
+
+
+class IslamicDetector:
+    """Score text for Islamic content in a single regex pass
+
+    Text can be fed in chunks of any size: everything except the last
+    MAX_MATCH characters (cut at whitespace) is scanned immediately, so
+    memory stays bounded and matches spanning chunks are still found.
+    Keywords match whole words (with plurals), so 'islam' is not counted
+    inside 'islamic'. Keywords inside a Quran or hadith reference count
+    as keywords too.
+    """
+
+    def __init__(self):
+        """Start with empty counts"""
+        self.reset()
+
+    def reset(self):
+        """Discard buffered text and counts"""
+        self._buffer = ""
+        self._scan_from = 0
+        self.words = 0
+        self.keywords = 0
+        self.quran_references = 0
+        self.hadith_references = 0
+
+    def _scan(self, end):
+        """Count matches starting before `end` in the buffer"""
+        buffer = self._buffer
+        for match in DETECTOR_RE.finditer(buffer, self._scan_from):
+            if match.start() >= end:
+                break
+            keyword = match.group('keyword')
+            if keyword is None:
+                self.quran_references += 1
+                continue
+
+            self.keywords += 1
+            tail = _TAIL_RES.get(keyword)
+            if tail is not None and tail[1].match(buffer, match.end()):
+                if tail[0] == 'quran':
+                    self.quran_references += 1
+                else:
+                    self.hadith_references += 1
+        self._scan_from = max(self._scan_from, end)
+
+    def feed(self, chunk):
+        """Scan a chunk of text"""
+        self._buffer += chunk.lower()
+        limit = len(self._buffer) - MAX_MATCH
+        if limit <= 0:
+            return
+
+        # Cut at whitespace so no word is split between two scans; only a
+        # run of MAX_MATCH non-space characters is cut mid-word
+        cut = None
+        for match in _WHITESPACE_RE.finditer(self._buffer, max(0, limit - MAX_MATCH), limit):
+            cut = match.start()
+        if cut is None:
+            if limit < MAX_MATCH:
+                return
+            cut = limit
+
+        self._scan(cut)
+        self.words += len(self._buffer[:cut].split())
+        self._buffer = self._buffer[cut:]
+        self._scan_from -= cut
+
+    def result(self):
+        """Finish scanning buffered text and return the analysis dict"""
+        self._scan(len(self._buffer))
+        self.words += len(self._buffer.split())
+        self._buffer = ""
+        self._scan_from = 0
+
+        islamic_ratio = self.keywords / max(self.words, 1) * 100
+        return {
+            'is_islamic': islamic_ratio > 0.5 or self.quran_references > 0 or self.hadith_references > 0,
+            'islamic_score': islamic_ratio,
+            'quran_references': self.quran_references,
+            'hadith_references': self.hadith_references,
+            'total_islamic_keywords': self.keywords
+        }
+
+
+def detect_islamic_content(source):
+    """Analyze a string or an iterable of text chunks for Islamic content"""
+    detector = IslamicDetector()
+    if isinstance(source, str):
+        # Cache-sized slices are faster to lower-case and scan than one huge string
+        text = source
+        source = (text[i:i + FEED_SIZE] for i in range(0, len(text), FEED_SIZE))
+    for chunk in source:
+        detector.feed(chunk)
+    return detector.result()
@@ -0,0 +1,252 @@
+"""
+JSONL Store
+Append-only and atomic write helpers and a lazy corpus view for JSONL files
+"""
+
+import json
+import mmap
+import os
+import tempfile
+import threading
+from array import array
+from pathlib import Path
+
+
+def _encode_line(example):
+    """Encode a single example as one JSONL line"""
+    return json.dumps(example, ensure_ascii=False) + '\n'
+
+
+def append_jsonl(file_path, examples):
+    """Append examples to a JSONL file without rewriting existing lines
+
+    All lines are written with a single write call and fsynced, so a crash
+    can at worst leave one torn line at the end of the file. A torn line is
+    isolated on its own line before the next append and skipped on load.
+    """
+    file_path = Path(file_path)
+    lines = [_encode_line(example) for example in examples]
+    if not lines:
+        return 0
+    payload = ''.join(lines)
+
+    # Terminate a torn trailing line left behind by an interrupted write
+    if file_path.exists() and file_path.stat().st_size > 0:
+        with open(file_path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                payload = '\n' + payload
+
+    with open(file_path, 'a', encoding='utf-8') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+
+    return len(lines)
+
+
+def atomic_write_jsonl(file_path, examples):
+    """Rewrite a JSONL file atomically (temp file plus rename)
+
+    The new content is written next to the target and moved over it with
+    os.replace, so readers see either the old or the new file, never a
+    truncated one.
+    """
+    file_path = Path(file_path)
+    fd, tmp_name = tempfile.mkstemp(
+        prefix=f".{file_path.name}.", suffix=".tmp", dir=file_path.parent
+    )
+    count = 0
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            for example in examples:
+                f.write(_encode_line(example))
+                count += 1
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, file_path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+    return count
+
+
+def file_fingerprint(file_path):
+    """Identity of a file's current content: [size, mtime_ns, inode], or None if missing"""
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+
+def read_jsonl(file_path):
+    """Yield (line_number, example) pairs, skipping blank and torn lines"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError:
+                yield line_number, None
+
+
+class JsonlCorpus:
+    """Lazy, memory-mapped view over a JSONL file
+
+    Only a byte-offset index of the lines is kept in memory; lines are
+    validated once while indexing and examples are decoded on access. Supports len(), iteration, integer indexing and
+    slicing, and keeps the index current as examples are appended.
+    """
+
+    def __init__(self, file_path):
+        """Open the corpus and index the existing lines"""
+        self.file_path = Path(file_path)
+        self.skipped_lines = 0
+        # Bumped whenever indexed lines are dropped (file replaced, truncated or deleted)
+        self.generation = 0
+        self._lock = threading.RLock()
+        self._starts = array('Q')
+        self._ends = array('Q')
+        self._mm = None
+        self._file = None
+        self._indexed_size = 0
+        self._indexed_inode = None
+        self.refresh()
+
+    def _close_map(self):
+        """Release the current memory map"""
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _open_map(self):
+        """Map the file into memory (empty files are not mapped)"""
+        self._close_map()
+        if not self.file_path.exists():
+            return 0, None
+
+        self._file = open(self.file_path, 'rb')
+        stat = os.fstat(self._file.fileno())
+        if stat.st_size > 0:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return stat.st_size, stat.st_ino
+
+    def _index_range(self, start, size):
+        """Index complete lines between start and size
+
+        Each line is parsed once to reject torn writes (a cut-off line can
+        still end in '}'); only its offsets are kept.
+        """
+        mm = self._mm
+        pos = start
+        while pos < size:
+            newline = mm.find(b'\n', pos, size)
+            end = size if newline == -1 else newline
+            raw = mm[pos:end]
+            if not raw.strip():
+                pos = end + 1
+                continue
+
+            try:
+                json.loads(raw)
+            except ValueError:
+                if newline == -1:
+                    # Unterminated tail still being written; pick it up later
+                    break
+                # Torn line left behind by an interrupted write
+                self.skipped_lines += 1
+            else:
+                self._starts.append(pos)
+                self._ends.append(end)
+
+            pos = end + 1
+        return min(pos, size)
+
+    def refresh(self):
+        """Bring the index up to date with the file on disk
+
+        Growth of the same file is indexed incrementally; a replaced or
+        truncated file (compaction) is re-indexed from scratch.
+        """
+        with self._lock:
+            size, inode = self._open_map()
+            grew = inode == self._indexed_inode and size >= self._indexed_size
+            if not grew:
+                if self._starts:
+                    self.generation += 1
+                self._starts = array('Q')
+                self._ends = array('Q')
+                self.skipped_lines = 0
+                self._indexed_size = 0
+
+            if self._mm is not None:
+                self._indexed_size = self._index_range(self._indexed_size, size)
+            self._indexed_inode = inode
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __bool__(self):
+        return len(self._starts) > 0
+
+    def _decode(self, index):
+        """Decode the example at a non-negative index"""
+        with self._lock:
+            raw = self._mm[self._starts[index]:self._ends[index]]
+        return json.loads(raw)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._decode(i) for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("corpus index out of range")
+        return self._decode(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._decode(i)
+
+    def append(self, example):
+        """Append a single example to the file"""
+        return self.extend([example])
+
+    def extend(self, examples):
+        """Append examples to the file and index the new lines"""
+        with self._lock:
+            appended = append_jsonl(self.file_path, examples)
+            self.refresh()
+        return appended
+
+    def rewrite(self, examples):
+        """Atomically replace the file content (compaction)
+
+        Examples may be read lazily from this corpus itself; the old
+        mapping stays valid until the new file is in place.
+        """
+        with self._lock:
+            count = atomic_write_jsonl(self.file_path, examples)
+            self.refresh()
+        return count
+
+    def clear(self):
+        """Delete the backing file and empty the index"""
+        with self._lock:
+            self._close_map()
+            if self.file_path.exists():
+                self.file_path.unlink()
+            self.refresh()
+
+    def close(self):
+        """Release the memory map"""
+        with self._lock:
+            self._close_map()
@@ -0,0 +1,148 @@
+"""
+LLM Cache
+Content-addressed on-disk cache for LLM results with size and age eviction
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_AGE = 30 * 24 * 3600
+
+
+def make_cache_key(model, system_prompt, text, max_tokens, temperature):
+    """Hash the request parameters that determine an LLM result"""
+    payload = json.dumps([model, system_prompt, text, max_tokens, temperature], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """SQLite-backed cache of JSON-serializable LLM results
+
+    Entries older than `max_age` seconds are treated as misses and removed;
+    when the stored size exceeds `max_bytes`, least recently used entries
+    are evicted. Hit/miss/eviction counters are kept per instance.
+    """
+
+    def __init__(self, db_path, max_bytes=DEFAULT_MAX_BYTES, max_age=DEFAULT_MAX_AGE):
+        """Open (or create) the cache database"""
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_created ON entries (created_at)")
+        self._conn.commit()
+        self._total_size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, size, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[2] > self.max_age:
+                self._delete(key, row[1])
+                self.evictions += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        """Store a JSON-serializable value under key"""
+        data = json.dumps(value, ensure_ascii=False)
+        size = len(data.encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, data, size, now, now)
+            )
+            self._total_size += size - (old[0] if old else 0)
+            self._evict()
+            self._conn.commit()
+
+    def get_or_compute(self, key, compute, should_cache=lambda value: value is not None):
+        """Return the cached value, or compute, store and return it"""
+        value = self.get(key)
+        if value is not None:
+            return value
+        value = compute()
+        if should_cache(value):
+            self.set(key, value)
+        return value
+
+    def _delete(self, key, size):
+        """Remove one entry (caller holds the lock)"""
+        self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        self._total_size -= size
+        self._conn.commit()
+
+    def _evict(self):
+        """Drop expired entries, then LRU entries over the size budget"""
+        cutoff = time.time() - self.max_age
+        expired = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries WHERE created_at < ?", (cutoff,)
+        ).fetchone()
+        if expired[0]:
+            self._conn.execute("DELETE FROM entries WHERE created_at < ?", (cutoff,))
+            self._total_size -= expired[1]
+            self.evictions += expired[0]
+
+        if self._total_size <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM entries ORDER BY accessed_at")
+        victims = []
+        excess = self._total_size - self.max_bytes
+        for key, size in rows:
+            if excess <= 0:
+                break
+            victims.append((key,))
+            excess -= size
+            self._total_size -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        self.evictions += len(victims)
+
+    def stats(self):
+        """Return counters and current size"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': entries,
+            'size_bytes': self._total_size,
+        }
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
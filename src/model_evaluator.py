@@ -0,0 +1,417 @@
+"""
+Model Evaluator
+Concurrent or Batch API evaluation of fine-tuned models on the validation set
+"""
+
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from tabulate import tabulate
+
+from ai_extraction import TokenBucket, call_with_retry
+from jsonl_store import read_jsonl
+from llm_cache import make_cache_key
+from reference_index import parse_citations
+from retrieval_index import tokenize
+from utils import SYSTEM_PROMPT
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+# Batch statuses after which no more results will arrive
+BATCH_TERMINAL_STATUSES = ('completed', 'failed', 'expired', 'cancelled')
+
+# Questions the models should decline (or redirect), as the system prompt asks
+OUT_OF_SCOPE_QUESTIONS = [
+    "What's the weather today?",
+    "What is the capital of Australia?",
+    "Write a Python function that sorts a list of numbers.",
+    "Who won the last football World Cup?",
+    "What is the current price of Bitcoin?",
+]
+
+REFUSAL_RE = re.compile(
+    r"\b(?:i can only|i(?:'m| am) (?:only )?(?:able|designed|here) to (?:help|answer|assist) with"
+    r"|i(?:'m| am) not able to|i (?:can(?:not|'t)|am unable to) (?:help|answer|provide|assist)"
+    r"|outside (?:of )?(?:my|the) (?:scope|expertise|area)|beyond (?:my|the) scope|i specialize in"
+    r"|not (?:related to|within) (?:islamic|my)|search for general information)",
+    re.IGNORECASE
+)
+
+
+def load_eval_cases(path, limit=None, out_of_scope=OUT_OF_SCOPE_QUESTIONS):
+    """Evaluation cases from a chat-format JSONL file plus out-of-scope questions
+
+    Each case has an id, the question, the reference answer and its
+    normalized citations; out-of-scope cases have no answer to compare to.
+    """
+    cases = []
+    for line_number, example in read_jsonl(path):
+        if example is None:
+            continue
+        messages = example.get('messages') or []
+        question = next((m.get('content', '') for m in messages if m.get('role') == 'user'), '')
+        answer = next((m.get('content', '') for m in messages if m.get('role') == 'assistant'), '')
+        if not question.strip() or not answer.strip():
+            continue
+        cases.append({
+            'id': f"line-{line_number}",
+            'question': question,
+            'reference_answer': answer,
+            'citations': sorted(set(parse_citations(answer))),
+            'category': example.get('category', 'General'),
+            'out_of_scope': False,
+        })
+        if limit is not None and len(cases) >= limit:
+            break
+    for number, question in enumerate(out_of_scope, 1):
+        cases.append({'id': f"out-of-scope-{number}", 'question': question, 'reference_answer': '',
+                      'citations': [], 'category': 'Out of scope', 'out_of_scope': True})
+    return cases
+
+
+def is_refusal(answer):
+    """True if the answer declines or redirects the question"""
+    return bool(REFUSAL_RE.search(answer or ''))
+
+
+def lexical_overlap(answer, reference):
+    """Unigram F1 between answer and reference terms (stopwords ignored)"""
+    answer_terms, reference_terms = tokenize(answer), tokenize(reference)
+    if not answer_terms or not reference_terms:
+        return 0.0
+    counts = {}
+    for term in reference_terms:
+        counts[term] = counts.get(term, 0) + 1
+    common = 0
+    for term in answer_terms:
+        if counts.get(term):
+            counts[term] -= 1
+            common += 1
+    if not common:
+        return 0.0
+    precision, recall = common / len(answer_terms), common / len(reference_terms)
+    return 2 * precision * recall / (precision + recall)
+
+
+def score_answer(case, answer):
+    """Scores of one answer: citation_match, refusal and lexical_overlap (None where not applicable)
+
+    citation_match is the share of the reference answer's citations that
+    the answer also cites. refusal is 1 when an out-of-scope question was
+    declined, and for in-scope questions 1 marks a false refusal.
+    """
+    refused = is_refusal(answer)
+    if case['out_of_scope']:
+        return {'citation_match': None, 'refusal': 1.0 if refused else 0.0, 'lexical_overlap': None}
+
+    expected = {tuple(citation) for citation in case['citations']}
+    citation_match = None
+    if expected:
+        citation_match = len(expected & set(parse_citations(answer))) / len(expected)
+    return {
+        'citation_match': citation_match,
+        'refusal': 1.0 if refused else 0.0,
+        'lexical_overlap': lexical_overlap(answer, case['reference_answer']),
+    }
+
+
+def _mean(values):
+    """Mean of the values that are not None, or None"""
+    values = [value for value in values if value is not None]
+    return sum(values) / len(values) if values else None
+
+
+class ModelEvaluator:
+    """Ask models questions with bounded concurrency and score the answers
+
+    Requests go through a thread pool of `max_workers` threads. A shared
+    token bucket spaces them out, and 429/5xx responses are retried with
+    backoff, as in QAExtractor. With an LLMCache, answers already fetched
+    for the same model, prompt and parameters are served from disk. The
+    same requests can instead be written to a Batch API input file and
+    collected once the batch completes.
+    """
+
+    def __init__(self, client, max_workers=4, requests_per_second=2.0, max_tokens=300,
+                 temperature=0.0, system_prompt=SYSTEM_PROMPT, max_retries=5, base_delay=1.0, cache=None):
+        """Configure the evaluator around an OpenAI-compatible client"""
+        # Retries are handled here, so turn off the client's own retry loop
+        if hasattr(client, 'with_options'):
+            client = client.with_options(max_retries=0)
+        self.client = client
+        self.max_workers = max(1, int(max_workers))
+        self.rate_limiter = TokenBucket(requests_per_second)
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.system_prompt = system_prompt
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.cache = cache
+
+    def _messages(self, question):
+        """Chat messages for one question"""
+        messages = [{"role": "user", "content": question}]
+        if self.system_prompt:
+            messages.insert(0, {"role": "system", "content": self.system_prompt})
+        return messages
+
+    def _request(self, model, question):
+        """Send one rate-limited chat completion request"""
+        self.rate_limiter.acquire()
+        started = time.perf_counter()
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=self._messages(question),
+            max_tokens=self.max_tokens,
+            temperature=self.temperature
+        )
+        usage = getattr(response, 'usage', None)
+        return {
+            'answer': response.choices[0].message.content or '',
+            'latency': time.perf_counter() - started,
+            'prompt_tokens': getattr(usage, 'prompt_tokens', 0) or 0,
+            'completion_tokens': getattr(usage, 'completion_tokens', 0) or 0,
+        }
+
+    def ask(self, model, question, on_retry=None):
+        """Answer dict (answer, latency, prompt_tokens, completion_tokens, cached) for one question"""
+        def compute():
+            return call_with_retry(
+                lambda: self._request(model, question),
+                max_retries=self.max_retries,
+                base_delay=self.base_delay,
+                on_retry=on_retry
+            )
+
+        if self.cache is None:
+            return dict(compute(), cached=False)
+        key = make_cache_key(model, self.system_prompt, question, self.max_tokens, self.temperature)
+        result = self.cache.get(key)
+        if result is not None:
+            return dict(result, cached=True)
+        result = compute()
+        self.cache.set(key, result)
+        return dict(result, cached=False)
+
+    def ask_many(self, requests, progress=None, on_retry=None):
+        """Answer (model, question) pairs concurrently; return (results, errors) in request order"""
+        requests = list(requests)
+        results = [None] * len(requests)
+        errors = {}
+        done = 0
+        done_lock = threading.Lock()
+
+        def work(index):
+            nonlocal done
+            model, question = requests[index]
+            try:
+                results[index] = self.ask(model, question, on_retry)
+            except Exception as e:
+                errors[index] = str(e)
+            with done_lock:
+                done += 1
+                if progress:
+                    progress(done, len(requests))
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, max(1, len(requests)))) as executor:
+            list(executor.map(work, range(len(requests))))
+
+        return results, errors
+
+    def evaluate(self, models, cases, progress=None):
+        """Ask every model every case concurrently and build the report"""
+        requests = [(model, case['question']) for model in models for case in cases]
+        results, errors = self.ask_many(requests, progress)
+        answers = {}
+        for index, (model, _) in enumerate(requests):
+            case = cases[index % len(cases)]
+            answers[(model, case['id'])] = results[index] or {'error': errors.get(index)}
+        return build_report(models, cases, answers, mode='concurrent')
+
+    def compare(self, models, questions, progress=None):
+        """Ask every model every question concurrently
+
+        Returns [{'question', 'answers': {model: answer dict or {'error': ...}}}]
+        in question order, for side-by-side display.
+        """
+        requests = [(model, question) for question in questions for model in models]
+        results, errors = self.ask_many(requests, progress)
+        comparison = [{'question': question, 'answers': {}} for question in questions]
+        for index, (model, _) in enumerate(requests):
+            answers = comparison[index // len(models)]['answers']
+            answers[model] = results[index] or {'error': errors.get(index)}
+        return comparison
+
+    def write_batch_file(self, models, cases, path):
+        """Write a Batch API input file with one request per model and case"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            for model in models:
+                for case in cases:
+                    f.write(json.dumps({
+                        "custom_id": json.dumps([model, case['id']]),
+                        "method": "POST",
+                        "url": BATCH_ENDPOINT,
+                        "body": {
+                            "model": model,
+                            "messages": self._messages(case['question']),
+                            "max_tokens": self.max_tokens,
+                            "temperature": self.temperature,
+                        },
+                    }, ensure_ascii=False) + "\n")
+        return path
+
+    def submit_batch(self, models, cases, path):
+        """Upload a batch input file and start the batch; return the batch id"""
+        self.write_batch_file(models, cases, path)
+        with open(path, 'rb') as f:
+            input_file = self.client.files.create(file=f, purpose='batch')
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window="24h"
+        )
+        return batch.id
+
+    def collect_batch(self, batch_id):
+        """Return (status, answers by (model, case id)); answers is None while the batch is still running
+
+        Once the batch reached a terminal status, answers are read from
+        its output file and failed requests from its error file, recorded
+        as {'error': ...}. Expired or cancelled batches yield the requests
+        that did finish; the rest are reported missing.
+        """
+        batch = self.client.batches.retrieve(batch_id)
+        if batch.status not in BATCH_TERMINAL_STATUSES:
+            return batch.status, None
+
+        answers = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                for line in self.client.files.content(file_id).text.splitlines():
+                    if line.strip():
+                        self._read_batch_record(json.loads(line), answers)
+        return batch.status, answers
+
+    @staticmethod
+    def _read_batch_record(record, answers):
+        """Store one output or error file line as an answer or {'error': ...}"""
+        model, case_id = json.loads(record['custom_id'])
+        response = record.get('response') or {}
+        body = response.get('body') or {}
+        if response.get('status_code') != 200 or not body.get('choices'):
+            error = record.get('error') or body.get('error') or f"HTTP {response.get('status_code')}"
+            if isinstance(error, dict):
+                error = error.get('message') or error.get('code') or error
+            answers[(model, case_id)] = {'error': str(error)}
+            return
+        usage = body.get('usage') or {}
+        answers[(model, case_id)] = {
+            'answer': body['choices'][0]['message'].get('content') or '',
+            'latency': None,
+            'prompt_tokens': usage.get('prompt_tokens', 0),
+            'completion_tokens': usage.get('completion_tokens', 0),
+            'cached': False,
+        }
+
+
+def build_report(models, cases, answers, mode):
+    """Scored per-case results and per-model summaries"""
+    report = {'mode': mode, 'models': {}, 'cases': []}
+    per_model = {model: [] for model in models}
+    for case in cases:
+        entry = {key: case[key] for key in ('id', 'question', 'category', 'out_of_scope')}
+        entry['citations'] = [list(citation) for citation in case['citations']]
+        entry['results'] = {}
+        for model in models:
+            result = dict(answers.get((model, case['id'])) or {'error': 'missing from results'})
+            if 'answer' in result:
+                result['scores'] = score_answer(case, result['answer'])
+            entry['results'][model] = result
+            per_model[model].append((case, result))
+        report['cases'].append(entry)
+
+    for model, rows in per_model.items():
+        answered = [(case, result) for case, result in rows if 'scores' in result]
+        in_scope = [result['scores'] for case, result in answered if not case['out_of_scope']]
+        out_of_scope = [result['scores'] for case, result in answered if case['out_of_scope']]
+        report['models'][model] = {
+            'cases': len(rows),
+            'errors': len(rows) - len(answered),
+            'citation_match': _mean(scores['citation_match'] for scores in in_scope),
+            'lexical_overlap': _mean(scores['lexical_overlap'] for scores in in_scope),
+            'refusal_rate': _mean(scores['refusal'] for scores in out_of_scope),
+            'false_refusal_rate': _mean(scores['refusal'] for scores in in_scope),
+            'mean_latency': _mean(result.get('latency') for _, result in answered),
+            'prompt_tokens': sum(result.get('prompt_tokens', 0) for _, result in answered),
+            'completion_tokens': sum(result.get('completion_tokens', 0) for _, result in answered),
+        }
+    return report
+
+
+def comparison_table(report):
+    """Side-by-side summary of the evaluated models as a grid table"""
+    def percent(value):
+        return "-" if value is None else f"{value * 100:.1f}%"
+
+    rows = []
+    for model, summary in report['models'].items():
+        latency = summary['mean_latency']
+        rows.append([
+            model,
+            summary['cases'] - summary['errors'],
+            summary['errors'],
+            percent(summary['citation_match']),
+            percent(summary['lexical_overlap']),
+            percent(summary['refusal_rate']),
+            percent(summary['false_refusal_rate']),
+            "-" if latency is None else f"{latency:.2f}s",
+            summary['prompt_tokens'] + summary['completion_tokens'],
+        ])
+    headers = ["Model", "Answered", "Errors", "Citation match", "Lexical overlap",
+               "Out-of-scope refusal", "False refusal", "Mean latency", "Tokens"]
+    return tabulate(rows, headers=headers, tablefmt="grid")
+
+
+def _cell(text):
+    """Text made safe for one Markdown table cell"""
+    return text.strip().replace("|", "\\|").replace("\r", "").replace("\n", "<br>")
+
+
+def comparison_markdown(comparison):
+    """Markdown with, per question, the models' answers side by side and their latency and tokens"""
+    sections = []
+    for number, item in enumerate(comparison, 1):
+        models = list(item['answers'])
+        answers, stats = [], []
+        for model in models:
+            result = item['answers'][model]
+            if result.get('error'):
+                answers.append(_cell(f"❌ {result['error']}"))
+                stats.append("-")
+                continue
+            answers.append(_cell(result['answer']) or "_(empty)_")
+            stat = (f"{result['latency']:.2f}s · {result['prompt_tokens']} + "
+                    f"{result['completion_tokens']} tokens")
+            stats.append(stat + (" · cached" if result.get('cached') else ""))
+        sections.append("\n".join([
+            f"#### {number}. {_cell(item['question'])}",
+            "",
+            "| " + " | ".join(f"`{_cell(model)}`" for model in models) + " |",
+            "|" + "---|" * len(models),
+            "| " + " | ".join(answers) + " |",
+            "| " + " | ".join(stats) + " |",
+        ]))
+    return "\n\n".join(sections)
+
+
+def save_report(report, path):
+    """Write the report as JSON"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+    return path
@@ -0,0 +1,197 @@
+"""
+Near Duplicates
+MinHash/LSH index that finds paraphrased training examples incrementally
+"""
+
+import hashlib
+import re
+
+DEFAULT_NUM_PERM = 128
+# 32 bands of 4 rows: a pair at the 0.7 threshold shares a bucket with
+# probability 1 - (1 - 0.7**4)**32 > 99.9% (16 x 8 gave ~61%). The price is
+# more candidates below the threshold (~23% of pairs at 0.3), each rejected
+# by the signature check, and 32 bucket entries per document.
+DEFAULT_BANDS = 32
+DEFAULT_THRESHOLD = 0.7
+DEFAULT_SHINGLE_SIZE = 3
+
+_MASK = (1 << 64) - 1
+_WORD_RE = re.compile(r"\w+")
+# Distinct per-bin offset for densified (borrowed) bins
+_DENSIFY_STEP = 0x9E3779B97F4A7C15
+
+
+def _mix(value):
+    """64-bit finalizer (splitmix64) so combined word hashes spread evenly"""
+    value = (value ^ (value >> 30)) * 0xBF58476D1CE4E5B9 & _MASK
+    value = (value ^ (value >> 27)) * 0x94D049BB133111EB & _MASK
+    return value ^ (value >> 31)
+
+
+def example_text(example):
+    """Question plus answer of a chat training example"""
+    messages = example.get('messages') or []
+    return " ".join(m.get('content', '') for m in messages if m.get('role') in ('user', 'assistant'))
+
+
+class NearDuplicateIndex:
+    """Incremental MinHash index with LSH banding and union-find clusters
+
+    Each text is reduced to word shingles and a one-permutation MinHash
+    signature (one hash per shingle, bins filled by rotation), so adding
+    a document costs O(shingles) instead of O(shingles * num_perm). The
+    signature is cut into `bands` bands; documents sharing a band bucket
+    are candidates and are confirmed when their estimated Jaccard
+    similarity reaches `threshold`. Work per document is independent of
+    corpus size, so indexing n documents is roughly O(n).
+
+    Only one byte per signature value is kept for the similarity check
+    (b-bit MinHash, with the chance collision corrected for), so the index
+    holds num_perm bytes plus `bands` bucket entries per document.
+    """
+
+    def __init__(self, num_perm=DEFAULT_NUM_PERM, bands=DEFAULT_BANDS,
+                 threshold=DEFAULT_THRESHOLD, shingle_size=DEFAULT_SHINGLE_SIZE):
+        """Create an empty index"""
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self._word_hashes = {}
+        self._buckets = [{} for _ in range(bands)]
+        self._signatures = bytearray()
+        self._parent = []
+
+    def __len__(self):
+        return len(self._parent)
+
+    def _word_hash(self, word):
+        """Stable 64-bit hash of a word (memoized)"""
+        value = self._word_hashes.get(word)
+        if value is None:
+            value = int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest(), 'little')
+            if len(self._word_hashes) < 1_000_000:
+                self._word_hashes[word] = value
+        return value
+
+    def signature(self, text):
+        """One-permutation MinHash signature (list of num_perm ints) of a text"""
+        hashes = [self._word_hash(word) for word in _WORD_RE.findall(text.lower())]
+        num_perm = self.num_perm
+        size = self.shingle_size
+        if len(hashes) >= size:
+            shingles = set()
+            for start in range(len(hashes) - size + 1):
+                value = 0
+                for offset in range(size):
+                    value = _mix(value ^ hashes[start + offset])
+                shingles.add(value)
+        else:
+            shingles = {_mix(sum(hashes) & _MASK)}
+
+        bins = [None] * num_perm
+        for value in shingles:
+            slot = value % num_perm
+            value //= num_perm
+            if bins[slot] is None or value < bins[slot]:
+                bins[slot] = value
+
+        # Rotation densification: an empty bin borrows the next filled one
+        if None in bins:
+            for slot in range(num_perm):
+                if bins[slot] is not None:
+                    continue
+                for distance in range(1, num_perm):
+                    borrowed = bins[(slot + distance) % num_perm]
+                    if borrowed is not None:
+                        bins[slot] = (borrowed + distance * _DENSIFY_STEP) & _MASK
+                        break
+        return bins
+
+    def _band_keys(self, signature):
+        """Bucket key of each band"""
+        rows = self.rows
+        return [hash(tuple(signature[band * rows:(band + 1) * rows])) for band in range(self.bands)]
+
+    def _compact(self, signature):
+        """Low byte of each signature value"""
+        return bytes(value & 0xFF for value in signature)
+
+    def _stored(self, doc_id):
+        """Stored compact signature of a document"""
+        start = doc_id * self.num_perm
+        return self._signatures[start:start + self.num_perm]
+
+    def _estimate(self, compact_a, compact_b):
+        """Jaccard estimate from two compact signatures (b-bit corrected)"""
+        matches = sum(a == b for a, b in zip(compact_a, compact_b))
+        chance = 1 / 256
+        return max(0.0, (matches / self.num_perm - chance) / (1 - chance))
+
+    def _candidates(self, keys):
+        """Documents sharing at least one band bucket"""
+        found = set()
+        for band, key in enumerate(keys):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                found.update(bucket)
+        return found
+
+    def query(self, text):
+        """Return [(doc_id, similarity)] of indexed near-duplicates of text, most similar first"""
+        signature = self.signature(text)
+        compact = self._compact(signature)
+        matches = []
+        for doc_id in self._candidates(self._band_keys(signature)):
+            similarity = self._estimate(compact, self._stored(doc_id))
+            if similarity >= self.threshold:
+                matches.append((doc_id, similarity))
+        return sorted(matches, key=lambda match: -match[1])
+
+    def add(self, text):
+        """Index a text; return (doc_id, ids of the near-duplicates already indexed)"""
+        signature = self.signature(text)
+        compact = self._compact(signature)
+        keys = self._band_keys(signature)
+        doc_id = len(self._parent)
+        self._parent.append(doc_id)
+
+        duplicates = []
+        for other in self._candidates(keys):
+            if self._estimate(compact, self._stored(other)) >= self.threshold:
+                duplicates.append(other)
+                self._union(doc_id, other)
+
+        self._signatures += compact
+        for band, key in enumerate(keys):
+            self._buckets[band].setdefault(key, []).append(doc_id)
+        return doc_id, sorted(duplicates)
+
+    def add_many(self, texts):
+        """Index texts in order; return the number of them that had a near-duplicate"""
+        return sum(1 for text in texts if self.add(text)[1])
+
+    def _find(self, doc_id):
+        """Cluster root of a document (with path halving)"""
+        parent = self._parent
+        while parent[doc_id] != doc_id:
+            parent[doc_id] = parent[parent[doc_id]]
+            doc_id = parent[doc_id]
+        return doc_id
+
+    def _union(self, a, b):
+        """Merge the clusters of two documents"""
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a != root_b:
+            self._parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    def clusters(self, min_size=2):
+        """Near-duplicate clusters as sorted lists of doc ids, largest first"""
+        groups = {}
+        for doc_id in range(len(self._parent)):
+            groups.setdefault(self._find(doc_id), []).append(doc_id)
+        found = [members for members in groups.values() if len(members) >= min_size]
+        return sorted(found, key=lambda members: (-len(members), members[0]))
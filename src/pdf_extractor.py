@@ -0,0 +1,136 @@
+"""
+PDF Extractor
+Page-parallel, streaming PDF text extraction with per-page fallback
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pdfplumber
+import PyPDF2
+
+DEFAULT_BATCH_SIZE = 8
+
+
+def count_pages(pdf_path):
+    """Return the number of pages in a PDF"""
+    try:
+        with pdfplumber.open(pdf_path) as pdf:
+            return len(pdf.pages)
+    except Exception:
+        with open(pdf_path, 'rb') as f:
+            return len(PyPDF2.PdfReader(f).pages)
+
+
+def _pdfplumber_page_text(pdf, page_number):
+    """Extract one page with pdfplumber, releasing its cached objects"""
+    page = pdf.pages[page_number]
+    try:
+        return page.extract_text() or ""
+    finally:
+        close = getattr(page, 'close', None)
+        if close:
+            close()
+
+
+def extract_page_range(pdf_path, start, end):
+    """Extract pages [start, end) as (page_number, text) pairs
+
+    pdfplumber is tried first; PyPDF2 is only used for the pages where
+    pdfplumber raised or returned no text. Runs inside worker processes.
+    """
+    results = []
+    fallback = None
+    try:
+        pdf = pdfplumber.open(pdf_path)
+    except Exception:
+        pdf = None
+
+    try:
+        for page_number in range(start, end):
+            text = ""
+            if pdf is not None:
+                try:
+                    text = _pdfplumber_page_text(pdf, page_number)
+                except Exception:
+                    text = ""
+
+            if not text.strip():
+                try:
+                    if fallback is None:
+                        fallback = PyPDF2.PdfReader(pdf_path)
+                    text = fallback.pages[page_number].extract_text() or ""
+                except Exception:
+                    text = ""
+
+            results.append((page_number, text))
+    finally:
+        if pdf is not None:
+            pdf.close()
+
+    return results
+
+
+def iter_pdf_pages(pdf_path, workers=None, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """Yield (page_number, text) in page order while batches run in a process pool
+
+    Batches of `batch_size` pages are spread over `workers` processes,
+    with at most two batches per worker in flight, so memory is bounded by
+    the pages in flight rather than the size of the PDF. Pages are yielded
+    as soon as their batch is done. `progress(done_pages, total_pages)` is
+    called as batches are yielded.
+    """
+    pdf_path = str(pdf_path)
+    total = count_pages(pdf_path)
+    ranges = [(start, min(start + batch_size, total)) for start in range(0, total, batch_size)]
+    workers = workers or os.cpu_count() or 1
+
+    done = 0
+    if workers == 1 or len(ranges) <= 1:
+        for start, end in ranges:
+            pages = extract_page_range(pdf_path, start, end)
+            done += len(pages)
+            if progress:
+                progress(done, total)
+            yield from pages
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as executor:
+        pending = deque()
+        for start, end in ranges:
+            pending.append(executor.submit(extract_page_range, pdf_path, start, end))
+            if len(pending) < workers * 2:
+                continue
+            pages = pending.popleft().result()
+            done += len(pages)
+            if progress:
+                progress(done, total)
+            yield from pages
+        while pending:
+            pages = pending.popleft().result()
+            done += len(pages)
+            if progress:
+                progress(done, total)
+            yield from pages
+
+
+def extract_pdf_to_file(pdf_path, output_file, header="", workers=None, progress=None):
+    """Stream extracted page text to output_file in page order
+
+    Returns a dict with the page count, pages that produced text and the
+    number of characters written (excluding the header).
+    """
+    pages = 0
+    pages_with_text = 0
+    chars = 0
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(header)
+        for _, text in iter_pdf_pages(pdf_path, workers=workers, progress=progress):
+            pages += 1
+            if text.strip():
+                pages_with_text += 1
+                f.write(text + "\n\n")
+                chars += len(text) + 2
+
+    return {'pages': pages, 'pages_with_text': pages_with_text, 'chars': chars}
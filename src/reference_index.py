@@ -0,0 +1,304 @@
+"""
+Reference Index
+Normalized Quran verse and hadith citations with constant-time "who cites X" lookup
+"""
+
+import re
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+
+from jsonl_store import file_fingerprint
+
+QURAN = 'quran'
+
+# Canonical collection keys and display names; the order fixes the key encoding
+COLLECTIONS = {
+    QURAN: "Quran",
+    'bukhari': "Sahih al-Bukhari",
+    'muslim': "Sahih Muslim",
+    'abu-dawud': "Sunan Abu Dawud",
+    'tirmidhi': "Jami at-Tirmidhi",
+    'nasai': "Sunan an-Nasa'i",
+    'ibn-majah': "Sunan Ibn Majah",
+}
+_COLLECTION_IDS = {name: position for position, name in enumerate(COLLECTIONS)}
+
+# Number of ayat in each surah (Hafs numbering), 6236 in total
+AYAH_COUNTS = [
+    7, 286, 200, 176, 120, 165, 206, 75, 129, 109, 123, 111, 43, 52, 99, 128, 111, 110, 98, 135,
+    112, 78, 118, 64, 77, 227, 93, 88, 69, 60, 34, 30, 73, 54, 45, 83, 182, 88, 75, 85,
+    54, 53, 89, 59, 37, 35, 38, 29, 18, 45, 60, 49, 62, 55, 78, 96, 29, 22, 24, 13,
+    14, 11, 11, 18, 12, 12, 30, 52, 52, 44, 28, 28, 20, 56, 40, 31, 50, 40, 46, 42,
+    29, 19, 36, 25, 22, 17, 19, 26, 30, 20, 15, 21, 11, 8, 8, 19, 5, 8, 8, 11,
+    11, 8, 3, 9, 5, 4, 7, 3, 6, 3, 5, 4, 5, 6,
+]
+TOTAL_AYAT = sum(AYAH_COUNTS)
+_AYAH_OFFSETS = [sum(AYAH_COUNTS[:surah]) for surah in range(len(AYAH_COUNTS))]
+
+_VERSE = r"(?P<surah>\d{1,3})\s*:\s*(?P<ayah>\d{1,3})(?:\s*[-–]\s*(?P<last>\d{1,3}))?"
+# "Quran 2:255", "Surah Al-Baqarah 2:255-257", "(Al-Baqarah 2:255)", "[al-Nisa 4:101]", "(2:255)"
+QURAN_RE = re.compile(
+    rf"(?:\b(?:qur'?[aā]n|s[uū]rah?)\b[^\d\n]{{0,30}}?|[(\[](?:[^()\[\]\d\n]{{0,30}}?))(?<!\d){_VERSE}\b",
+    re.IGNORECASE
+)
+_BARE_VERSE_RE = re.compile(rf"^\s*{_VERSE}\s*$")
+
+_HADITH_NAMES = {
+    'bukhari': r"(?:sahih\s+)?(?:al-|el-)?bukh[aā]r[iī]",
+    'muslim': r"(?P<sahih>sahih\s+)?muslim",
+    'abu_dawud': r"(?:sunan\s+)?ab[uū]\s+d[aā]w?[uūo]{1,2}d",
+    'tirmidhi': r"(?:jami'?\s+)?(?:at-|al-)?tirmidh?[iī]",
+    'nasai': r"(?:sunan\s+)?(?:an-|al-)?nas[aā]'?[iī]",
+    'ibn_majah': r"(?:sunan\s+)?ibn\s+m[aā]jah?",
+}
+# Collection name, then e.g. "1", "(520)", "no. 1", "#1", "Book 2, Hadith 8"
+HADITH_RE = re.compile(
+    r"\b(?:" + "|".join(f"(?P<{name}>{pattern})" for name, pattern in _HADITH_NAMES.items()) + r")"
+    r"[\s,:]*(?:vol(?:ume)?\.?\s*\d+\s*,?\s*)?(?:book\s+\d+\s*,?\s*)?"
+    r"(?:hadith|no\.?|number|#)?\s*(?P<paren>\()?(?P<number>\d{1,5})\b",
+    re.IGNORECASE
+)
+
+# Longest verse range expanded into individual ayat
+MAX_RANGE = 300
+
+
+def _verses(surah, ayah, last=None):
+    """Citations of a valid verse or verse range, else []"""
+    if not 1 <= surah <= len(AYAH_COUNTS):
+        return []
+    last = last if last is not None and last >= ayah else ayah
+    if not 1 <= ayah or last > AYAH_COUNTS[surah - 1] or last - ayah >= MAX_RANGE:
+        return []
+    return [(QURAN, surah, number) for number in range(ayah, last + 1)]
+
+
+def parse_citations(text):
+    """Normalized citations found in text, in order of appearance
+
+    Quran citations are ('quran', surah, ayah), one per ayah of a range;
+    hadith citations are (collection, number, 0). Bare numbers like 2:255
+    only count inside parentheses or square brackets or after
+    "Quran"/"Surah", so times and scores are not mistaken for verses. "Muslim" alone only counts as
+    Sahih Muslim with a parenthesized number, as in "narrated by Muslim (82)".
+    """
+    found = []
+    for match in QURAN_RE.finditer(text):
+        last = match.group('last')
+        found.append((match.start(), _verses(int(match.group('surah')), int(match.group('ayah')),
+                                             int(last) if last else None)))
+    for match in HADITH_RE.finditer(text):
+        name = next(name for name in _HADITH_NAMES if match.group(name))
+        if name == 'muslim' and not (match.group('sahih') or match.group('paren')):
+            continue
+        found.append((match.start(), [(name.replace('_', '-'), int(match.group('number')), 0)]))
+    found.sort(key=lambda item: item[0])
+    return [citation for _, citations in found for citation in citations]
+
+
+def parse_reference(reference):
+    """Citations named by a lookup string; also accepts a bare "2:255" or "2:255-257" """
+    bare = _BARE_VERSE_RE.match(reference)
+    if bare:
+        last = bare.group('last')
+        return _verses(int(bare.group('surah')), int(bare.group('ayah')), int(last) if last else None)
+    return parse_citations(reference)
+
+
+def format_citation(citation):
+    """Display form, e.g. 'Quran 2:255' or 'Sahih al-Bukhari 1'"""
+    collection, number, ayah = citation
+    if collection == QURAN:
+        return f"Quran {number}:{ayah}"
+    return f"{COLLECTIONS[collection]} {number}"
+
+
+def citation_key(citation):
+    """Integer key: global ayah index for the Quran, (collection id << 24) | number for hadith"""
+    collection, number, ayah = citation
+    if collection == QURAN:
+        return _AYAH_OFFSETS[number - 1] + ayah - 1
+    return _COLLECTION_IDS[collection] << 24 | number
+
+
+def key_citation(key):
+    """Inverse of citation_key"""
+    collection_id, number = key >> 24, key & 0xFFFFFF
+    if collection_id:
+        return (list(COLLECTIONS)[collection_id], number, 0)
+    surah = bisect_right(_AYAH_OFFSETS, key)
+    return (QURAN, surah, key - _AYAH_OFFSETS[surah - 1] + 1)
+
+
+class ReferenceIndex:
+    """Inverted index from citations to the documents that cite them
+
+    A document is a (origin, locator) pair: a training file and example
+    number, or a scraped file and page URL. Each citation is reduced to an
+    integer key (citation_key), and each key maps to an array of document
+    ids. "Who cites 2:255" is then one dict lookup, and per-collection
+    coverage counters are kept up to date on add and remove, so reports
+    never rescan the documents. Documents of an origin can be removed
+    together, for re-indexing a file that was rewritten.
+    """
+
+    def __init__(self):
+        """Create an empty index"""
+        self._postings = {}   # key -> array of document ids
+        self._documents = []  # document id -> (origin, locator), None once removed
+        self._doc_keys = []   # document id -> array of keys it cites
+        self._origins = {}    # origin -> [fingerprint, document ids]
+        self._distinct = dict.fromkeys(COLLECTIONS, 0)
+        self._citations = dict.fromkeys(COLLECTIONS, 0)
+        self._surahs = [0] * len(AYAH_COUNTS)
+        self._removed = 0
+
+    def __len__(self):
+        return len(self._documents) - self._removed
+
+    def add(self, text, origin, locator):
+        """Index the citations of one document; return them normalized"""
+        citations = parse_citations(text)
+        keys = array('I', sorted({citation_key(citation) for citation in citations}))
+        doc_id = len(self._documents)
+        self._documents.append((origin, locator))
+        self._doc_keys.append(keys)
+        self._origins.setdefault(origin, [None, []])[1].append(doc_id)
+
+        for key in keys:
+            postings = self._postings.get(key)
+            if postings is None:
+                postings = self._postings[key] = array('I')
+                self._count_key(key, 1)
+            postings.append(doc_id)
+            self._citations[key_citation(key)[0]] += 1
+        return citations
+
+    def add_example(self, example, origin, locator):
+        """Index the user and assistant messages of a chat training example"""
+        messages = example.get('messages') or []
+        text = "\n".join(m.get('content', '') for m in messages if m.get('role') in ('user', 'assistant'))
+        return self.add(text, origin, locator)
+
+    def _count_key(self, key, delta):
+        """Track distinct cited keys per collection and per surah"""
+        collection, number, _ = key_citation(key)
+        self._distinct[collection] += delta
+        if collection == QURAN:
+            self._surahs[number - 1] += delta
+
+    def remove_origin(self, origin):
+        """Drop every document of an origin
+
+        Each affected postings array is rebuilt once without the removed
+        documents. Once removed slots make up half of all document ids,
+        the ids are compacted so re-indexing never grows the index.
+        """
+        entry = self._origins.pop(origin, None)
+        if entry is None:
+            return
+        removed = set(entry[1])
+        affected = set()
+        for doc_id in removed:
+            keys = self._doc_keys[doc_id]
+            affected.update(keys)
+            for key in keys:
+                self._citations[key_citation(key)[0]] -= 1
+            self._documents[doc_id] = None
+            self._doc_keys[doc_id] = array('I')
+        self._removed += len(removed)
+
+        for key in affected:
+            postings = array('I', (doc_id for doc_id in self._postings[key] if doc_id not in removed))
+            if postings:
+                self._postings[key] = postings
+            else:
+                del self._postings[key]
+                self._count_key(key, -1)
+
+        if self._removed * 2 >= len(self._documents):
+            self._compact()
+
+    def _compact(self):
+        """Renumber live documents densely, keeping their order"""
+        new_ids = {}
+        documents, doc_keys = [], []
+        for doc_id, document in enumerate(self._documents):
+            if document is not None:
+                new_ids[doc_id] = len(documents)
+                documents.append(document)
+                doc_keys.append(self._doc_keys[doc_id])
+        self._documents, self._doc_keys = documents, doc_keys
+        self._removed = 0
+        for key, postings in self._postings.items():
+            self._postings[key] = array('I', (new_ids[doc_id] for doc_id in postings))
+        for entry in self._origins.values():
+            entry[1] = [new_ids[doc_id] for doc_id in entry[1]]
+
+    def sync_text_file(self, path):
+        """(Re)index a scraped or uploaded text file if it changed, one document per page"""
+        path = Path(path)
+        origin = path.name
+        fingerprint = file_fingerprint(path)
+        entry = self._origins.get(origin)
+        if entry is not None and entry[0] == fingerprint:
+            return
+        self.remove_origin(origin)
+        if fingerprint is None:
+            return
+
+        text = path.read_text(encoding='utf-8', errors='replace')
+        for page_number, page in enumerate(re.split(r"^={20,}$", text, flags=re.MULTILINE)):
+            url = re.search(r"^URL: (\S+)", page, re.MULTILINE)
+            self.add(page, origin, url.group(1) if url else f"section {page_number}")
+        self._origins.setdefault(origin, [None, []])[0] = fingerprint
+
+    def sync_directory(self, path):
+        """Index new or changed .txt files of a directory and drop deleted ones"""
+        files = {file.name: file for file in Path(path).glob("*.txt")}
+        # Only text files have a fingerprint; training examples are added by the caller
+        for origin in [origin for origin, entry in self._origins.items() if entry[0] is not None]:
+            if origin not in files:
+                self.remove_origin(origin)
+        for file in sorted(files.values()):
+            self.sync_text_file(file)
+
+    def documents_citing(self, reference):
+        """(origin, locator) of documents citing a reference like '2:255' or 'Bukhari 1'
+
+        A verse range matches documents citing any ayah in it.
+        """
+        doc_ids = set()
+        for citation in parse_reference(reference):
+            doc_ids.update(self._postings.get(citation_key(citation), ()))
+        return [self._documents[doc_id] for doc_id in sorted(doc_ids)]
+
+    def citations_of(self, origin, locator):
+        """Normalized citations of one indexed document"""
+        for doc_id in self._origins.get(origin, [None, []])[1]:
+            if self._documents[doc_id] == (origin, locator):
+                return [key_citation(key) for key in self._doc_keys[doc_id]]
+        return []
+
+    def most_cited(self, limit=10):
+        """[(citation, document count)] of the most widely cited references"""
+        ranked = sorted(self._postings.items(), key=lambda item: (-len(item[1]), item[0]))
+        return [(key_citation(key), len(postings)) for key, postings in ranked[:limit]]
+
+    def coverage(self):
+        """Per collection: citing documents per reference summed, distinct verses/hadith cited, and for the Quran % of ayat"""
+        report = {}
+        for collection, name in COLLECTIONS.items():
+            report[collection] = {
+                'name': name,
+                'citations': self._citations[collection],
+                'distinct': self._distinct[collection],
+            }
+        report[QURAN]['total'] = TOTAL_AYAT
+        report[QURAN]['percent'] = self._distinct[QURAN] / TOTAL_AYAT * 100
+        return report
+
+    def surah_coverage(self):
+        """[(surah, ayat cited, ayat in surah)] for every surah"""
+        return [(surah + 1, self._surahs[surah], AYAH_COUNTS[surah]) for surah in range(len(AYAH_COUNTS))]
@@ -0,0 +1,407 @@
+"""
+Retrieval Index
+Incremental BM25 (plus optional dense-vector) index over training Q&A and scraped texts
+"""
+
+import hashlib
+import heapq
+import json
+import math
+import re
+import sqlite3
+import threading
+from pathlib import Path
+
+from compact_store import example_citation
+from jsonl_store import file_fingerprint
+from text_chunker import TextChunker
+
+DEFAULT_TOP_K = 4
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+# Reciprocal rank fusion constant for combining BM25 and dense rankings
+RRF_K = 60
+
+# Verse/hadith numbers like 2:255 stay one term
+_TERM_RE = re.compile(r"\d+:\d+|\w+")
+_PAGE_SEPARATOR_RE = re.compile(r"^={20,}$", re.MULTILINE)
+_TAIL_CHECK_BYTES = 256
+
+STOPWORDS = frozenset("""
+a an and are as at be by did do does for from had has have he his how i if in is it its me my
+of on or our she so that the their them they this to us was we were what when where which who
+why will with you your
+""".split())
+
+
+def tokenize(text):
+    """Lower-cased terms of a text without stopwords"""
+    return [term for term in _TERM_RE.findall(text.lower()) if term not in STOPWORDS]
+
+
+def example_passage(example):
+    """Passage dict for a chat training example, or None if it has no Q&A"""
+    messages = example.get('messages') or []
+    question = next((m.get('content', '') for m in messages if m.get('role') == 'user'), '')
+    answer = next((m.get('content', '') for m in messages if m.get('role') == 'assistant'), '')
+    if not question.strip() or not answer.strip():
+        return None
+
+    source = reference = ''
+    citation = example_citation(example)
+    if citation is not None:
+        answer, source, reference = citation
+    return {'text': f"Q: {question.strip()}\nA: {answer.strip()}", 'source': source, 'reference': reference}
+
+
+def text_file_passages(path, chunker):
+    """Passage dicts of a scraped or uploaded text file, chunked per page"""
+    text = Path(path).read_text(encoding='utf-8', errors='replace')
+    file_source = Path(path).name
+    passages = []
+    for page in _PAGE_SEPARATOR_RE.split(text):
+        if page.startswith("Extracted from PDF: "):
+            # Header block of an uploaded PDF; its text follows the separator
+            file_source = page.splitlines()[0][len("Extracted from PDF: "):].strip()
+            continue
+
+        source, reference, body = file_source, '', page
+        if "\n---\n" in page:
+            header, body = page.split("\n---\n", 1)
+            for line in header.splitlines():
+                if line.startswith("URL: "):
+                    source = line[5:].strip()
+            title = re.search(r"^Title: (.+)$", body, re.MULTILINE)
+            if title:
+                reference = title.group(1).strip()
+
+        for chunk in chunker.split(body):
+            if chunk.strip():
+                passages.append({'text': chunk.strip(), 'source': source, 'reference': reference})
+    return passages
+
+
+def load_embedder(model_name=DEFAULT_EMBEDDING_MODEL):
+    """CPU sentence embedder, or None if sentence-transformers is not installed"""
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        return None
+    model = SentenceTransformer(model_name, device='cpu')
+    model.name = model_name
+    return model
+
+
+class RetrievalIndex:
+    """BM25 inverted index over passages, persisted in SQLite
+
+    Sources are registered with watch_jsonl() (training Q&A, one passage
+    per example) and watch_directory() (scraped/uploaded .txt files,
+    chunked into passages), and kept current by refresh(). Appended JSONL
+    lines are indexed from the last indexed byte offset. A text file that
+    changed, or a JSONL file that was rewritten, has its passages replaced.
+    Unchanged sources cost one stat() call, so searching with
+    refresh=True stays cheap.
+
+    Postings and document lengths live in memory, built from the stored
+    term counts on open; passage texts stay on disk and are only read for
+    the top-k results. With an `embedder` (an object with `name` and
+    `encode(texts)` returning one vector per text, e.g. load_embedder()),
+    passages also get normalized embeddings. The BM25 and cosine rankings
+    are then merged by reciprocal rank fusion.
+    """
+
+    def __init__(self, db_path, embedder=None, chunker=None):
+        """Open (or create) the index database and load postings"""
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.embedder = embedder
+        self.chunker = chunker or TextChunker(max_tokens=256, overlap_tokens=32)
+        self._jsonl_sources = []
+        self._directories = []
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS passages ("
+            " id INTEGER PRIMARY KEY,"
+            " origin TEXT NOT NULL,"
+            " text TEXT NOT NULL,"
+            " source TEXT NOT NULL,"
+            " reference TEXT NOT NULL,"
+            " terms TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS passages_origin ON passages (origin)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS origins ("
+            " origin TEXT PRIMARY KEY,"
+            " fingerprint TEXT NOT NULL,"
+            " offset INTEGER NOT NULL,"
+            " tail TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " id INTEGER PRIMARY KEY,"
+            " model TEXT NOT NULL,"
+            " vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+        self._postings = {}  # term -> {passage id: term frequency}
+        self._lengths = {}   # passage id -> number of terms
+        self._total_length = 0
+        self._vectors = None  # (ids, matrix) built on first dense search
+        for passage_id, terms in self._conn.execute("SELECT id, terms FROM passages"):
+            self._index_terms(passage_id, json.loads(terms))
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def _index_terms(self, passage_id, counts):
+        """Add a passage's term counts to the in-memory postings"""
+        for term, count in counts.items():
+            self._postings.setdefault(term, {})[passage_id] = count
+        length = sum(counts.values())
+        self._lengths[passage_id] = length
+        self._total_length += length
+
+    def _add_passages(self, origin, passages):
+        """Store and index passages (caller commits)"""
+        embed = self.embedder is not None and passages
+        vectors = self.embedder.encode([p['text'] for p in passages]) if embed else None
+        for position, passage in enumerate(passages):
+            counts = {}
+            for term in tokenize(passage['text']):
+                counts[term] = counts.get(term, 0) + 1
+            cursor = self._conn.execute(
+                "INSERT INTO passages (origin, text, source, reference, terms) VALUES (?, ?, ?, ?, ?)",
+                (origin, passage['text'], passage['source'], passage['reference'], json.dumps(counts))
+            )
+            self._index_terms(cursor.lastrowid, counts)
+            if embed:
+                self._store_vector(cursor.lastrowid, vectors[position])
+        if embed:
+            self._vectors = None
+
+    def _store_vector(self, passage_id, vector):
+        """Persist a unit-length float32 embedding"""
+        import numpy as np
+        vector = np.asarray(vector, dtype=np.float32)
+        vector /= np.linalg.norm(vector) or 1.0
+        self._conn.execute(
+            "INSERT OR REPLACE INTO embeddings (id, model, vector) VALUES (?, ?, ?)",
+            (passage_id, self.embedder.name, vector.tobytes())
+        )
+
+    def _drop_origin(self, origin):
+        """Remove every passage of a source (caller commits)"""
+        rows = self._conn.execute("SELECT id, terms FROM passages WHERE origin = ?", (origin,)).fetchall()
+        for passage_id, terms in rows:
+            for term in json.loads(terms):
+                postings = self._postings.get(term)
+                if postings is not None:
+                    postings.pop(passage_id, None)
+                    if not postings:
+                        del self._postings[term]
+            self._total_length -= self._lengths.pop(passage_id, 0)
+        self._conn.execute("DELETE FROM embeddings WHERE id IN (SELECT id FROM passages WHERE origin = ?)", (origin,))
+        self._conn.execute("DELETE FROM passages WHERE origin = ?", (origin,))
+        self._conn.execute("DELETE FROM origins WHERE origin = ?", (origin,))
+        if rows:
+            self._vectors = None
+
+    def _origin_state(self, origin):
+        """(fingerprint, offset, tail digest) last indexed for a source, or None"""
+        row = self._conn.execute(
+            "SELECT fingerprint, offset, tail FROM origins WHERE origin = ?", (origin,)
+        ).fetchone()
+        return (json.loads(row[0]), row[1], row[2]) if row else None
+
+    def _save_origin(self, origin, fingerprint, offset, tail):
+        """Record how far a source has been indexed (caller commits)"""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO origins (origin, fingerprint, offset, tail) VALUES (?, ?, ?, ?)",
+            (origin, json.dumps(fingerprint), offset, tail)
+        )
+
+    @staticmethod
+    def _tail_digest(f, offset):
+        """Digest of the bytes just before offset, to detect in-place rewrites"""
+        start = max(0, offset - _TAIL_CHECK_BYTES)
+        f.seek(start)
+        return hashlib.blake2b(f.read(offset - start), digest_size=8).hexdigest()
+
+    def watch_jsonl(self, path):
+        """Register a chat-format JSONL file to keep indexed"""
+        path = Path(path)
+        if path not in self._jsonl_sources:
+            self._jsonl_sources.append(path)
+
+    def watch_directory(self, path):
+        """Register a directory of .txt files to keep indexed"""
+        path = Path(path)
+        if path not in self._directories:
+            self._directories.append(path)
+
+    def sync_jsonl(self, path):
+        """Index lines appended to a JSONL file since the last sync; return passages added"""
+        path = Path(path)
+        origin = str(path.resolve())
+        with self._lock:
+            fingerprint = file_fingerprint(path)
+            state = self._origin_state(origin)
+            if fingerprint is None:
+                if state is not None:
+                    self._drop_origin(origin)
+                    self._conn.commit()
+                return 0
+            if state is not None and state[0] == fingerprint:
+                return 0
+
+            with open(path, 'rb') as f:
+                offset = 0
+                if state is not None:
+                    _, old_offset, old_tail = state
+                    same_file = fingerprint[2] == state[0][2] and fingerprint[0] >= old_offset
+                    if same_file and self._tail_digest(f, old_offset) == old_tail:
+                        offset = old_offset
+                if offset == 0:
+                    self._drop_origin(origin)
+
+                f.seek(offset)
+                passages = []
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # torn or in-progress write; picked up next time
+                    offset += len(line)
+                    try:
+                        passage = example_passage(json.loads(line))
+                    except (ValueError, AttributeError):
+                        continue
+                    if passage is not None:
+                        passages.append(passage)
+                tail = self._tail_digest(f, offset)
+
+            self._add_passages(origin, passages)
+            self._save_origin(origin, fingerprint, offset, tail)
+            self._conn.commit()
+            return len(passages)
+
+    def sync_text_file(self, path):
+        """(Re)index a scraped or uploaded text file if it changed; return passages added"""
+        path = Path(path)
+        origin = str(path.resolve())
+        with self._lock:
+            fingerprint = file_fingerprint(path)
+            state = self._origin_state(origin)
+            if state is not None and state[0] == fingerprint:
+                return 0
+            self._drop_origin(origin)
+            passages = []
+            if fingerprint is not None:
+                passages = text_file_passages(path, self.chunker)
+                self._add_passages(origin, passages)
+                self._save_origin(origin, fingerprint, fingerprint[0], '')
+            self._conn.commit()
+            return len(passages)
+
+    def sync_directory(self, path):
+        """Index new or changed .txt files of a directory and drop deleted ones"""
+        path = Path(path).resolve()
+        added = 0
+        with self._lock:
+            current = {str(file.resolve()) for file in path.glob("*.txt")}
+            known = [row[0] for row in self._conn.execute("SELECT origin FROM origins")]
+            for origin in known:
+                if Path(origin).parent == path and origin not in current:
+                    self._drop_origin(origin)
+            self._conn.commit()
+            for origin in sorted(current):
+                added += self.sync_text_file(origin)
+        return added
+
+    def refresh(self):
+        """Bring every watched source up to date; return passages added"""
+        added = 0
+        for path in self._jsonl_sources:
+            added += self.sync_jsonl(path)
+        for path in self._directories:
+            added += self.sync_directory(path)
+        return added
+
+    def _bm25(self, terms, limit):
+        """Top `limit` (score, passage id) by BM25"""
+        count = len(self._lengths)
+        if not self._total_length:
+            return []
+        # tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / average)), constants hoisted
+        constant = BM25_K1 * (1 - BM25_B)
+        per_term = BM25_K1 * BM25_B * count / self._total_length
+        lengths = self._lengths
+        scores = {}
+        get = scores.get
+        for term in set(terms):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            weight = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5)) * (BM25_K1 + 1)
+            for passage_id, tf in postings.items():
+                scores[passage_id] = get(passage_id, 0.0) + weight * tf / (tf + constant + per_term * lengths[passage_id])
+        return heapq.nlargest(limit, ((score, passage_id) for passage_id, score in scores.items()))
+
+    def _dense(self, query, limit):
+        """Top `limit` (cosine, passage id) by embedding similarity"""
+        import numpy as np
+        if self._vectors is None:
+            rows = self._conn.execute(
+                "SELECT id, vector FROM embeddings WHERE model = ? ORDER BY id", (self.embedder.name,)
+            ).fetchall()
+            if not rows:
+                return []
+            ids = [row[0] for row in rows]
+            matrix = np.frombuffer(b"".join(row[1] for row in rows), dtype=np.float32).reshape(len(rows), -1)
+            self._vectors = (ids, matrix)
+        ids, matrix = self._vectors
+        vector = np.asarray(self.embedder.encode([query])[0], dtype=np.float32)
+        vector /= np.linalg.norm(vector) or 1.0
+        similarities = matrix @ vector
+        top = np.argsort(-similarities)[:limit]
+        return [(float(similarities[i]), ids[i]) for i in top]
+
+    def search(self, query, k=DEFAULT_TOP_K, refresh=True):
+        """Top-k passages for a query: dicts with text, source, reference, origin and score"""
+        if refresh:
+            self.refresh()
+        with self._lock:
+            ranked = self._bm25(tokenize(query), k if self.embedder is None else k * 4)
+            if self.embedder is not None:
+                fused = {}
+                for ranking in (ranked, self._dense(query, k * 4)):
+                    for rank, (_, passage_id) in enumerate(ranking):
+                        fused[passage_id] = fused.get(passage_id, 0.0) + 1 / (RRF_K + rank + 1)
+                ranked = heapq.nlargest(k, ((score, passage_id) for passage_id, score in fused.items()))
+
+            results = []
+            for score, passage_id in ranked[:k]:
+                text, source, reference, origin = self._conn.execute(
+                    "SELECT text, source, reference, origin FROM passages WHERE id = ?", (passage_id,)
+                ).fetchone()
+                results.append({'text': text, 'source': source, 'reference': reference,
+                                'origin': Path(origin).name, 'score': round(score, 4)})
+            return results
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+def grounding_prompt(passages):
+    """System message content quoting retrieved passages for the model to ground on"""
+    lines = ["Answer using the following passages where relevant and cite their source and reference."]
+    for number, passage in enumerate(passages, 1):
+        citation = " ".join(part for part in (passage['source'], passage['reference']) if part)
+        lines.append(f"\n[{number}] ({citation})\n{passage['text']}")
+    return "\n".join(lines)
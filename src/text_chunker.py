@@ -0,0 +1,154 @@
+"""
+Text Chunker
+Token-budgeted chunking on paragraph, sentence and Quran-verse boundaries
+"""
+
+import re
+
+from token_counter import count_tokens
+
+# Paragraph breaks: a blank line (possibly with spaces)
+_PARAGRAPH_RE = re.compile(r"\n[ \t]*\n\s*")
+
+# Sentence/verse ends followed by whitespace: ., !, ?, Arabic ؟ and ۔,
+# inline verse references like (2:255), ornate verse-number brackets ﴿٢٥٥﴾
+# and the end-of-ayah sign ۝
+_BOUNDARY_RE = re.compile(
+    r"("
+    r"[.!?؟۔][\"'”’)\]]*"
+    r"|\(\d{1,3}:\d{1,3}(?:-\d{1,3})?\)"
+    r"|[﴾﴿][\d٠-٩]+[﴾﴿]"
+    r"|۝[\d٠-٩]*"
+    r")\s+"
+)
+
+
+class TextChunker:
+    """Pack text into chunks of at most `max_tokens` tokens
+
+    Text is consumed in a single pass, split into sentences, and packed
+    greedily. Chunks end on sentence boundaries, and once a chunk is at
+    least `min_fill` full it is closed at the next paragraph break rather
+    than starting a new paragraph. The last `overlap_tokens` worth of
+    sentences are repeated at the start of the next chunk. Sentences
+    larger than the budget are split on word boundaries.
+    """
+
+    def __init__(self, max_tokens=2000, overlap_tokens=100, min_fill=0.75, count_tokens=count_tokens):
+        """Configure the token budget, overlap and tokenizer"""
+        if overlap_tokens >= max_tokens:
+            raise ValueError("overlap_tokens must be smaller than max_tokens")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.min_fill = min_fill
+        self.count_tokens = count_tokens
+
+    def _iter_paragraphs(self, source):
+        """Yield paragraphs from a string or an iterable of text pieces"""
+        if isinstance(source, str):
+            source = (source,)
+
+        parts = []  # text of the current paragraph so far
+        tail = ""   # its trailing whitespace, where a paragraph break may begin
+        for piece in source:
+            # Only the trailing whitespace is re-scanned, so long paragraphs stay linear
+            text = tail + piece
+            start = 0
+            for match in _PARAGRAPH_RE.finditer(text):
+                # A break touching the end may continue in the next piece
+                if match.end() == len(text):
+                    break
+                parts.append(text[start:match.start()])
+                yield "".join(parts)
+                parts = []
+                start = match.end()
+            rest = text[start:]
+            body = rest.rstrip()
+            parts.append(body)
+            tail = rest[len(body):]
+        parts.append(tail)
+        paragraph = "".join(parts)
+        if paragraph:
+            yield paragraph
+
+    def _iter_segments(self, source):
+        """Yield (sentence, tokens, starts_paragraph) in text order"""
+        for paragraph in self._iter_paragraphs(source):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            first = True
+            start = 0
+            for match in _BOUNDARY_RE.finditer(paragraph):
+                sentence = paragraph[start:match.end(1)]
+                start = match.end()
+                yield from self._sized(sentence, first)
+                first = False
+            if start < len(paragraph):
+                yield from self._sized(paragraph[start:], first)
+
+    def _sized(self, sentence, starts_paragraph):
+        """Attach a token count, splitting sentences over the budget on words"""
+        tokens = self.count_tokens(sentence)
+        if tokens <= self.max_tokens:
+            yield sentence, tokens, starts_paragraph
+            return
+
+        words = []
+        word_tokens = 0
+        for word in sentence.split():
+            size = self.count_tokens(" " + word)
+            if words and word_tokens + size > self.max_tokens:
+                yield " ".join(words), word_tokens, starts_paragraph
+                starts_paragraph = False
+                words, word_tokens = [], 0
+            words.append(word)
+            word_tokens += size
+        if words:
+            yield " ".join(words), word_tokens, starts_paragraph
+
+    @staticmethod
+    def _join(segments):
+        """Join segments, keeping paragraph breaks between paragraphs"""
+        parts = []
+        for i, (text, _, starts_paragraph) in enumerate(segments):
+            if i:
+                parts.append("\n\n" if starts_paragraph else " ")
+            parts.append(text)
+        return "".join(parts)
+
+    def _overlap(self, segments, incoming_tokens):
+        """Trailing segments to repeat, within the overlap and total budget"""
+        budget = min(self.overlap_tokens, self.max_tokens - incoming_tokens)
+        carried = []
+        total = 0
+        for segment in reversed(segments):
+            if total + segment[1] > budget:
+                break
+            carried.append(segment)
+            total += segment[1]
+        carried.reverse()
+        return carried, total
+
+    def chunks(self, source):
+        """Yield chunk strings from a string or an iterable of text pieces"""
+        current = []
+        current_tokens = 0
+        fill_target = self.min_fill * self.max_tokens
+
+        for segment in self._iter_segments(source):
+            _, tokens, starts_paragraph = segment
+            over_budget = current_tokens + tokens > self.max_tokens
+            paragraph_cut = starts_paragraph and current_tokens >= fill_target
+            if current and (over_budget or paragraph_cut):
+                yield self._join(current)
+                current, current_tokens = self._overlap(current, tokens)
+            current.append(segment)
+            current_tokens += tokens
+
+        if current:
+            yield self._join(current)
+
+    def split(self, source):
+        """Return all chunks as a list"""
+        return list(self.chunks(source))
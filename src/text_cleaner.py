@@ -0,0 +1,69 @@
+"""
+Text Cleaner
+Precompiled whitespace normalization and boilerplate removal for scraped text
+"""
+
+import re
+
+# Boilerplate removed from scraped text (case-insensitive). Spans like
+# "Download ... App" stop at the batch separator so one element's text can
+# never swallow the next one's.
+BOILERPLATE_PATTERNS = [
+    r'Cookie Policy|Privacy Policy|Terms of Service',
+    r'Subscribe|Newsletter|Advertisement',
+    r'Share your thoughts|Help us enhance',
+    r'Download[^\x00]*App|Get it on[^\x00]*Store',
+    r'Follow us on|Social Media',
+    r'Copyright[^\x00]*Reserved|All Rights Reserved'
+]
+
+SEPARATOR = "\x00"
+
+# Only whitespace that is not already a single space needs rewriting
+_WHITESPACE_RE = re.compile(r"[^\S ]\s*|\s{2,}")
+_BOILERPLATE_RE = re.compile("|".join(BOILERPLATE_PATTERNS), re.IGNORECASE)
+# Case-sensitive matching on lower-cased text is several times faster than IGNORECASE
+_BOILERPLATE_LOWER_RE = re.compile("|".join(BOILERPLATE_PATTERNS).lower())
+
+
+def _remove_boilerplate(text):
+    """Drop every boilerplate match in one combined pass"""
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # Some characters lower-case to several; offsets would not line up
+        return _BOILERPLATE_RE.sub("", text)
+
+    pieces = []
+    last = 0
+    for match in _BOILERPLATE_LOWER_RE.finditer(lowered):
+        pieces.append(text[last:match.start()])
+        last = match.end()
+    if not pieces:
+        return text
+    pieces.append(text[last:])
+    return "".join(pieces)
+
+
+def _clean(text):
+    """Collapse whitespace, then drop boilerplate"""
+    return _remove_boilerplate(_WHITESPACE_RE.sub(" ", text))
+
+
+def clean_text(text):
+    """Clean and normalize one piece of scraped text"""
+    if not text:
+        return ""
+    return _clean(text).strip()
+
+
+def clean_texts(texts):
+    """Clean many texts at once: two regex passes over the joined batch"""
+    texts = list(texts)
+    if not texts:
+        return []
+
+    joined = SEPARATOR.join(texts)
+    if joined.count(SEPARATOR) != len(texts) - 1:
+        # A text contains the separator itself; clean one by one
+        return [clean_text(text) for text in texts]
+    return [part.strip() for part in _clean(joined).split(SEPARATOR)]
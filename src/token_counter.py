@@ -0,0 +1,186 @@
+"""
+Token Counter
+Local token counting with tiktoken, falling back to a fast estimate
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - depends on the environment
+    tiktoken = None
+
+DEFAULT_ENCODING = "o200k_base"  # gpt-4o / gpt-4o-mini
+
+# Chat format overhead: every message is wrapped in start/role/end markers
+# (3 tokens plus the role), and every conversation is primed for the reply
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_CONVERSATION = 3
+
+# Fine-tuning price in USD per 1M training tokens (billed once per epoch)
+TRAINING_PRICES = {
+    "gpt-4o-mini-2024-07-18": 3.00,
+    "gpt-4o-2024-08-06": 25.00,
+    "gpt-3.5-turbo-0125": 8.00,
+}
+DEFAULT_TRAINING_MODEL = "gpt-4o-mini-2024-07-18"
+DEFAULT_EPOCHS = 3  # what n_epochs="auto" picks for most dataset sizes
+
+_WORD_RE = re.compile(r"\w+|[^\w\s]")
+
+
+@lru_cache(maxsize=None)
+def get_encoding(name=DEFAULT_ENCODING):
+    """Return the tiktoken encoding, or None if tiktoken/the encoding is unavailable"""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception:
+        # Encoding files are downloaded on first use; offline machines fall back
+        return None
+
+
+def estimate_tokens(text):
+    """Estimate BPE tokens: one per punctuation mark, one per ~4 word characters"""
+    return sum(1 + (len(piece) - 1) // 4 for piece in _WORD_RE.findall(text))
+
+
+def count_tokens(text, encoding_name=DEFAULT_ENCODING):
+    """Count tokens in text with the local tokenizer (estimate if unavailable)"""
+    if not text:
+        return 0
+    encoding = get_encoding(encoding_name)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def is_exact(encoding_name=DEFAULT_ENCODING):
+    """Return True if counts come from the real tokenizer rather than the estimate"""
+    return get_encoding(encoding_name) is not None
+
+
+@lru_cache(maxsize=4096)
+def _cached_count(text, encoding_name):
+    """count_tokens for strings that repeat across examples (system prompt, roles)"""
+    return count_tokens(text, encoding_name)
+
+
+def count_message_tokens(messages, encoding_name=DEFAULT_ENCODING):
+    """Tokens of a chat conversation as billed, including the chat-format overhead"""
+    total = TOKENS_PER_CONVERSATION
+    for message in messages:
+        total += TOKENS_PER_MESSAGE + _cached_count(message.get('role', ''), encoding_name)
+        content = message.get('content') or ''
+        if message.get('role') == 'system':
+            total += _cached_count(content, encoding_name)
+        else:
+            total += count_tokens(content, encoding_name)
+    return total
+
+
+def training_cost(tokens, model=DEFAULT_TRAINING_MODEL, epochs=1):
+    """Projected fine-tuning cost in USD (None for an unknown model)"""
+    price = TRAINING_PRICES.get(model)
+    if price is None:
+        return None
+    return tokens * epochs * price / 1_000_000
+
+
+class ExampleTokenCounter:
+    """Per-example chat token counts, cached on disk by example hash
+
+    The key is a digest of the example's messages and the tokenizer used,
+    so re-running statistics only tokenizes examples that were added or
+    changed since the last run. Estimated counts (tiktoken unavailable)
+    are cached under their own key and never mistaken for exact ones.
+    """
+
+    def __init__(self, db_path, encoding_name=DEFAULT_ENCODING):
+        """Open (or create) the count cache"""
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.encoding_name = encoding_name
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS counts (key BLOB PRIMARY KEY, tokens INTEGER NOT NULL)")
+        self._conn.commit()
+
+    @property
+    def exact(self):
+        """True if counts come from the real tokenizer"""
+        return is_exact(self.encoding_name)
+
+    @property
+    def tokenizer(self):
+        """Name of what produces the counts: the encoding, or 'estimate'"""
+        return self.encoding_name if self.exact else "estimate"
+
+    def _key(self, messages):
+        """Digest of the messages and the tokenizer that counts them"""
+        payload = json.dumps([self.tokenizer, messages], ensure_ascii=False, sort_keys=True)
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).digest()
+
+    def count_examples(self, examples, batch_size=500):
+        """Yield (example, token count) pairs, tokenizing only uncached examples"""
+        batch = []
+        for example in examples:
+            batch.append(example)
+            if len(batch) >= batch_size:
+                yield from zip(batch, self._count_batch([e.get('messages') or [] for e in batch]))
+                batch = []
+        if batch:
+            yield from zip(batch, self._count_batch([e.get('messages') or [] for e in batch]))
+
+    def _count_batch(self, batch):
+        """Look a batch up in one query and store the new counts in one transaction"""
+        keys = [self._key(messages) for messages in batch]
+        with self._lock:
+            placeholders = ",".join("?" * len(keys))
+            cached = dict(self._conn.execute(
+                f"SELECT key, tokens FROM counts WHERE key IN ({placeholders})", keys
+            ).fetchall())
+
+        counts = []
+        new_rows = []
+        for key, messages in zip(keys, batch):
+            tokens = cached.get(key)
+            if tokens is None:
+                tokens = count_message_tokens(messages, self.encoding_name)
+                cached[key] = tokens
+                new_rows.append((key, tokens))
+            counts.append(tokens)
+
+        with self._lock:
+            self.hits += len(batch) - len(new_rows)
+            self.misses += len(new_rows)
+            if new_rows:
+                self._conn.executemany("INSERT OR REPLACE INTO counts (key, tokens) VALUES (?, ?)", new_rows)
+                self._conn.commit()
+        return counts
+
+    def count_corpus(self, examples):
+        """Return {'examples', 'tokens', 'max_tokens', 'exact'} for a corpus"""
+        total = 0
+        largest = 0
+        count = 0
+        for _, tokens in self.count_examples(examples):
+            total += tokens
+            largest = max(largest, tokens)
+            count += 1
+        return {'examples': count, 'tokens': total, 'max_tokens': largest, 'exact': self.exact}
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
@@ -19,9 +19,53 @@ def show_trainer_menu():
     print("4.  🧪 Test fine-tuned model")
     print("5.  🎯 List available models")
     print("6.  📊 Prepare training data")
-    print("7.  ❌ Exit")
+    print("7.  📏 Evaluate models on validation set")
+    print("8.  ❌ Exit")
     print("-" * 50)
 
+def evaluate_models(trainer, data_manager):
+    """Compare models on the validation set, now or through the Batch API"""
+    print("1. Run now (concurrent requests)")
+    print("2. Submit as a Batch API job")
+    print("3. Collect a Batch API job")
+    mode = input("Select mode (1-3): ").strip()
+    
+    if mode == '3':
+        batch_id = input("Enter batch ID: ").strip()
+        if batch_id:
+            trainer.collect_evaluation_batch(batch_id)
+        return
+    
+    if not data_manager.validation_file.exists():
+        print_error("❌ No validation data found! Split the data first (Prepare training data)")
+        return
+    
+    models = trainer.list_available_models()
+    print_info(f"0. {trainer.base_model} (base model)")
+    selection = input("Select model numbers to compare (e.g. 0,1,2): ").strip()
+    try:
+        indices = [int(part) for part in selection.split(',') if part.strip()]
+    except ValueError:
+        print_error("❌ Please enter numbers separated by commas")
+        return
+    model_names = [trainer.base_model if i == 0 else models[i - 1]['model_name']
+                   for i in indices if 0 <= i <= len(models)]
+    if not model_names:
+        print_error("❌ Invalid model selection")
+        return
+    
+    limit = input("Maximum validation questions (Enter for all): ").strip()
+    limit = int(limit) if limit.isdigit() else None
+    
+    if mode == '2':
+        trainer.submit_evaluation_batch(model_names, data_manager.validation_file, limit)
+    else:
+        trainer.evaluate_models(
+            model_names, data_manager.validation_file, limit,
+            max_workers=int(os.getenv("EVAL_WORKERS", "4")),
+            requests_per_second=float(os.getenv("EVAL_REQUESTS_PER_SECOND", "2"))
+        )
+
 def main():
     """Main application loop"""
     # Check for OpenAI API key
@@ -39,7 +83,7 @@ def main():
             show_trainer_menu()
             
             try:
-                choice = input("Enter your choice (1-7): ").strip()
+                choice = input("Enter your choice (1-8): ").strip()
                 
                 if choice == '1':
                     # Start fine-tuning
@@ -101,11 +145,15 @@ def main():
                     data_main()
                 
                 elif choice == '7':
+                    # Evaluate models
+                    evaluate_models(trainer, data_manager)
+                
+                elif choice == '8':
                     print_success("👋 Goodbye! May your AI model serve the Ummah well.")
                     break
                 
                 else:
-                    print_error("❌ Invalid choice. Please select 1-7.")
+                    print_error("❌ Invalid choice. Please select 1-8.")
                 
                 # Pause before showing menu again
                 input("\nPress Enter to continue...")
@@ -8,6 +8,9 @@ import sys
 # Initialize colorama for cross-platform colored output
 init(autoreset=True)
 
+# System prompt of every training example and of model evaluation
+SYSTEM_PROMPT = "You are an Islamic scholar assistant specializing in Quran and the 6 Sahih Hadith collections (Bukhari, Muslim, Abu Dawood, Tirmidhi, Nasa'i, Ibn Majah). Always provide exact verse/hadith references. For non-Islamic questions, politely indicate you can search for general information."
+
 def print_success(message):
     """Print success message in green"""
     print(f"{Fore.GREEN}{message}{Style.RESET_ALL}")
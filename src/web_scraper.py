@@ -2,24 +2,70 @@
 Enhanced Web Scraper with AI-powered content analysis
 """
 
+import asyncio
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, FeatureNotFound
+from bs4.element import NavigableString, PreformattedString
 from urllib.parse import urljoin, urlparse
 import time
 from datetime import datetime
 from pathlib import Path
-import re
 import os
+import threading
+import json
+import re
 from openai import OpenAI
 from utils import print_success, print_error, print_info, print_warning
+from llm_cache import LLMCache, make_cache_key
+from crawl_frontier import CrawlFrontier
+from http_cache import HTTPCache
+from islamic_detector import detect_islamic_content
+from reference_index import parse_citations, format_citation, citation_key
+from text_cleaner import clean_text, clean_texts
+import html_stream
+from html_stream import BLOCK_TAGS
+from crawler import CrawlEngine, configure_session, DEFAULT_MAX_CONCURRENCY, DEFAULT_HOST_DELAY
+
+ANALYSIS_MODEL = "gpt-4o-mini"
+ANALYSIS_SYSTEM_PROMPT = "You are an expert content analyst specializing in Islamic knowledge and web content quality assessment."
+ANALYSIS_MAX_TOKENS = 200
+ANALYSIS_TEMPERATURE = 0.3
+
+# Timestamp line in a page's metadata header, refreshed when a cached copy is reused
+SCRAPED_LINE_RE = re.compile(r'^Scraped: .*$', re.MULTILINE)
+
+# Pages at least this large skip the BeautifulSoup tree and stream through lxml
+DEFAULT_STREAM_THRESHOLD = 1024 * 1024
 
 class WebScraper:
-    def __init__(self):
+    def __init__(self, llm_cache=None, http_cache=None, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 per_host_delay=DEFAULT_HOST_DELAY, extraction_mode='blocks',
+                 stream_threshold=DEFAULT_STREAM_THRESHOLD, retrieval_index=None):
         """Initialize the web scraper"""
         self.project_root = Path(__file__).parent
         self.scraped_dir = self.project_root / "scraped_content"
         self.scraped_dir.mkdir(exist_ok=True)
         
+        # Optional search index for prompt grounding; saved pages are indexed right away
+        self.retrieval_index = retrieval_index
+        if retrieval_index is not None:
+            retrieval_index.watch_directory(self.scraped_dir)
+        
+        # 'blocks': one pass, each text once; 'elements': get_text() per element (legacy)
+        self.extraction_mode = extraction_mode
+        
+        # Page size (bytes) from which 'blocks' extraction streams through lxml; None disables
+        self.stream_threshold = stream_threshold if html_stream.available() else None
+        
+        # Cache of AI analyses so unchanged pages are never re-analyzed
+        self.llm_cache = llm_cache or LLMCache(self.project_root / "cache" / "llm_cache.sqlite")
+        
+        # Stored pages for conditional re-crawls
+        self.http_cache = http_cache or HTTPCache(self.project_root / "cache" / "http_cache.sqlite")
+        
+        # Persistent crawl queues, one per start URL
+        self.frontier_path = self.project_root / "cache" / "crawl_frontier.sqlite"
+        
         # Initialize OpenAI client if available
         self.openai_client = None
         if os.getenv("OPENAI_API_KEY"):
@@ -42,9 +88,12 @@ class WebScraper:
             'Cache-Control': 'max-age=0'
         }
         
-        # Session for connection reuse
-        self.session = requests.Session()
+        # Session for connection reuse, pooled for concurrent crawling
+        self.max_concurrency = max_concurrency
+        self.per_host_delay = per_host_delay
+        self.session = configure_session(requests.Session(), pool_size=max_concurrency)
         self.session.headers.update(self.headers)
+        self._stats_lock = threading.Lock()
 
     def clean_url(self, url):
         """Clean and validate URL"""
@@ -65,28 +114,9 @@ class WebScraper:
 
     def clean_text(self, text):
         """Clean and normalize scraped text"""
-        if not text:
-            return ""
-        
-        # Remove extra whitespace and normalize
-        text = re.sub(r'\s+', ' ', text.strip())
-        
-        # Remove common unwanted patterns
-        unwanted_patterns = [
-            r'Cookie Policy|Privacy Policy|Terms of Service',
-            r'Subscribe|Newsletter|Advertisement',
-            r'Share your thoughts|Help us enhance',
-            r'Download.*App|Get it on.*Store',
-            r'Follow us on|Social Media',
-            r'Copyright.*Reserved|All Rights Reserved'
-        ]
-        
-        for pattern in unwanted_patterns:
-            text = re.sub(pattern, '', text, flags=re.IGNORECASE)
-        
-        return text.strip()
+        return clean_text(text)
 
-    def ai_analyze_content(self, content, url):
+    def ai_analyze_content(self, content, url, cache_stats=None):
         """Use AI to analyze and filter content quality"""
         if not self.openai_client or not content:
             return {
@@ -117,14 +147,23 @@ Respond in JSON format:
 }}
 """
 
+            cache_key = make_cache_key(ANALYSIS_MODEL, ANALYSIS_SYSTEM_PROMPT, prompt,
+                                       ANALYSIS_MAX_TOKENS, ANALYSIS_TEMPERATURE)
+            cached_analysis = self.llm_cache.get(cache_key)
+            if cache_stats is not None:
+                with self._stats_lock:
+                    cache_stats['hits' if cached_analysis is not None else 'misses'] += 1
+            if cached_analysis is not None:
+                return cached_analysis
+
             response = self.openai_client.chat.completions.create(
-                model="gpt-4o-mini",
+                model=ANALYSIS_MODEL,
                 messages=[
-                    {"role": "system", "content": "You are an expert content analyst specializing in Islamic knowledge and web content quality assessment."},
+                    {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
-                max_tokens=200,
-                temperature=0.3
+                max_tokens=ANALYSIS_MAX_TOKENS,
+                temperature=ANALYSIS_TEMPERATURE
             )
             
             ai_response = response.choices[0].message.content.strip()
@@ -136,15 +175,16 @@ Respond in JSON format:
                 elif r'\`\`\`' in ai_response:
                     ai_response = ai_response.split(r'\`\`\`')[1]
    
-                import json
                 analysis = json.loads(ai_response)
                 
-                return {
+                result = {
                     'is_quality': analysis.get('is_quality', True),
                     'is_islamic': analysis.get('is_islamic', False),
                     'confidence': analysis.get('confidence', 0.5),
                     'summary': analysis.get('summary', 'Content analyzed')
                 }
+                self.llm_cache.set(cache_key, result)
+                return result
                 
             except json.JSONDecodeError:
                 print_warning("⚠️ Could not parse AI analysis response")
@@ -166,70 +206,37 @@ Respond in JSON format:
 
     def detect_islamic_content(self, text):
         """Detect Islamic content using keyword matching and patterns"""
-        islamic_keywords = [
-            # Arabic terms
-            'allah', 'muhammad', 'quran', 'qur\'an', 'hadith', 'hadis', 'sunnah',
-            'islam', 'muslim', 'islamic', 'prophet', 'messenger',
-            
-            # Religious concepts
-            'salah', 'prayer', 'zakat', 'charity', 'hajj', 'pilgrimage', 'sawm', 'fasting',
-            'shahada', 'faith', 'iman', 'tawhid', 'shirk',
-            
-            # Sources
-            'bukhari', 'muslim', 'abu dawood', 'tirmidhi', 'nasa\'i', 'ibn majah',
-            'sahih', 'sunan', 'jami', 'musnad',
-            
-            # Quranic terms
-            'surah', 'ayah', 'verse', 'chapter', 'revelation',
-            
-            # Islamic practices
-            'mosque', 'masjid', 'imam', 'khutbah', 'dua', 'dhikr',
-            'halal', 'haram', 'makruh', 'mustahab', 'fiqh', 'sharia'
-        ]
-        
-        text_lower = text.lower()
-        
-        # Count Islamic keywords
-        islamic_score = 0
-        total_words = len(text.split())
-        
-        for keyword in islamic_keywords:
-            count = text_lower.count(keyword)
-            islamic_score += count
-        
-        # Calculate Islamic content ratio
-        islamic_ratio = islamic_score / max(total_words, 1) * 100
-        
-        # Detect Quranic references (e.g., 2:255, Surah Al-Baqarah)
-        quran_patterns = [
-            r'\b\d{1,3}:\d{1,3}\b',  # 2:255 format
-            r'surah\s+[\w\-]+',       # Surah names
-            r'chapter\s+\d+',        # Chapter numbers
-        ]
-        
-        quran_refs = 0
-        for pattern in quran_patterns:
-            quran_refs += len(re.findall(pattern, text_lower))
-        
-        # Detect Hadith references
-        hadith_patterns = [
-            r'sahih\s+(bukhari|muslim)',
-            r'sunan\s+(abu\s+dawood|tirmidhi|nasa\'?i|ibn\s+majah)',
-            r'jami\s+tirmidhi',
-            r'musnad\s+ahmad'
-        ]
-        
-        hadith_refs = 0
-        for pattern in hadith_patterns:
-            hadith_refs += len(re.findall(pattern, text_lower))
-        
-        return {
-            'is_islamic': islamic_ratio > 0.5 or quran_refs > 0 or hadith_refs > 0,
-            'islamic_score': islamic_ratio,
-            'quran_references': quran_refs,
-            'hadith_references': hadith_refs,
-            'total_islamic_keywords': islamic_score
-        }
+        return detect_islamic_content(text)
+
+    def _block_texts(self, root):
+        """Walk root once, grouping each text node under its nearest block ancestor
+
+        Consecutive text nodes with the same nearest block element form one
+        text, in document order, so nested markup is never extracted twice.
+        """
+        texts = []
+        pieces = []
+        current_block = None
+        stack = [(root, root)]
+        while stack:
+            node, block = stack.pop()
+            if isinstance(node, NavigableString):
+                if isinstance(node, PreformattedString):
+                    continue  # comments, CDATA, doctype
+                if block is not current_block:
+                    if pieces:
+                        texts.append("".join(pieces))
+                        pieces = []
+                    current_block = block
+                pieces.append(str(node))
+                continue
+
+            if node.name in BLOCK_TAGS:
+                block = node
+            stack.extend((child, block) for child in reversed(node.contents))
+        if pieces:
+            texts.append("".join(pieces))
+        return texts
 
     def extract_content(self, soup, url):
         """Extract meaningful content from BeautifulSoup object"""
@@ -267,15 +274,23 @@ Respond in JSON format:
         if not main_content:
             main_content = body
         
-        # Extract text from meaningful elements
-        for element in main_content.find_all(['p', 'div', 'span', 'article', 'section', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'td', 'th', 'blockquote']):
-            text = self.clean_text(element.get_text())
+        # Extract text from meaningful elements, cleaned as one batch
+        if self.extraction_mode == 'elements':
+            elements = main_content.find_all(['p', 'div', 'span', 'article', 'section', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'td', 'th', 'blockquote'])
+            texts = (element.get_text() for element in elements)
+        else:
+            texts = self._block_texts(main_content)
+        return self._assemble_content(content_parts, texts, main_content.get_text)
+
+    def _assemble_content(self, content_parts, texts, all_text):
+        """Append the meaningful cleaned texts, or all_text() if none, and join them"""
+        for text in clean_texts(texts):
             if text and len(text) > 15:  # Minimum meaningful length
                 content_parts.append(text)
         
         # If still no content, get all text
         if len(content_parts) <= 1:
-            all_text = self.clean_text(main_content.get_text())
+            all_text = self.clean_text(all_text())
             if all_text:
                 content_parts.append(all_text)
         
@@ -284,8 +299,270 @@ Respond in JSON format:
         
         return full_content
 
-    def scrape_url(self, url, max_pages=1, islamic_only=False, use_ai_analysis=True):
-        """Scrape content from a single URL or multiple pages with AI analysis"""
+    def extract_content_stream(self, body, encoding=None):
+        """Extract content and links from raw HTML in one streaming lxml pass
+
+        Produces the same text as 'blocks' extraction without building a
+        tree; returns (content, hrefs of the first 20 links).
+        """
+        title, texts, hrefs = html_stream.parse_html(body, encoding)
+        title_text = self.clean_text(title)
+        content_parts = [f"Title: {title_text}"] if title_text else []
+        return self._assemble_content(content_parts, texts, lambda: "".join(texts)), hrefs
+
+    def _parse_html(self, body):
+        """Build a BeautifulSoup tree, preferring lxml over the stdlib parser"""
+        try:
+            return BeautifulSoup(body, 'lxml')
+        except FeatureNotFound:
+            return BeautifulSoup(body, 'html.parser')
+
+    def _new_engine(self):
+        """Create a crawl engine over the shared session (inside the event loop)"""
+        return CrawlEngine(self.session, max_concurrency=self.max_concurrency,
+                           per_host_delay=self.per_host_delay, http_cache=self.http_cache)
+
+    def _handle_response(self, current_url, response, netloc, islamic_only, use_ai_analysis, cache_stats):
+        """Turn a fetch into (item, links), reusing cached work on 304 Not Modified"""
+        variant = json.dumps([netloc, islamic_only, bool(use_ai_analysis and self.openai_client), self.extraction_mode])
+        if response.status_code == 304:
+            return self._reuse_cached_page(current_url, response, netloc, variant,
+                                           islamic_only, use_ai_analysis, cache_stats)
+        
+        # Handle different HTTP status codes
+        if response.status_code == 404:
+            print_warning(f"⚠️ Page not found (404): {current_url}")
+            return None, []
+        elif response.status_code == 403:
+            print_warning(f"⚠️ Access forbidden (403): {current_url}")
+            return None, []
+        elif response.status_code >= 400:
+            print_warning(f"⚠️ HTTP {response.status_code}: {current_url}")
+            return None, []
+        
+        started = time.monotonic()
+        content_type = response.headers.get('content-type', '').lower()
+        item, links = self._process_page(current_url, content_type, response.content, netloc,
+                                         islamic_only, use_ai_analysis, cache_stats)
+        
+        # Remember the page so the next crawl can ask whether it changed
+        cost = response.elapsed.total_seconds() + time.monotonic() - started
+        self.http_cache.store(current_url, response.headers, content_type, response.content,
+                              cost, variant, [item, links])
+        return item, links
+
+    def _reuse_cached_page(self, current_url, response, netloc, variant, islamic_only, use_ai_analysis, cache_stats):
+        """Serve an unchanged page from the HTTP cache without downloading it"""
+        cached = self.http_cache.lookup(current_url, variant)
+        if cached is None:
+            print_warning(f"⚠️ Not modified (304) but no cached copy: {current_url}")
+            return None, []
+        
+        started = time.monotonic()
+        size, cost, result = cached
+        if result is None:
+            # Cached under different options: reprocess the stored body
+            content_type, body = self.http_cache.body(current_url)
+            result = self._process_page(current_url, content_type, body, netloc,
+                                        islamic_only, use_ai_analysis, cache_stats)
+            self.http_cache.update_result(current_url, variant, list(result))
+        
+        saved = cost - (response.elapsed.total_seconds() + time.monotonic() - started)
+        with self._stats_lock:
+            cache_stats['not_modified'] += 1
+            cache_stats['bytes_saved'] += size
+            cache_stats['time_saved'] += max(0.0, saved)
+        print_info(f"♻️ Not modified, reused cached page: {current_url}")
+        
+        item, links = result
+        if item is not None:
+            # The page was confirmed unchanged just now; don't report the old scrape time
+            stamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            item = dict(item, revalidated=True, content=SCRAPED_LINE_RE.sub(
+                f"Scraped: {stamp} (revalidated, not modified)", item['content'], count=1))
+        return item, links
+
+    def _process_page(self, current_url, content_type, body, netloc, islamic_only, use_ai_analysis, cache_stats):
+        """Analyze one page body and return (item, same-domain links)"""
+        # Check content type
+        if 'text/html' not in content_type:
+            print_warning(f"⚠️ Skipping non-HTML content: {content_type}")
+            return None, []
+        
+        print_info(f"📄 Scraped page: {current_url}")
+        
+        # Extract content and links; large pages stream through lxml without a tree
+        if (self.extraction_mode == 'blocks' and self.stream_threshold is not None
+                and len(body) >= self.stream_threshold):
+            content, hrefs = self.extract_content_stream(body, html_stream.sniff_encoding(body, content_type))
+        else:
+            soup = self._parse_html(body)
+            content = self.extract_content(soup, current_url)
+            hrefs = [link['href'] for link in soup.find_all('a', href=True)[:20]]
+        
+        # Same-domain links to follow if more pages are wanted
+        links = []
+        for href in hrefs:
+            full_url = self.clean_url(urljoin(current_url, href))
+            if full_url and urlparse(full_url).netloc == netloc:
+                links.append(full_url)
+        
+        if not content or len(content.strip()) <= 100:
+            return None, links
+        
+        # AI-powered content analysis
+        if use_ai_analysis and self.openai_client:
+            ai_analysis = self.ai_analyze_content(content, current_url, cache_stats)
+            
+            # Skip low-quality content if AI says so
+            if not ai_analysis['is_quality'] and ai_analysis['confidence'] > 0.7:
+                print_info(f"⏭️ Skipping low-quality content from {current_url}")
+                return None, []
+        else:
+            ai_analysis = None
+        
+        # Traditional Islamic content detection
+        islamic_analysis = self.detect_islamic_content(content)
+        
+        # Combine AI and traditional analysis
+        combined_islamic = islamic_analysis['is_islamic']
+        if ai_analysis:
+            combined_islamic = combined_islamic or ai_analysis['is_islamic']
+        
+        # If Islamic filter is on, only keep Islamic content
+        if islamic_only and not combined_islamic:
+            print_info(f"⏭️ Skipping non-Islamic content from {current_url}")
+            return None, []
+        
+        # Add metadata
+        metadata = f"""
+URL: {current_url}
+Scraped: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Content Length: {len(content)} characters
+"""
+        if ai_analysis:
+            metadata += f"AI Quality Score: {ai_analysis['confidence']:.2f}\n"
+            metadata += f"AI Summary: {ai_analysis['summary']}\n"
+        
+        metadata += f"Islamic Score: {islamic_analysis['islamic_score']:.1f}%\n"
+        metadata += f"Quran References: {islamic_analysis['quran_references']}\n"
+        metadata += f"Hadith References: {islamic_analysis['hadith_references']}\n"
+        metadata += "---\n\n"
+        
+        item = {
+            'content': metadata + content,
+            'url': current_url,
+            'islamic_analysis': islamic_analysis,
+            'ai_analysis': ai_analysis
+        }
+        return item, links
+
+    def _build_result(self, url, all_content, use_ai_analysis, cache_stats):
+        """Combine scraped pages, save them and build the result dict"""
+        if not all_content:
+            return {
+                'success': False,
+                'message': 'No content could be extracted from the URL(s). The page might not exist, be blocked, or contain no meaningful content.',
+                'content': '',
+                'analysis': None
+            }
+        
+        # Combine all content
+        combined_content = ""
+        total_islamic_score = 0
+        total_quran_refs = 0
+        total_hadith_refs = 0
+        ai_quality_scores = []
+        
+        for item in all_content:
+            combined_content += f"\n\n{'='*80}\n\n" + item['content']
+            
+            analysis = item['islamic_analysis']
+            total_islamic_score += analysis['islamic_score']
+            total_quran_refs += analysis['quran_references']
+            total_hadith_refs += analysis['hadith_references']
+            
+            if item['ai_analysis']:
+                ai_quality_scores.append(item['ai_analysis']['confidence'])
+        
+        # Normalized citations (the detector only counts them)
+        citations = sorted(set(parse_citations(combined_content)), key=citation_key)
+        
+        # Overall analysis
+        overall_analysis = {
+            'is_islamic': total_islamic_score > 0 or total_quran_refs > 0 or total_hadith_refs > 0,
+            'islamic_score': total_islamic_score / len(all_content),
+            'quran_references': total_quran_refs,
+            'hadith_references': total_hadith_refs,
+            'citations': [format_citation(citation) for citation in citations],
+            'pages_scraped': len(all_content),
+            'ai_enabled': use_ai_analysis and self.openai_client is not None,
+            'ai_cache_hits': cache_stats['hits'],
+            'ai_cache_misses': cache_stats['misses'],
+            'http_not_modified': cache_stats['not_modified'],
+            'http_bytes_saved': cache_stats['bytes_saved'],
+            'http_time_saved': cache_stats['time_saved'],
+            'avg_ai_quality': sum(ai_quality_scores) / len(ai_quality_scores) if ai_quality_scores else 0
+        }
+        
+        # Save to file (sites crawled in parallel may finish in the same second)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        domain = urlparse(url).netloc.replace('.', '_')
+        filename = f"scraped_{domain}_{timestamp}.txt"
+        suffix = 1
+        while (self.scraped_dir / filename).exists():
+            filename = f"scraped_{domain}_{timestamp}_{suffix}.txt"
+            suffix += 1
+        output_file = self.scraped_dir / filename
+        
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(combined_content)
+        
+        if self.retrieval_index is not None:
+            self.retrieval_index.sync_text_file(output_file)
+        
+        ai_status = "🤖 AI-Enhanced" if overall_analysis['ai_enabled'] else "📝 Traditional"
+        
+        success_message = f"""
+✅ Successfully scraped {len(all_content)} page(s) {ai_status}
+📁 Content saved to: {filename}
+📊 Total content length: {len(combined_content):,} characters
+🕌 Islamic content score: {overall_analysis['islamic_score']:.1f}%
+📖 Quran references found: {total_quran_refs}
+📚 Hadith references found: {total_hadith_refs}
+"""
+        
+        if citations:
+            examples = ", ".join(overall_analysis['citations'][:5])
+            more = f" (+{len(citations) - 5} more)" if len(citations) > 5 else ""
+            success_message += f"🔖 Citations parsed: {examples}{more}\n"
+        
+        if overall_analysis['ai_enabled']:
+            success_message += f"🤖 Average AI quality score: {overall_analysis['avg_ai_quality']:.2f}\n"
+            success_message += f"💾 AI analysis cache: {overall_analysis['ai_cache_hits']} hits, {overall_analysis['ai_cache_misses']} misses\n"
+        
+        if overall_analysis['http_not_modified']:
+            success_message += f"♻️ Unchanged pages reused: {overall_analysis['http_not_modified']} (saved {overall_analysis['http_bytes_saved'] / 1024:,.1f} KB, {overall_analysis['http_time_saved']:.1f}s)\n"
+        
+        success_message += """
+💡 Next steps:
+1. Review the scraped content in the file
+2. Use 'Process with AI' to format as training data
+3. Or manually extract Q&A pairs for training
+"""
+        
+        print_success(f"✅ Scraping completed: {filename}")
+        
+        return {
+            'success': True,
+            'message': success_message,
+            'content': combined_content,
+            'file_path': str(output_file),
+            'analysis': overall_analysis
+        }
+
+    async def _scrape_site(self, engine, url, max_pages, islamic_only, use_ai_analysis):
+        """Crawl one site through the engine and build its result dict"""
         try:
             # Clean URL
             url = self.clean_url(url)
@@ -309,204 +586,34 @@ Respond in JSON format:
                     'analysis': None
                 }
             
-            all_content = []
-            urls_to_scrape = [url]
-            scraped_urls = set()
+            cache_stats = {'hits': 0, 'misses': 0, 'not_modified': 0, 'bytes_saved': 0, 'time_saved': 0.0}
             
-            for current_url in urls_to_scrape[:max_pages]:
-                if current_url in scraped_urls:
-                    continue
-                
-                try:
-                    print_info(f"📄 Scraping page: {current_url}")
-                    
-                    # Make request with better error handling
-                    response = self.session.get(current_url, timeout=15, allow_redirects=True)
-                    
-                    # Handle different HTTP status codes
-                    if response.status_code == 404:
-                        print_warning(f"⚠️ Page not found (404): {current_url}")
-                        continue
-                    elif response.status_code == 403:
-                        print_warning(f"⚠️ Access forbidden (403): {current_url}")
-                        continue
-                    elif response.status_code >= 400:
-                        print_warning(f"⚠️ HTTP {response.status_code}: {current_url}")
-                        continue
-                    
-                    response.raise_for_status()
-                    
-                    # Check content type
-                    content_type = response.headers.get('content-type', '').lower()
-                    if 'text/html' not in content_type:
-                        print_warning(f"⚠️ Skipping non-HTML content: {content_type}")
-                        continue
-                    
-                    # Parse HTML with fallback parsers
-                    try:
-                        soup = BeautifulSoup(response.content, 'lxml')
-                    except:
-                        try:
-                            soup = BeautifulSoup(response.content, 'html.parser')
-                        except:
-                            soup = BeautifulSoup(response.content, 'html5lib')
-                    
-                    # Extract content
-                    content = self.extract_content(soup, current_url)
-                    
-                    if content and len(content.strip()) > 100:
-                        # AI-powered content analysis
-                        if use_ai_analysis and self.openai_client:
-                            ai_analysis = self.ai_analyze_content(content, current_url)
-                            
-                            # Skip low-quality content if AI says so
-                            if not ai_analysis['is_quality'] and ai_analysis['confidence'] > 0.7:
-                                print_info(f"⏭️ Skipping low-quality content from {current_url}")
-                                continue
-                        else:
-                            ai_analysis = None
-                        
-                        # Traditional Islamic content detection
-                        islamic_analysis = self.detect_islamic_content(content)
-                        
-                        # Combine AI and traditional analysis
-                        combined_islamic = islamic_analysis['is_islamic']
-                        if ai_analysis:
-                            combined_islamic = combined_islamic or ai_analysis['is_islamic']
-                        
-                        # If Islamic filter is on, only keep Islamic content
-                        if islamic_only and not combined_islamic:
-                            print_info(f"⏭️ Skipping non-Islamic content from {current_url}")
-                            continue
-                        
-                        # Add metadata
-                        metadata = f"""
-URL: {current_url}
-Scraped: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-Content Length: {len(content)} characters
-"""
-                        if ai_analysis:
-                            metadata += f"AI Quality Score: {ai_analysis['confidence']:.2f}\n"
-                            metadata += f"AI Summary: {ai_analysis['summary']}\n"
-                        
-                        metadata += f"Islamic Score: {islamic_analysis['islamic_score']:.1f}%\n"
-                        metadata += f"Quran References: {islamic_analysis['quran_references']}\n"
-                        metadata += f"Hadith References: {islamic_analysis['hadith_references']}\n"
-                        metadata += "---\n\n"
-                        
-                        full_content = metadata + content
-                        
-                        all_content.append({
-                            'content': full_content,
-                            'url': current_url,
-                            'islamic_analysis': islamic_analysis,
-                            'ai_analysis': ai_analysis
-                        })
-                        scraped_urls.add(current_url)
-                    
-                    # Find additional pages if max_pages > 1
-                    if len(urls_to_scrape) < max_pages:
-                        links = soup.find_all('a', href=True)
-                        for link in links[:20]:
-                            href = link['href']
-                            full_url = urljoin(current_url, href)
-                            
-                            # Clean the discovered URL
-                            full_url = self.clean_url(full_url)
-                            
-                            # Only add links from same domain
-                            if (full_url and 
-                                urlparse(full_url).netloc == parsed_url.netloc and 
-                                full_url not in urls_to_scrape and 
-                                full_url not in scraped_urls):
-                                urls_to_scrape.append(full_url)
-                    
-                    # Respectful delay
-                    time.sleep(1)
-                    
-                except requests.exceptions.RequestException as e:
-                    print_warning(f"⚠️ Failed to scrape {current_url}: {e}")
-                    continue
-                except Exception as e:
-                    print_warning(f"⚠️ Unexpected error scraping {current_url}: {e}")
-                    continue
+            def process(current_url, response):
+                return self._handle_response(current_url, response, parsed_url.netloc,
+                                             islamic_only, use_ai_analysis, cache_stats)
             
-            if not all_content:
-                return {
-                    'success': False,
-                    'message': 'No content could be extracted from the URL(s). The page might not exist, be blocked, or contain no meaningful content.',
-                    'content': '',
-                    'analysis': None
-                }
+            def on_error(current_url, error):
+                if isinstance(error, requests.exceptions.RequestException):
+                    print_warning(f"⚠️ Failed to scrape {current_url}: {error}")
+                else:
+                    print_warning(f"⚠️ Unexpected error scraping {current_url}: {error}")
             
-            # Combine all content
-            combined_content = ""
-            total_islamic_score = 0
-            total_quran_refs = 0
-            total_hadith_refs = 0
-            ai_quality_scores = []
-            
-            for item in all_content:
-                combined_content += f"\n\n{'='*80}\n\n" + item['content']
-                
-                analysis = item['islamic_analysis']
-                total_islamic_score += analysis['islamic_score']
-                total_quran_refs += analysis['quran_references']
-                total_hadith_refs += analysis['hadith_references']
+            # Crawl state lives on disk so an interrupted crawl resumes on the next run
+            frontier = CrawlFrontier(self.frontier_path, url)
+            try:
+                if frontier.is_finished():
+                    frontier.reset()
+                elif len(frontier):
+                    counts = frontier.counts()
+                    print_info(f"🔁 Resuming crawl of {url}: {counts.get('done', 0)} page(s) already scraped, {len(frontier)} URL(s) known")
                 
-                if item['ai_analysis']:
-                    ai_quality_scores.append(item['ai_analysis']['confidence'])
-            
-            # Overall analysis
-            overall_analysis = {
-                'is_islamic': total_islamic_score > 0 or total_quran_refs > 0 or total_hadith_refs > 0,
-                'islamic_score': total_islamic_score / len(all_content),
-                'quran_references': total_quran_refs,
-                'hadith_references': total_hadith_refs,
-                'pages_scraped': len(scraped_urls),
-                'ai_enabled': use_ai_analysis and self.openai_client is not None,
-                'avg_ai_quality': sum(ai_quality_scores) / len(ai_quality_scores) if ai_quality_scores else 0
-            }
-            
-            # Save to file
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            domain = urlparse(url).netloc.replace('.', '_')
-            filename = f"scraped_{domain}_{timestamp}.txt"
-            output_file = self.scraped_dir / filename
-            
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(combined_content)
-            
-            ai_status = "🤖 AI-Enhanced" if overall_analysis['ai_enabled'] else "📝 Traditional"
-            
-            success_message = f"""
-✅ Successfully scraped {len(scraped_urls)} page(s) {ai_status}
-📁 Content saved to: {filename}
-📊 Total content length: {len(combined_content):,} characters
-🕌 Islamic content score: {overall_analysis['islamic_score']:.1f}%
-📖 Quran references found: {total_quran_refs}
-📚 Hadith references found: {total_hadith_refs}
-"""
-            
-            if overall_analysis['ai_enabled']:
-                success_message += f"🤖 Average AI quality score: {overall_analysis['avg_ai_quality']:.2f}\n"
+                all_content = await engine.crawl(url, process, max_pages=max_pages,
+                                                 on_error=on_error, frontier=frontier)
+                frontier.reset()
+            finally:
+                frontier.close()
             
-            success_message += """
-💡 Next steps:
-1. Review the scraped content in the file
-2. Use 'Process with AI' to format as training data
-3. Or manually extract Q&A pairs for training
-"""
-            
-            print_success(f"✅ Scraping completed: {filename}")
-            
-            return {
-                'success': True,
-                'message': success_message,
-                'content': combined_content,
-                'file_path': str(output_file),
-                'analysis': overall_analysis
-            }
+            return self._build_result(url, all_content, use_ai_analysis, cache_stats)
             
         except Exception as e:
             error_message = f"Scraping failed: {str(e)}"
@@ -518,18 +625,21 @@ Content Length: {len(content)} characters
                 'analysis': None
             }
 
-    def scrape_multiple_urls(self, urls, max_pages_per_url=1, islamic_only=False):
-        """Scrape content from multiple URLs"""
-        all_results = []
-        
-        for url in urls:
-            result = self.scrape_url(url, max_pages_per_url, islamic_only)
-            all_results.append(result)
-            
-            # Add delay between different domains
-            time.sleep(2)
-        
-        return all_results
+    async def _scrape_sites(self, urls, max_pages, islamic_only, use_ai_analysis):
+        """Crawl several sites concurrently through one engine"""
+        engine = self._new_engine()
+        return await asyncio.gather(*(
+            self._scrape_site(engine, url, max_pages, islamic_only, use_ai_analysis)
+            for url in urls
+        ))
+
+    def scrape_url(self, url, max_pages=1, islamic_only=False, use_ai_analysis=True):
+        """Scrape content from a single URL or multiple pages with AI analysis"""
+        return asyncio.run(self._scrape_sites([url], max_pages, islamic_only, use_ai_analysis))[0]
+
+    def scrape_multiple_urls(self, urls, max_pages_per_url=1, islamic_only=False, use_ai_analysis=True):
+        """Scrape content from multiple URLs, crawling different hosts in parallel"""
+        return asyncio.run(self._scrape_sites(list(urls), max_pages_per_url, islamic_only, use_ai_analysis))
 
     def get_scraped_files(self):
         """Get list of all scraped files"""
@@ -0,0 +1,10 @@
+"""
+Pytest configuration: make the flat modules in src/ importable
+"""
+
+import sys
+from pathlib import Path
+
+# Add src directory to Python path (modules import each other by bare name)
+src_dir = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_dir))
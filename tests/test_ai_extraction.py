@@ -0,0 +1,155 @@
+"""
+Tests for concurrent Q&A extraction, against fake clients and a local
+OpenAI-compatible HTTP server
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from ai_extraction import QAExtractor, TokenBucket, call_with_retry
+
+
+class _StatusError(Exception):
+    """Stand-in for openai.APIStatusError"""
+
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class _FakeCompletions:
+    """Answers with one Q&A pair echoing the chunk, after a per-chunk delay"""
+
+    def __init__(self, fail_first=0):
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self.fail_first = fail_first
+        self._lock = threading.Lock()
+
+    def create(self, model, messages, max_tokens, temperature):
+        with self._lock:
+            self.calls += 1
+            if self.calls <= self.fail_first:
+                raise _StatusError(429)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        chunk = messages[1]['content'].rsplit('\n\n', 1)[1]
+        # Later chunks finish first, so ordering must not depend on completion
+        time.sleep(0.05 / (int(chunk) + 1))
+        with self._lock:
+            self.active -= 1
+        content = json.dumps([{"question": f"Q{chunk}", "answer": "A", "source": "S", "reference": "R"}])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def _fake_client(completions):
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+
+def test_results_are_in_chunk_order_with_bounded_concurrency():
+    """Results follow chunk order and concurrency never exceeds max_workers"""
+    completions = _FakeCompletions()
+    extractor = QAExtractor(_fake_client(completions), max_workers=3, requests_per_second=1000)
+
+    results, errors = extractor.extract([str(i) for i in range(8)], "prompt")
+
+    assert errors == {}
+    assert [r[0]["question"] for r in results] == [f"Q{i}" for i in range(8)]
+    assert 1 < completions.max_active <= 3
+
+
+def test_rate_limited_requests_are_retried():
+    """429 responses are retried with backoff until they succeed"""
+    completions = _FakeCompletions(fail_first=2)
+    extractor = QAExtractor(_fake_client(completions), max_workers=1,
+                            requests_per_second=1000, base_delay=0.01)
+
+    results, errors = extractor.extract(["0"], "prompt")
+
+    assert errors == {}
+    assert results[0][0]["question"] == "Q0"
+    assert completions.calls == 3
+
+
+def test_client_errors_are_not_retried():
+    """4xx errors other than 429 fail immediately"""
+    calls = []
+
+    def bad_request():
+        calls.append(1)
+        raise _StatusError(400)
+
+    with pytest.raises(_StatusError):
+        call_with_retry(bad_request, base_delay=0.01)
+    assert len(calls) == 1
+
+
+def test_token_bucket_spaces_requests():
+    """The bucket admits a burst of `capacity`, then `rate` per second"""
+    bucket = TokenBucket(rate=20, capacity=1)
+    start = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.18
+
+
+class _FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """Minimal /v1/chat/completions endpoint that rate-limits the first call"""
+
+    calls = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with self.lock:
+            type(self).calls += 1
+            first = type(self).calls == 1
+        if first:
+            self._send(429, {"error": {"message": "slow down", "type": "rate_limit"}},
+                       {"retry-after": "0"})
+            return
+        chunk = body["messages"][1]["content"].rsplit("\n\n", 1)[1]
+        content = json.dumps([{"question": f"Q{chunk}", "answer": "A", "source": "S", "reference": "R"}])
+        self._send(200, {
+            "id": "chatcmpl-test", "object": "chat.completion", "created": 0, "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        })
+
+    def _send(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_against_local_openai_compatible_server():
+    """End to end through the real OpenAI client and a local fake server"""
+    openai = pytest.importorskip("openai")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeOpenAIHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = openai.OpenAI(api_key="test", base_url=f"http://127.0.0.1:{server.server_port}/v1")
+        extractor = QAExtractor(client, max_workers=4, requests_per_second=100, base_delay=0.01)
+
+        results, errors = extractor.extract([str(i) for i in range(6)], "prompt")
+
+        assert errors == {}
+        assert [r[0]["question"] for r in results] == [f"Q{i}" for i in range(6)]
+    finally:
+        server.shutdown()
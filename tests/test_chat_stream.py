@@ -0,0 +1,68 @@
+"""
+Tests for streamed chat completions against a local server-sent events endpoint
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from chat_stream import format_stream_stats, stream_chat
+
+WORDS = ["The", " five", " pillars", " are", " shahada,", " salah,", " zakat,", " sawm", " and", " hajj."]
+
+
+class _StreamingHandler(BaseHTTPRequestHandler):
+    """Streams WORDS as chat.completion.chunk events, then a usage chunk"""
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        assert request["stream"] is True
+
+        def chunk(delta, usage=None):
+            choices = [{"index": 0, "delta": delta, "finish_reason": None}] if delta is not None else []
+            return "data: " + json.dumps({"id": "chatcmpl-test", "object": "chat.completion.chunk",
+                                          "created": 0, "model": request["model"],
+                                          "choices": choices, "usage": usage}) + "\n\n"
+
+        events = [chunk({"role": "assistant", "content": ""})]
+        events += [chunk({"content": word}) for word in WORDS]
+        events.append(chunk(None, {"prompt_tokens": 9, "completion_tokens": 12, "total_tokens": 21}))
+        events.append("data: [DONE]\n\n")
+        data = "".join(events).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_stream_reports_first_token_and_throughput():
+    openai = pytest.importorskip("openai")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StreamingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = openai.OpenAI(api_key="test", base_url=f"http://127.0.0.1:{server.server_port}/v1")
+        messages = [{"role": "user", "content": "What are the five pillars of Islam?"}]
+
+        updates = list(stream_chat(client, "ft:test", messages, update_interval=0))
+        answer, stats = updates[-1]
+        assert answer == "".join(WORDS)
+        assert [text for text, _ in updates[:-1]] == ["".join(WORDS[:n]) for n in range(1, len(WORDS) + 1)]
+        assert stats["tokens"] == 12
+        assert 0 < stats["first_token"] <= stats["seconds"]
+        assert stats["tokens_per_second"] > 0
+    finally:
+        server.shutdown()
+
+
+def test_format_stream_stats():
+    assert format_stream_stats({"first_token": None, "tokens": 0, "tokens_per_second": None, "seconds": None}) \
+        == "⏱️ No tokens received yet"
+    stats = {"first_token": 0.4213, "tokens": 120, "tokens_per_second": 38.46, "seconds": 3.5412}
+    assert format_stream_stats(stats) == "⏱️ First token 0.42s · 38.5 tok/s · 120 tokens · 3.54s total"
@@ -0,0 +1,53 @@
+"""
+Tests for the columnar compact example store
+"""
+
+import json
+from pathlib import Path
+
+from compact_store import CompactExampleStore, split_citation
+from jsonl_store import read_jsonl
+
+TRAINING_FILE = Path(__file__).parent.parent / "data" / "islamic_training.jsonl"
+
+
+def test_round_trip_matches_training_file(tmp_path):
+    """Examples read back from the store equal the original JSONL examples"""
+    examples = [example for _, example in read_jsonl(TRAINING_FILE)]
+    store = CompactExampleStore.from_examples(examples)
+
+    assert list(store) == examples
+    assert len(store.system_prompts.values) == 1
+
+    out = tmp_path / "export.jsonl"
+    store.write_jsonl(out)
+    assert [json.loads(line) for line in out.read_text(encoding='utf-8').splitlines()] == examples
+
+
+def test_non_standard_examples_are_kept_verbatim():
+    """Examples outside the standard layout survive unchanged"""
+    odd = {"messages": [{"role": "user", "content": "Salam"}], "category": "Greeting"}
+    no_marker = {
+        "messages": [
+            {"role": "system", "content": "s"},
+            {"role": "user", "content": "q"},
+            {"role": "assistant", "content": "an answer without a reference"},
+        ],
+        "category": "General",
+        "id": "abc",
+    }
+    store = CompactExampleStore.from_examples([odd, no_marker])
+
+    assert store[0] == odd
+    assert store[1] == no_marker
+    assert store.category_counts() == {"Greeting": 1, "General": 1}
+
+
+def test_split_citation_handles_multi_word_sources_and_references():
+    """The reference starts at the first number or reference keyword"""
+    assert split_citation("Sahih al-Bukhari 6094") == ("Sahih al-Bukhari", "6094")
+    assert split_citation("Quran 2:155-157") == ("Quran", "2:155-157")
+    assert split_citation("Bukhari, Book 2, Hadith 8") == ("Bukhari", "Book 2, Hadith 8")
+    assert split_citation("General Knowledge N/A") == ("General Knowledge", "N/A")
+    assert split_citation("System Guidance Scope Definition") == ("System Guidance Scope Definition", "")
+    assert split_citation("Quran") == ("Quran", "")
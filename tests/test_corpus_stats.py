@@ -0,0 +1,56 @@
+"""
+Tests for the incremental corpus statistics
+"""
+
+from corpus_stats import CorpusStats, length_bucket, load_stats, save_stats
+
+
+def make_example(question, source="Sahih al-Bukhari", reference="6094", category="Character"):
+    citation = f"\n\n**Reference:** {source} {reference}".rstrip() if source else ""
+    return {"messages": [
+        {"role": "system", "content": "You are an Islamic scholar assistant."},
+        {"role": "user", "content": question},
+        {"role": "assistant", "content": f"An answer.{citation}"},
+    ], "category": category}
+
+
+def test_add_and_remove_are_inverse():
+    stats = CorpusStats()
+    first = make_example("What is honesty?")
+    second = make_example("What is prayer?", source="Quran", reference="2:43", category="Prayer")
+    stats.add(first, 40)
+    before = stats.to_dict()
+
+    stats.add(second, 300)
+    assert stats.examples == 2 and stats.tokens == 340
+    assert stats.categories == {"Character": 1, "Prayer": 1}
+    assert stats.sources == {"Sahih al-Bukhari": 1, "Quran": 1}
+    assert stats.lengths == {length_bucket(40): 1, length_bucket(300): 1}
+
+    stats.remove(second, 300)
+    assert stats.to_dict() == before
+
+
+def test_citation_coverage():
+    stats = CorpusStats()
+    stats.add(make_example("Cited with number"), 10)
+    stats.add(make_example("Cited without number", source="Quran", reference=""), 10)
+    stats.add(make_example("Not cited", source=None), 10)
+
+    assert (stats.cited, stats.with_reference) == (2, 1)
+    assert stats.sources == {"Sahih al-Bukhari": 1, "Quran": 1}
+
+    stats.add(make_example("Multi-word reference", source="Bukhari", reference="Book 2, Hadith 8"), 10)
+    assert stats.sources["Bukhari"] == 1 and stats.with_reference == 2
+
+
+def test_saved_stats_only_load_for_the_same_corpus_state(tmp_path):
+    path = tmp_path / "train.stats.json"
+    stats = CorpusStats()
+    stats.add(make_example("What is zakat?"), 25)
+    save_stats(path, stats, [100, 1, 2], "o200k_base")
+
+    assert load_stats(path, [100, 1, 2], "o200k_base").to_dict() == stats.to_dict()
+    assert load_stats(path, [120, 1, 2], "o200k_base") is None
+    assert load_stats(path, [100, 1, 2], "estimate") is None
+    assert load_stats(tmp_path / "missing.json", None, "estimate") is None
@@ -0,0 +1,58 @@
+"""
+Tests for the persistent, resumable crawl frontier
+"""
+
+from crawl_frontier import CrawlFrontier, MEMORY
+
+
+def test_discovery_is_deduplicated_and_limited():
+    """Known URLs are not queued twice and add_many stops at the limit"""
+    frontier = CrawlFrontier(MEMORY, "site")
+
+    assert frontier.add("http://x/")
+    assert not frontier.add("http://x/")
+    assert frontier.add_many(["http://x/a", "http://x/", "http://x/b", "http://x/c"], depth=1, limit=3) == 2
+    assert len(frontier) == 3
+    assert frontier.counts() == {'pending': 3}
+
+
+def test_claim_orders_by_priority_then_discovery():
+    """Higher priority URLs are claimed first, then in discovery order"""
+    frontier = CrawlFrontier(MEMORY, "site")
+    frontier.add_many(["a", "b"], depth=1)
+    frontier.add("urgent", depth=2, priority=5)
+    frontier.add("c", depth=1)
+
+    assert frontier.claim(3) == [("urgent", 2), ("a", 1), ("b", 1)]
+    assert frontier.claim(3) == [("c", 1)]
+    assert frontier.claim(3) == []
+
+
+def test_state_survives_reopen_and_resumes(tmp_path):
+    """Reopening a frontier keeps its rows and returns in-progress URLs to the queue"""
+    db_path = tmp_path / "frontier.sqlite"
+    frontier = CrawlFrontier(db_path, "site")
+    frontier.add_many(["a", "b", "c", "d"])
+    frontier.claim(3)
+    frontier.complete("a", {'content': "A"})
+    frontier.complete("b", error="timeout")
+    frontier.close()
+
+    frontier = CrawlFrontier(db_path, "site")
+    assert frontier.resumed == 1
+    assert frontier.counts() == {'done': 1, 'failed': 1, 'pending': 2}
+    assert len(frontier) == 4
+    assert not frontier.add("a")
+    assert [url for url, _ in frontier.claim(5)] == ["c", "d"]
+
+    frontier.complete("c", None)
+    frontier.complete("d", {'content': "D"})
+    assert frontier.is_finished()
+    assert list(frontier.results(batch_size=1)) == [{'content': "A"}, {'content': "D"}]
+
+    # Crawls are isolated from each other
+    other = CrawlFrontier(db_path, "other")
+    assert len(other) == 0 and other.add("a")
+
+    frontier.reset()
+    assert len(frontier) == 0 and frontier.counts() == {}
@@ -0,0 +1,243 @@
+"""
+Tests for the asyncio crawl engine, against a local HTTP server
+"""
+
+import asyncio
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+from crawl_frontier import CrawlFrontier
+from crawler import CrawlEngine, configure_session
+
+SITE = {
+    "/": '<html><head><title>Home</title></head><body>'
+         '<a href="/a">A</a> <a href="/b">B</a> <a href="/c">C</a></body></html>',
+    "/a": '<html><body><p>Page A</p><a href="/">home</a></body></html>',
+    "/b": '<html><body><p>Page B</p><a href="/d">D</a></body></html>',
+    "/c": '<html><body><p>Page C</p></body></html>',
+    "/d": '<html><body><p>Page D</p></body></html>',
+}
+
+
+class LocalSite:
+    """A tiny threaded HTTP server that records when each path was requested"""
+
+    def __init__(self, pages, delay=0.0):
+        self.pages = pages
+        self.requests = []
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                site.requests.append((self.path, time.monotonic()))
+                time.sleep(delay)
+                body = site.pages.get(self.path)
+                etag = f'"{zlib.crc32((body or "").encode("utf-8"))}"'
+                if body is not None and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200 if body is not None else 404)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("ETag", etag)
+                data = (body or "missing").encode("utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def make_site():
+    sites = []
+
+    def factory(pages=SITE, delay=0.0):
+        site = LocalSite(pages, delay)
+        sites.append(site)
+        return site
+
+    yield factory
+    for site in sites:
+        site.close()
+
+
+def link_process(url, response):
+    """Return the body as the item and every href on the page as links"""
+    base = url.split("/", 3)
+    links = [f"{base[0]}//{base[2]}{href}" for href in
+             [part.split('"')[0] for part in response.text.split('href="')[1:]]]
+    return response.text, links
+
+
+def crawl(engine_kwargs, *coroutine_args):
+    async def run():
+        engine = CrawlEngine(configure_session(requests.Session()), **engine_kwargs)
+        return await asyncio.gather(*(engine.crawl(*args) for args in coroutine_args))
+    return asyncio.run(run())
+
+
+def test_crawl_follows_links_up_to_max_pages(make_site):
+    """Links are followed until max_pages pages were scraped, each URL once"""
+    site = make_site()
+    [items] = crawl({'per_host_delay': 0}, (site.url + "/", link_process, 4))
+
+    assert len(items) == 4
+    assert "Home" in items[0]
+    assert [p for p, _ in site.requests].count("/") == 1
+    assert "/d" not in [p for p, _ in site.requests]
+
+
+def test_errors_are_reported_and_skipped(make_site):
+    """A failing page goes to on_error and is left out of the results"""
+    site = make_site({"/": '<a href="/missing">x</a>'})
+    errors = []
+
+    def strict(url, response):
+        response.raise_for_status()
+        return link_process(url, response)
+
+    async def run():
+        engine = CrawlEngine(requests.Session(), per_host_delay=0)
+        return await engine.crawl(site.url + "/", strict, max_pages=2,
+                                  on_error=lambda url, e: errors.append(url))
+
+    assert len(asyncio.run(run())) == 1
+    assert errors == [site.url + "/missing"]
+
+
+def test_failed_pages_do_not_count_towards_max_pages(make_site):
+    """A failed link is replaced by the next discovered one"""
+    site = make_site({
+        "/": '<a href="/missing">x</a> <a href="/a">A</a> <a href="/b">B</a>',
+        "/a": "Page A",
+        "/b": "Page B",
+    })
+
+    def strict(url, response):
+        response.raise_for_status()
+        return link_process(url, response)
+
+    frontier = CrawlFrontier(":memory:", site.url)
+    [items] = crawl({'per_host_delay': 0}, (site.url + "/", strict, 2, None, frontier))
+
+    assert len(items) == 2
+    assert "/b" not in [p for p, _ in site.requests]
+    assert frontier.is_finished()
+
+
+def test_crawl_resumes_from_persistent_frontier(make_site, tmp_path):
+    """An interrupted crawl only fetches the pages it had not finished"""
+    site = make_site()
+    db_path = tmp_path / "frontier.sqlite"
+
+    # An earlier run finished "/" and was interrupted while fetching "/a"
+    frontier = CrawlFrontier(db_path, site.url)
+    frontier.add(site.url + "/")
+    frontier.add_many([site.url + "/a", site.url + "/b"], depth=1)
+    frontier.claim(2)
+    frontier.complete(site.url + "/", "home page")
+    frontier.close()
+
+    frontier = CrawlFrontier(db_path, site.url)
+    assert frontier.resumed == 1
+    [items] = crawl({'per_host_delay': 0}, (site.url + "/", link_process, 3, None, frontier))
+
+    assert items[0] == "home page"
+    assert len(items) == 3
+    assert sorted(p for p, _ in site.requests) == ["/a", "/b"]
+    assert frontier.is_finished()
+
+
+def test_same_host_is_spaced_but_hosts_run_in_parallel(make_site):
+    """Requests to one host respect the delay while hosts overlap"""
+    first = make_site(delay=0.2)
+    second = make_site(delay=0.2)
+
+    started = time.monotonic()
+    crawl({'per_host_delay': 0.3, 'max_concurrency': 8},
+          (first.url + "/", link_process, 3),
+          (second.url + "/", link_process, 3))
+    elapsed = time.monotonic() - started
+
+    for site in (first, second):
+        times = sorted(t for _, t in site.requests)
+        assert len(times) == 3
+        assert all(b - a >= 0.29 for a, b in zip(times, times[1:]))
+
+    # Sequential fetching would take at least 6 x 0.2s plus the delays
+    assert elapsed < 1.2
+
+
+def test_global_concurrency_cap(make_site):
+    """No more than max_concurrency requests run at once across hosts"""
+    sites = [make_site({"/": "ok"}, delay=0.2) for _ in range(4)]
+
+    started = time.monotonic()
+    crawl({'per_host_delay': 0, 'max_concurrency': 2},
+          *[(site.url + "/", link_process, 1) for site in sites])
+    elapsed = time.monotonic() - started
+
+    # Four hosts, two slots: two rounds of 0.2s
+    assert elapsed >= 0.39
+
+
+def test_scrape_url_keeps_result_shape(make_site, tmp_path, monkeypatch):
+    """WebScraper.scrape_url returns the same result dict and reuses pages on 304"""
+    pytest.importorskip("bs4")
+    pytest.importorskip("openai")
+    pytest.importorskip("colorama")
+    from http_cache import HTTPCache
+    from llm_cache import LLMCache
+    from web_scraper import WebScraper
+
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    text = "The Quran says in 2:255 that Allah is the Ever-Living. " * 5
+    site = make_site({
+        "/": f'<html><head><title>Home</title></head><body><p>{text}</p><a href="/next">n</a></body></html>',
+        "/next": f'<html><body><p>{text}</p></body></html>',
+    })
+    scraper = WebScraper(llm_cache=LLMCache(tmp_path / "cache.sqlite"),
+                         http_cache=HTTPCache(tmp_path / "http.sqlite"), per_host_delay=0)
+    scraper.scraped_dir = tmp_path
+    scraper.frontier_path = tmp_path / "frontier.sqlite"
+
+    result = scraper.scrape_url(site.url, max_pages=2)
+
+    assert result['success']
+    assert set(result) == {'success', 'message', 'content', 'file_path', 'analysis'}
+    assert result['analysis']['pages_scraped'] == 2
+    assert result['analysis']['quran_references'] > 0
+    assert result['content'].index(f"URL: {site.url}\n") < result['content'].index(f"URL: {site.url}/next")
+
+    results = scraper.scrape_multiple_urls([site.url, site.url + "/next"])
+    assert [r['success'] for r in results] == [True, True]
+    assert len({r['file_path'] for r in results}) == 2
+
+    # Unchanged pages come back as 304 and reuse the cached result
+    assert results[0]['analysis']['http_not_modified'] == 1
+    assert results[0]['analysis']['http_bytes_saved'] > len(text)
+    first_page = result['content'].split("=" * 80)[1].split("---", 1)[1]
+    assert results[0]['content'].split("---", 1)[1].strip() == first_page.strip()
+    assert "(revalidated, not modified)" in results[0]['content'].split("---", 1)[0]
+
+    site.pages["/next"] = f'<html><body><p>Changed. {text}</p></body></html>'
+    changed = scraper.scrape_url(site.url + "/next")
+    assert changed['analysis']['http_not_modified'] == 0
+    assert "Changed." in changed['content']
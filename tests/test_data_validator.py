@@ -0,0 +1,147 @@
+"""
+Tests for the streaming, process-parallel training data validator
+"""
+
+import json
+
+from data_validator import QA, validate_file
+
+
+def make_example(question, answer, **extra):
+    return {"messages": [
+        {"role": "system", "content": "You are an Islamic scholar assistant."},
+        {"role": "user", "content": question},
+        {"role": "assistant", "content": answer},
+    ], "category": "General", **extra}
+
+
+def write_jsonl(path, lines):
+    path.write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+    return path
+
+
+def test_reports_issues_with_line_numbers(tmp_path):
+    bad_order = make_example("What is zakat?", "Charity.")
+    bad_order["messages"].reverse()
+    path = write_jsonl(tmp_path / "train.jsonl", [
+        json.dumps(make_example("What is hajj?", "The pilgrimage.")),
+        "{not json",
+        "",
+        json.dumps(make_example("What is sawm?", "   ")),
+        json.dumps(bad_order),
+        json.dumps(make_example("WHAT IS  HAJJ?", "the pilgrimage.")),
+        json.dumps({"category": "General"}),
+    ])
+
+    report = validate_file(path, workers=1)
+
+    codes = {(issue["line"], issue["code"]) for issue in report["issues"]}
+    assert codes == {
+        (2, "invalid_json"),
+        (4, "empty_content"),
+        (5, "role_order"),
+        (6, "duplicate_example"),
+        (7, "missing_messages"),
+    }
+    assert report["records"] == 6
+    assert report["valid"] == 1
+    assert report["tokens"] > 0
+
+
+def test_token_limit_and_duplicate_ids(tmp_path):
+    path = write_jsonl(tmp_path / "train.jsonl", [
+        json.dumps(make_example("Q1", "short", id="a")),
+        json.dumps(make_example("Q2", "word " * 200, id="b")),
+        json.dumps(make_example("Q3", "short", id="a")),
+    ])
+
+    report = validate_file(path, workers=1, max_tokens=100)
+
+    assert [(issue["line"], issue["code"]) for issue in report["issues"]] == [
+        (2, "too_many_tokens"), (3, "duplicate_id")]
+
+
+def test_parallel_matches_serial(tmp_path):
+    lines = [json.dumps(make_example(f"Question {i % 150}?", f"Answer {i % 150}.")) for i in range(400)]
+    lines[37] = "[]"
+    path = write_jsonl(tmp_path / "train.jsonl", lines)
+
+    serial = validate_file(path, workers=1, chunk_lines=50)
+    parallel = validate_file(path, workers=2, chunk_lines=50, report_path=tmp_path / "report.json")
+
+    assert parallel["issues"] == serial["issues"]
+    assert parallel["issue_counts"] == {"not_object": 1, "duplicate_example": 249}
+    assert json.loads((tmp_path / "report.json").read_text(encoding="utf-8"))["valid"] == 150
+
+
+def test_json_array_is_streamed_with_line_numbers(tmp_path):
+    items = [{"question": "What is zakat?", "answer": "Charity.", "source": "Quran", "reference": "2:43"},
+             {"question": "What is hajj?", "answer": "", "source": "Quran", "reference": "3:97"}]
+    path = tmp_path / "upload.json"
+    path.write_text(json.dumps(items, indent=2), encoding="utf-8")
+
+    report = validate_file(path, schema=QA)
+
+    assert report["format"] == "json"
+    assert report["records"] == 2
+    assert report["issues"] == [{"line": 8, "record": 2, "code": "missing_field",
+                                 "message": "Missing fields: answer (empty)"}]
+
+
+def test_malformed_json_array(tmp_path):
+    path = tmp_path / "upload.json"
+    path.write_text('[{"question": "q"}, {"question": ', encoding="utf-8")
+
+    report = validate_file(path, schema=QA)
+
+    assert report["records"] == 1
+    assert report["issues"][-1]["code"] == "invalid_json"
+    assert report["issues"][-1]["line"] is None
+
+
+def test_file_level_error_kept_past_issue_cap(tmp_path):
+    path = tmp_path / "upload.json"
+    path.write_text('[' + '{"question": "q"}, ' * 5 + '{"question": ', encoding="utf-8")
+
+    report = validate_file(path, schema=QA, max_issues=2)
+
+    assert report["issues_truncated"]
+    assert len(report["issues"]) == 3
+    assert report["issues"][-1]["code"] == "invalid_json"
+
+
+def test_json_array_reads_stop_at_a_malformed_element(tmp_path, monkeypatch):
+    """A bad element fails fast, while elements longer than a read still decode"""
+    import data_validator
+
+    monkeypatch.setattr(data_validator, "_READ_SIZE", 64)
+    good = {"question": "q " * 100, "answer": "a", "source": "Quran", "reference": "2:255"}
+    path = tmp_path / "upload.json"
+    path.write_text("[" + json.dumps(good) + ', {"question": nope}, '
+                    + ", ".join([json.dumps(good)] * 2000) + "]", encoding="utf-8")
+
+    reads = []
+    real_open = open
+
+    class CountingFile:
+        """Wraps the opened file and records each read"""
+
+        def __init__(self, *args, **kwargs):
+            self.file = real_open(*args, **kwargs)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            self.file.close()
+
+        def read(self, size=-1):
+            reads.append(size)
+            return self.file.read(size)
+
+    monkeypatch.setattr(data_validator, "open", CountingFile, raising=False)
+    report = validate_file(path, schema=QA, file_format="json", workers=1)
+
+    assert report["records"] == 1
+    assert report["issues"][-1]["code"] == "invalid_json"
+    assert len(reads) < 10
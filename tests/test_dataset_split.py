@@ -0,0 +1,110 @@
+"""
+Tests for the deterministic, stratified train/validation splitter
+"""
+
+from dataset_split import StratifiedSplitter, split_jsonl, validation_score
+from jsonl_store import JsonlCorpus, append_jsonl, read_jsonl
+
+
+def make_example(i, category="General"):
+    return {"messages": [
+        {"role": "system", "content": "You are an Islamic scholar assistant."},
+        {"role": "user", "content": f"Question {i}?"},
+        {"role": "assistant", "content": f"Answer {i}."},
+    ], "category": category}
+
+
+def questions(path):
+    return {example["messages"][1]["content"] for _, example in read_jsonl(path)}
+
+
+def test_score_depends_only_on_example_and_seed():
+    assert validation_score(make_example(1)) == validation_score(make_example(1))
+    assert validation_score(make_example(1)) != validation_score(make_example(2))
+    assert validation_score(make_example(1), seed=1) != validation_score(make_example(1), seed=2)
+    assert 0 <= validation_score(make_example(3)) < 1
+
+
+def test_stratified_counts_stay_on_quota():
+    """Every category gets its rounded validation quota and keeps a training example"""
+    splitter = StratifiedSplitter(0.2)
+    categories = {"Prayer": 200, "Zakat": 37, "Hajj": 3, "Fasting": 1}
+    examples = [make_example(f"{category}-{i}", category)
+                for category, size in categories.items() for i in range(size)]
+    splitter.fit(examples)
+    for example in examples:
+        splitter.assign(example)
+
+    for category, size in categories.items():
+        train, validation = splitter.counts[category]
+        assert train + validation == size
+        assert train >= 1
+    assert splitter.counts["Prayer"] == [160, 40]
+    assert splitter.counts["Zakat"] == [30, 7]
+    assert splitter.counts["Fasting"] == [1, 0]
+
+
+def test_small_categories_get_a_validation_example(tmp_path):
+    """Categories with two or three examples still end up in both files"""
+    train, validation = tmp_path / "train.jsonl", tmp_path / "validation.jsonl"
+    append_jsonl(train, [make_example(f"Hajj-{i}", "Hajj") for i in range(2)]
+                 + [make_example(f"Zakat-{i}", "Zakat") for i in range(3)]
+                 + [make_example(i, "Prayer") for i in range(50)])
+
+    splitter, _ = split_jsonl([train, validation], train, validation, 0.2)
+
+    assert splitter.counts["Hajj"] == [1, 1]
+    assert splitter.counts["Zakat"] == [2, 1]
+    assert splitter.counts["Prayer"] == [40, 10]
+    categories = [example["category"] for _, example in read_jsonl(validation)]
+    assert categories.count("Hajj") == 1 and categories.count("Zakat") == 1
+
+    # Re-splitting the result keeps every assignment
+    first_validation = questions(validation)
+    split_jsonl([train, validation], train, validation, 0.2)
+    assert questions(validation) == first_validation
+
+
+def test_identical_examples_respect_quota_and_min_train(tmp_path):
+    """Copies of one example share a score but still fill the quota exactly"""
+    train, validation = tmp_path / "train.jsonl", tmp_path / "validation.jsonl"
+    append_jsonl(train, [make_example("same", "Template")] * 3
+                 + [make_example("pillar", "Pillars")] * 3 + [make_example("other", "Pillars")]
+                 + [make_example(i, "Prayer") for i in range(20)] + [make_example(3, "Prayer")] * 4)
+
+    splitter, _ = split_jsonl([train, validation], train, validation, 0.2)
+
+    assert splitter.counts["Template"] == [2, 1]
+    assert splitter.counts["Pillars"] == [3, 1]
+    assert splitter.counts["Prayer"] == [19, 5]
+
+
+def test_resplit_is_stable_as_corpus_grows(tmp_path):
+    """Re-splitting after new examples arrive keeps every earlier assignment"""
+    train, validation = tmp_path / "train.jsonl", tmp_path / "validation.jsonl"
+    append_jsonl(train, [make_example(i) for i in range(300)])
+
+    split_jsonl([train, validation], train, validation, 0.2, stratify=False)
+    first_validation = questions(validation)
+    assert 30 < len(first_validation) < 90
+
+    append_jsonl(train, [make_example(i) for i in range(300, 400)])
+    split_jsonl([train, validation], train, validation, 0.2, stratify=False)
+
+    assert first_validation <= questions(validation)
+    assert not first_validation & questions(train)
+    assert len(questions(train)) + len(questions(validation)) == 400
+
+
+def test_split_replaces_files_under_an_open_corpus(tmp_path):
+    """Open corpus views pick up the new files on refresh; no temp files are left"""
+    train, validation = tmp_path / "train.jsonl", tmp_path / "validation.jsonl"
+    corpus = JsonlCorpus(train)
+    corpus.extend(make_example(i, "Prayer" if i % 2 else "Zakat") for i in range(50))
+
+    splitter, skipped = split_jsonl([train, validation], train, validation, 0.3)
+    corpus.refresh()
+
+    assert skipped == 0
+    assert len(corpus) == sum(counts[0] for counts in splitter.counts.values())
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["train.jsonl", "validation.jsonl"]
@@ -0,0 +1,77 @@
+"""
+Tests for the persistent dedup-on-insert index
+"""
+
+from dedup_index import DedupIndex, example_digest
+from jsonl_store import JsonlCorpus
+
+
+def make_example(question, answer):
+    return {"messages": [
+        {"role": "system", "content": "You are an Islamic scholar assistant."},
+        {"role": "user", "content": question},
+        {"role": "assistant", "content": answer},
+    ], "category": "General"}
+
+
+def add(index, corpus, examples):
+    """Insert the way DataManager.add_training_examples does"""
+    new, duplicates = index.filter_new(examples)
+    corpus.extend(example for example, _ in new)
+    index.record(digest for _, digest in new)
+    return len(new), duplicates
+
+
+def test_digest_ignores_case_and_whitespace():
+    a = make_example("What is  Zakat?", "Obligatory charity.")
+    b = make_example("what is zakat?\n", "obligatory   charity.")
+
+    assert example_digest(a) == example_digest(b)
+    assert example_digest(a) != example_digest(make_example("What is Zakat?", "Purifying charity."))
+
+
+def test_duplicates_rejected_on_insert(tmp_path):
+    corpus = JsonlCorpus(tmp_path / "train.jsonl")
+    index = DedupIndex(corpus.file_path, tmp_path / "cache" / "train.dedup")
+    zakat = make_example("What is zakat?", "Obligatory charity.")
+    hajj = make_example("What is hajj?", "The pilgrimage to Mecca.")
+
+    assert add(index, corpus, [zakat, hajj, zakat]) == (2, 1)
+    assert add(index, corpus, [make_example("WHAT IS ZAKAT?", "Obligatory charity.")]) == (0, 1)
+    assert len(corpus) == 2
+
+
+def test_index_persists_and_rebuilds_when_stale(tmp_path):
+    corpus = JsonlCorpus(tmp_path / "train.jsonl")
+    index_path = tmp_path / "cache" / "train.dedup"
+    index = DedupIndex(corpus.file_path, index_path)
+    add(index, corpus, [make_example(f"Question {i}?", "Answer.") for i in range(5)])
+    assert index.rebuilds == 1  # built once, from the empty corpus
+
+    # A fresh process loads the stored digests without reading the corpus
+    reopened = DedupIndex(corpus.file_path, index_path)
+    assert len(reopened) == 5 and reopened.rebuilds == 0
+
+    # Rewriting the corpus (e.g. clean_data) makes the stored digests stale
+    corpus.rewrite(corpus[:2])
+    assert make_example("Question 4?", "Answer.") not in reopened
+    assert reopened.rebuilds == 1 and len(reopened) == 2
+
+    # A missing index file is rebuilt from the JSONL too
+    index_path.unlink()
+    assert len(DedupIndex(corpus.file_path, index_path)) == 2
+
+
+def test_examples_in_other_index_count_as_duplicates(tmp_path):
+    train = JsonlCorpus(tmp_path / "train.jsonl")
+    validation = JsonlCorpus(tmp_path / "validation.jsonl")
+    train_index = DedupIndex(train.file_path, tmp_path / "cache" / "train.dedup")
+    validation_index = DedupIndex(validation.file_path, tmp_path / "cache" / "validation.dedup")
+    zakat = make_example("What is zakat?", "Obligatory charity.")
+    hajj = make_example("What is hajj?", "The pilgrimage to Mecca.")
+    validation.extend([zakat])
+
+    new, duplicates = train_index.filter_new([zakat, hajj], also=[validation_index])
+
+    assert [example for example, _ in new] == [hajj]
+    assert duplicates == 1
@@ -0,0 +1,99 @@
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("lxml")
+pytest.importorskip("openai")
+pytest.importorskip("colorama")
+
+from bs4 import BeautifulSoup
+
+from http_cache import HTTPCache
+from llm_cache import LLMCache
+from web_scraper import WebScraper
+
+FIXTURES = sorted((Path(__file__).parent / "fixtures" / "html").glob("*.html"))
+
+
+@pytest.fixture
+def scraper(tmp_path):
+    return WebScraper(llm_cache=LLMCache(tmp_path / "llm.sqlite"), http_cache=HTTPCache(tmp_path / "http.sqlite"))
+
+
+def extract(scraper, path, mode):
+    scraper.extraction_mode = mode
+    return scraper.extract_content(BeautifulSoup(path.read_text(encoding='utf-8'), 'lxml'), "http://example.com/")
+
+
+@pytest.mark.parametrize("path", FIXTURES, ids=[path.stem for path in FIXTURES])
+def test_blocks_mode_keeps_every_paragraph_once(scraper, path):
+    legacy = extract(scraper, path, 'elements').split("\n\n")
+    blocks = extract(scraper, path, 'blocks').split("\n\n")
+
+    # No text is repeated inside an ancestor's text (the title line aside)
+    body = blocks[1:]
+    assert not any(a != b and a in b for a in body for b in body)
+    legacy_words = set(" ".join(legacy).split())
+    assert legacy_words <= set(" ".join(blocks).split())
+    assert len("".join(blocks)) < len("".join(legacy))
+
+
+def test_text_is_grouped_by_nearest_block(scraper):
+    html = (
+        "<html><body><main><div>Intro text that is long enough "
+        "<p>First paragraph with <b>bold</b> and <a href='#'>a link</a> inside.</p>"
+        "Closing words of the outer division.<!-- hidden comment here --></div></main></body></html>"
+    )
+    scraper.extraction_mode = 'blocks'
+    parts = scraper.extract_content(BeautifulSoup(html, 'lxml'), "http://example.com/").split("\n\n")
+
+    assert parts == [
+        "Intro text that is long enough",
+        "First paragraph with bold and a link inside.",
+        "Closing words of the outer division.",
+    ]
+
+
+@pytest.mark.parametrize("path", FIXTURES, ids=[path.stem for path in FIXTURES])
+def test_stream_parse_matches_blocks_mode(scraper, path):
+    html = path.read_bytes()
+    soup = BeautifulSoup(html, 'lxml')
+    scraper.extraction_mode = 'blocks'
+    expected = scraper.extract_content(soup, "http://example.com/")
+    expected_links = [link['href'] for link in soup.find_all('a', href=True)[:20]]
+
+    content, links = scraper.extract_content_stream(html)
+
+    assert content == expected
+    assert links == expected_links
+
+
+def test_stream_parse_skips_subtrees_and_decodes(scraper):
+    html = (
+        "<html><head><title>Zakat</title><style>p { color: red }</style></head><body>"
+        "<nav><a href='/nav'>Navigation link text</a><p>Menu entry that is long</p></nav>"
+        "<p>الزكاة ركن من أركان الإسلام <a href='/zakat'>and a pillar of Islam</a></p>"
+        "<script>var hidden = 'script text should never appear';</script>"
+        "<footer><a href='/footer'>Footer</a></footer></body></html>"
+    ).encode('cp1256', errors='ignore')
+
+    content, links = scraper.extract_content_stream(html, 'cp1256')
+
+    assert content.split("\n\n") == ["Title: Zakat", "الزكاة ركن من أركان الإسلام and a pillar of Islam"]
+    assert links == ['/zakat']
+
+
+def test_large_pages_take_the_stream_path(scraper, monkeypatch):
+    body = FIXTURES[0].read_bytes()
+    page = ("http://example.com/a", "text/html", body, "example.com", False, False, {})
+    scraper.extraction_mode = 'blocks'
+    expected, expected_links = scraper._process_page(*page)
+
+    monkeypatch.setattr(scraper, '_parse_html', lambda body: pytest.fail("tree built for a large page"))
+    scraper.stream_threshold = 0
+    item, links = scraper._process_page(*page)
+
+    assert links == expected_links
+    assert item['content'].split("---")[-1] == expected['content'].split("---")[-1]
+    assert item['islamic_analysis'] == expected['islamic_analysis']
@@ -0,0 +1,47 @@
+"""
+Tests for the HTTP conditional-request cache
+"""
+
+from http_cache import HTTPCache
+
+
+def test_only_pages_with_validators_are_stored(tmp_path):
+    """Pages without ETag or Last-Modified are not cached; stored ones get conditional headers"""
+    cache = HTTPCache(tmp_path / "http.sqlite")
+
+    assert not cache.store("http://x/a", {}, "text/html", b"body", 0.5)
+    assert cache.conditional_headers("http://x/a") == {}
+
+    assert cache.store("http://x/b", {'etag': '"v1"', 'last-modified': 'Mon, 01 Jan 2024 00:00:00 GMT'},
+                       "text/html", b"body", 0.5)
+    assert cache.conditional_headers("http://x/b") == {
+        'If-None-Match': '"v1"',
+        'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT',
+    }
+
+
+def test_results_are_reused_only_for_the_same_variant(tmp_path):
+    """Processed results are keyed by variant; the body serves any variant"""
+    db_path = tmp_path / "http.sqlite"
+    cache = HTTPCache(db_path)
+    cache.store("http://x/", {'etag': '"v1"'}, "text/html", b"<p>hi</p>", 1.5, "islamic", [{'content': "hi"}, []])
+    cache.close()
+
+    cache = HTTPCache(db_path)
+    assert cache.lookup("http://x/", "islamic") == (9, 1.5, [{'content': "hi"}, []])
+    assert cache.lookup("http://x/", "all") == (9, 1.5, None)
+    assert cache.body("http://x/") == ("text/html", b"<p>hi</p>")
+    assert cache.lookup("http://x/missing", "all") is None
+
+    cache.update_result("http://x/", "all", [None, ["http://x/next"]])
+    assert cache.lookup("http://x/", "all") == (9, 1.5, [None, ["http://x/next"]])
+
+
+def test_oldest_pages_are_evicted_over_budget(tmp_path):
+    """Least recently stored pages are evicted once the byte budget is exceeded"""
+    cache = HTTPCache(tmp_path / "http.sqlite", max_bytes=25)
+    for name in "abc":
+        cache.store(f"http://x/{name}", {'etag': name}, "text/html", b"x" * 10, 0.1)
+
+    assert cache.body("http://x/a") is None
+    assert cache.body("http://x/c") is not None
@@ -0,0 +1,42 @@
+from islamic_detector import IslamicDetector, detect_islamic_content
+
+TEXT = (
+    "The Muslims pray five times a day. Islamic law is derived from the Quran (2:255) "
+    "and from Sahih al-Bukhari and sahih  Muslim. Read Surah Al-Baqarah and chapter 12. "
+    "Also narrated in Sunan Abu  Dawood and Musnad Ahmad. "
+)
+
+
+def test_keywords_match_whole_words_once():
+    result = detect_islamic_content("islamic islamically muslim islam muslims mosques")
+
+    # 'islamic', 'muslim', 'islam', 'muslims', 'mosques'; not 'islamically'
+    assert result['total_islamic_keywords'] == 5
+    assert result['quran_references'] == 0
+
+
+def test_references_are_counted_with_their_keywords():
+    result = detect_islamic_content(TEXT)
+
+    assert result['quran_references'] == 3  # 2:255, surah al-baqarah, chapter 12
+    assert result['hadith_references'] == 4
+    assert result['is_islamic']
+    # sahih/bukhari/muslim inside references still count as keywords
+    assert result['total_islamic_keywords'] == 12
+
+
+def test_chunked_input_matches_whole_text():
+    text = TEXT * 20
+    expected = detect_islamic_content(text)
+    for size in (1, 5, 17, 100):
+        detector = IslamicDetector()
+        for i in range(0, len(text), size):
+            detector.feed(text[i:i + size])
+        assert detector.result() == expected
+
+
+def test_non_islamic_text():
+    result = detect_islamic_content("The weather today is sunny with a light breeze.")
+
+    assert not result['is_islamic']
+    assert result['islamic_score'] == 0
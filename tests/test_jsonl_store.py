@@ -0,0 +1,126 @@
+"""
+Tests for the append-only / atomic JSONL helpers
+"""
+
+import json
+
+from jsonl_store import JsonlCorpus, append_jsonl, atomic_write_jsonl, read_jsonl
+
+
+def test_append_keeps_existing_lines(tmp_path):
+    """Appending adds lines without rewriting earlier ones"""
+    path = tmp_path / "train.jsonl"
+    append_jsonl(path, [{"id": 1}])
+    append_jsonl(path, [{"id": 2}, {"id": 3}])
+
+    assert [ex["id"] for _, ex in read_jsonl(path)] == [1, 2, 3]
+
+
+def test_append_isolates_torn_trailing_line(tmp_path):
+    """A torn line from an interrupted write is isolated and skipped"""
+    path = tmp_path / "train.jsonl"
+    path.write_text(json.dumps({"id": 1}) + '\n{"id": ', encoding='utf-8')
+
+    appended = append_jsonl(path, [{"id": 2}])
+    rows = list(read_jsonl(path))
+
+    assert appended == 1
+    assert rows[0][1] == {"id": 1}
+    assert rows[1][1] is None
+    assert rows[2][1] == {"id": 2}
+
+
+def test_atomic_write_replaces_file(tmp_path):
+    """Atomic rewrite replaces content and leaves no temp files behind"""
+    path = tmp_path / "train.jsonl"
+    append_jsonl(path, [{"id": i} for i in range(5)])
+
+    count = atomic_write_jsonl(path, [{"id": 9}])
+
+    assert count == 1
+    assert [ex for _, ex in read_jsonl(path)] == [{"id": 9}]
+    assert [p.name for p in tmp_path.iterdir()] == ["train.jsonl"]
+
+
+def test_atomic_write_failure_keeps_original(tmp_path):
+    """A failure while writing leaves the original file untouched"""
+    path = tmp_path / "train.jsonl"
+    append_jsonl(path, [{"id": 1}])
+
+    def broken():
+        yield {"id": 2}
+        raise RuntimeError("disk full")
+
+    try:
+        atomic_write_jsonl(path, broken())
+    except RuntimeError:
+        pass
+
+    assert [ex for _, ex in read_jsonl(path)] == [{"id": 1}]
+    assert [p.name for p in tmp_path.iterdir()] == ["train.jsonl"]
+
+
+def test_corpus_lazy_access(tmp_path):
+    """The corpus supports len, indexing, negative indexing and slicing"""
+    path = tmp_path / "train.jsonl"
+    path.write_text('{"id": 0}\n\n{"id": 1}\n{"id": 2}\n', encoding='utf-8')
+
+    corpus = JsonlCorpus(path)
+
+    assert len(corpus) == 3
+    assert corpus[1] == {"id": 1}
+    assert corpus[-1] == {"id": 2}
+    assert corpus[::2] == [{"id": 0}, {"id": 2}]
+    assert [ex["id"] for ex in corpus] == [0, 1, 2]
+
+
+def test_corpus_skips_torn_line_ending_in_brace(tmp_path):
+    """A cut-off line that happens to end in '}' is skipped, not indexed"""
+    path = tmp_path / "train.jsonl"
+    path.write_text('{"id": 0}\n{"messages": [{"role": "system", "content": "x"}\n{"id": 1}\n', encoding='utf-8')
+
+    corpus = JsonlCorpus(path)
+
+    assert len(corpus) == 2
+    assert corpus.skipped_lines == 1
+    assert list(corpus) == [{"id": 0}, {"id": 1}]
+
+
+def test_corpus_tracks_appends_and_rewrites(tmp_path):
+    """Appends are indexed incrementally; rewrites re-index the new file"""
+    path = tmp_path / "train.jsonl"
+    corpus = JsonlCorpus(path)
+    assert len(corpus) == 0
+
+    corpus.extend([{"id": 0}, {"id": 1}])
+    corpus.append({"id": 2})
+    assert len(corpus) == 3
+
+    corpus.rewrite(ex for ex in corpus if ex["id"] != 1)
+    assert [ex["id"] for ex in corpus] == [0, 2]
+
+    corpus.clear()
+    assert len(corpus) == 0 and not path.exists()
+
+
+def test_corpus_skips_torn_line(tmp_path):
+    """A torn line in the middle of the file is not indexed"""
+    path = tmp_path / "train.jsonl"
+    path.write_text('{"id": 0}\n{"id": \n{"id": 1}\n', encoding='utf-8')
+
+    corpus = JsonlCorpus(path)
+
+    assert [ex["id"] for ex in corpus] == [0, 1]
+    assert corpus.skipped_lines == 1
+
+
+def test_generation_changes_only_on_reindex(tmp_path):
+    """Appends keep the generation; a rewrite starts a new one"""
+    corpus = JsonlCorpus(tmp_path / "train.jsonl")
+    generation = corpus.generation
+
+    corpus.extend([{"id": 1}, {"id": 2}])
+    assert corpus.generation == generation
+
+    corpus.rewrite([{"id": 2}])
+    assert corpus.generation > generation
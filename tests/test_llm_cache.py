@@ -0,0 +1,74 @@
+"""
+Tests for the on-disk LLM result cache
+"""
+
+import time
+
+from llm_cache import LLMCache, make_cache_key
+
+
+def test_key_depends_on_every_parameter():
+    """Changing any request parameter changes the key"""
+    base = ("gpt-4o-mini", "prompt", "text", 2000, 0.3)
+    keys = {make_cache_key(*base)}
+    for i, changed in enumerate(["other-model", "other prompt", "other text", 100, 0.7]):
+        params = list(base)
+        params[i] = changed
+        keys.add(make_cache_key(*params))
+    assert len(keys) == 6
+
+
+def test_hits_misses_and_persistence(tmp_path):
+    """Values survive reopening and counters track lookups"""
+    path = tmp_path / "cache.sqlite"
+    cache = LLMCache(path)
+    assert cache.get("k") is None
+    cache.set("k", [{"question": "Q"}])
+    assert cache.get("k") == [{"question": "Q"}]
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.close()
+
+    reopened = LLMCache(path)
+    assert reopened.get("k") == [{"question": "Q"}]
+
+
+def test_get_or_compute_only_computes_once(tmp_path):
+    """A cached result is never recomputed; None results are not cached"""
+    cache = LLMCache(tmp_path / "cache.sqlite")
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"ok": True}
+
+    assert cache.get_or_compute("k", compute) == {"ok": True}
+    assert cache.get_or_compute("k", compute) == {"ok": True}
+    assert len(calls) == 1
+
+    assert cache.get_or_compute("none", lambda: None) is None
+    assert cache.get("none") is None
+
+
+def test_size_eviction_drops_least_recently_used(tmp_path):
+    """Over the size budget, the least recently used entries go first"""
+    cache = LLMCache(tmp_path / "cache.sqlite", max_bytes=250)
+    cache.set("a", "x" * 100)
+    time.sleep(0.01)
+    cache.set("b", "x" * 100)
+    time.sleep(0.01)
+    cache.get("a")
+    time.sleep(0.01)
+    cache.set("c", "x" * 100)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_age_eviction(tmp_path):
+    """Entries older than max_age are misses"""
+    cache = LLMCache(tmp_path / "cache.sqlite", max_age=0.05)
+    cache.set("k", 1)
+    time.sleep(0.1)
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
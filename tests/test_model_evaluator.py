@@ -0,0 +1,251 @@
+"""
+Tests for the model evaluation harness, against a local OpenAI-compatible
+HTTP server (chat completions, files and batches)
+"""
+
+import json
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("tabulate")
+
+from jsonl_store import append_jsonl  # noqa: E402
+from llm_cache import LLMCache  # noqa: E402
+from model_evaluator import (  # noqa: E402
+    ModelEvaluator, build_report, comparison_markdown, comparison_table, load_eval_cases, score_answer,
+)
+
+
+def make_example(question, answer, citation):
+    return {"messages": [
+        {"role": "system", "content": "You are an Islamic scholar assistant."},
+        {"role": "user", "content": question},
+        {"role": "assistant", "content": f"{answer}\n\n**Reference:** {citation}"},
+    ], "category": "General"}
+
+
+VALIDATION = [
+    make_example("What is Ayat al-Kursi?", "Ayat al-Kursi is the throne verse of Surah Al-Baqarah.", "Quran 2:255"),
+    make_example("What is the first hadith of Bukhari?", "Actions are judged by intentions.", "Sahih al-Bukhari 1"),
+]
+
+
+def model_answer(model, question):
+    """Canned answers: 'good' cites and declines correctly, 'bad' does neither"""
+    if model == "bad":
+        return "It is something important."
+    if "weather" in question or "capital" in question:
+        return "I can only help with questions about Islamic knowledge."
+    if "Kursi" in question:
+        return "Ayat al-Kursi is the throne verse. **Reference:** Quran 2:255"
+    return "Actions are judged by intentions. **Reference:** Sahih al-Bukhari 1"
+
+
+def completion(model, messages):
+    question = messages[-1]["content"]
+    return {
+        "id": "chatcmpl-test", "object": "chat.completion", "created": 0, "model": model,
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": model_answer(model, question)}}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+    }
+
+
+class _FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """Chat completions plus just enough of the files and batches endpoints"""
+
+    files = {}
+    batches = {}
+    chat_calls = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.path == "/v1/chat/completions":
+            with self.lock:
+                type(self).chat_calls += 1
+            request = json.loads(body)
+            self._send(200, completion(request["model"], request["messages"]))
+        elif self.path == "/v1/files":
+            # Multipart upload: keep the JSONL lines of the file part
+            lines = [line for line in body.decode().splitlines() if line.startswith('{"custom_id"')]
+            file_id = f"file-{len(self.files)}"
+            self.files[file_id] = "\n".join(lines)
+            self._send(200, {"id": file_id, "object": "file", "bytes": len(body), "created_at": 0,
+                             "filename": "batch.jsonl", "purpose": "batch", "status": "processed"})
+        elif self.path == "/v1/batches":
+            # Requests for the model "broken" fail and go to the error file
+            request = json.loads(body)
+            output, errors = [], []
+            for line in self.files[request["input_file_id"]].splitlines():
+                item = json.loads(line)
+                if item["body"]["model"] == "broken":
+                    errors.append(json.dumps({
+                        "id": "batch_req", "custom_id": item["custom_id"],
+                        "response": {"status_code": 400, "request_id": "req",
+                                     "body": {"error": {"message": "The model `broken` does not exist"}}},
+                        "error": None,
+                    }))
+                    continue
+                output.append(json.dumps({
+                    "id": "batch_req", "custom_id": item["custom_id"],
+                    "response": {"status_code": 200, "request_id": "req",
+                                 "body": completion(item["body"]["model"], item["body"]["messages"])},
+                    "error": None,
+                }))
+            output_id = self._store_file(output)
+            error_id = self._store_file(errors)
+            batch_id = f"batch-{len(self.batches)}"
+            self.batches[batch_id] = self._batch(batch_id, request["input_file_id"], output_id, error_id)
+            self._send(200, dict(self.batches[batch_id], status="validating", output_file_id=None, error_file_id=None))
+        else:
+            self._send(404, {"error": {"message": "not found"}})
+
+    def do_GET(self):
+        if self.path.startswith("/v1/batches/"):
+            self._send(200, self.batches[self.path.rsplit("/", 1)[1]])
+        elif self.path.startswith("/v1/files/") and self.path.endswith("/content"):
+            data = self.files[self.path.split("/")[3]].encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        else:
+            self._send(404, {"error": {"message": "not found"}})
+
+    @classmethod
+    def _store_file(cls, lines):
+        """Keep JSONL lines as a file and return its id, or None if there are none"""
+        if not lines:
+            return None
+        file_id = f"file-{len(cls.files)}"
+        cls.files[file_id] = "\n".join(lines) + "\n"
+        return file_id
+
+    @staticmethod
+    def _batch(batch_id, input_file_id, output_file_id, error_file_id):
+        return {"id": batch_id, "object": "batch", "endpoint": "/v1/chat/completions", "errors": None,
+                "input_file_id": input_file_id, "completion_window": "24h", "status": "completed",
+                "output_file_id": output_file_id, "error_file_id": error_file_id, "created_at": 0,
+                "request_counts": {"total": 0, "completed": 0, "failed": 0}}
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def client():
+    openai = pytest.importorskip("openai")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeOpenAIHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield openai.OpenAI(api_key="test", base_url=f"http://127.0.0.1:{server.server_port}/v1")
+    finally:
+        server.shutdown()
+
+
+@pytest.fixture
+def cases(tmp_path):
+    path = tmp_path / "validation.jsonl"
+    append_jsonl(path, VALIDATION)
+    return load_eval_cases(path, out_of_scope=["What's the weather today?", "What is the capital of Australia?"])
+
+
+def test_scores():
+    case = {"out_of_scope": False, "citations": [("quran", 2, 255)],
+            "reference_answer": "Ayat al-Kursi is the throne verse."}
+    scores = score_answer(case, "Ayat al-Kursi is the throne verse.")
+    assert scores == {"citation_match": 0.0, "refusal": 0.0, "lexical_overlap": 1.0}
+    assert score_answer(case, "It is the throne verse (Quran 2:255).")["citation_match"] == 1.0
+
+    assert score_answer(case, "I cannot help with that.")["refusal"] == 1.0
+    out_of_scope = {"out_of_scope": True, "citations": [], "reference_answer": ""}
+    assert score_answer(out_of_scope, "It will be sunny.")["refusal"] == 0.0
+
+
+def test_concurrent_evaluation_against_local_server(client, cases):
+    evaluator = ModelEvaluator(client, max_workers=4, requests_per_second=1000, base_delay=0.01)
+
+    report = evaluator.evaluate(["good", "bad"], cases)
+
+    good, bad = report["models"]["good"], report["models"]["bad"]
+    assert (good["errors"], good["citation_match"], good["refusal_rate"], good["false_refusal_rate"]) == (0, 1.0, 1.0, 0.0)
+    assert (bad["citation_match"], bad["refusal_rate"]) == (0.0, 0.0)
+    assert good["lexical_overlap"] > bad["lexical_overlap"]
+    assert good["prompt_tokens"] == 40
+    assert [case["id"] for case in report["cases"]] == ["line-1", "line-2", "out-of-scope-1", "out-of-scope-2"]
+    assert "Citation match" in comparison_table(report)
+    json.dumps(report)
+
+
+def test_batch_evaluation_against_local_server(client, cases, tmp_path):
+    evaluator = ModelEvaluator(client)
+    calls_before = _FakeOpenAIHandler.chat_calls
+
+    batch_id = evaluator.submit_batch(["good", "bad"], cases, tmp_path / "batch.jsonl")
+    status, answers = evaluator.collect_batch(batch_id)
+
+    assert status == "completed"
+    assert len(answers) == 8
+    assert answers[("good", "line-1")]["answer"].endswith("Quran 2:255")
+    assert _FakeOpenAIHandler.chat_calls == calls_before
+
+
+def test_batch_failed_requests_come_from_error_file(client, cases, tmp_path):
+    evaluator = ModelEvaluator(client)
+
+    status, answers = evaluator.collect_batch(evaluator.submit_batch(["good", "broken"], cases, tmp_path / "batch.jsonl"))
+    assert status == "completed"
+    assert answers[("broken", "line-1")] == {"error": "The model `broken` does not exist"}
+    assert answers[("good", "line-1")]["answer"].endswith("Quran 2:255")
+
+    # Every request failed: no output file, but the batch is still scored
+    status, answers = evaluator.collect_batch(evaluator.submit_batch(["broken"], cases, tmp_path / "broken.jsonl"))
+    assert status == "completed"
+    report = build_report(["broken"], cases, answers, mode="batch")
+    assert report["models"]["broken"]["errors"] == 4
+    assert "missing from results" not in json.dumps(report)
+
+
+def test_side_by_side_comparison_is_cached(client, tmp_path):
+    evaluator = ModelEvaluator(client, requests_per_second=1000, cache=LLMCache(tmp_path / "llm.sqlite"))
+    questions = ["What is Ayat al-Kursi?", "What's the weather today?"]
+    calls_before = _FakeOpenAIHandler.chat_calls
+
+    comparison = evaluator.compare(["good", "bad"], questions)
+    again = evaluator.compare(["good", "bad"], questions)
+
+    assert _FakeOpenAIHandler.chat_calls - calls_before == 4
+    assert [item["question"] for item in comparison] == questions
+    assert list(comparison[0]["answers"]) == ["good", "bad"]
+    assert comparison[0]["answers"]["good"]["answer"].endswith("Quran 2:255")
+    assert not comparison[0]["answers"]["good"]["cached"] and again[0]["answers"]["good"]["cached"]
+
+    markdown = comparison_markdown(again)
+    assert "| `good` | `bad` |" in markdown
+    assert "10 + 5 tokens · cached" in markdown
+    assert "\n#### 2. What's the weather today?\n" in markdown
+
+
+def test_evaluator_import_does_not_load_data_manager():
+    """The evaluator only needs the system prompt, not the DataManager import chain"""
+    code = "import sys, model_evaluator; print('data_manager' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parent.parent / "src",
+                            capture_output=True, text=True, check=True).stdout
+
+    assert output.strip() == "False"
@@ -0,0 +1,71 @@
+"""
+Tests for the MinHash/LSH near-duplicate index
+"""
+
+from jsonl_store import JsonlCorpus
+from near_duplicates import NearDuplicateIndex, example_text
+
+PILLARS = (
+    "What are the five pillars of Islam? The five pillars of Islam are: 1) Shahada (declaration of faith), "
+    "2) Salah (five daily prayers), 3) Zakat (obligatory charity), 4) Sawm (fasting during Ramadan), "
+    "and 5) Hajj (pilgrimage to Mecca for those who are able). These form the foundation of Muslim practice."
+)
+PILLARS_PARAPHRASE = (
+    "What are the 5 pillars of Islam? The five pillars of Islam are: 1) Shahada (declaration of faith), "
+    "2) Salah (the five daily prayers), 3) Zakat (obligatory charity), 4) Sawm (fasting in Ramadan), "
+    "and 5) Hajj (pilgrimage to Mecca for those able). These form the foundation of Muslim practice."
+)
+PATIENCE = (
+    "What does the Quran say about patience? The Quran frequently mentions patience (Sabr) as a virtue. "
+    "Allah says: 'And give good tidings to the patient, who, when disaster strikes them, say, Indeed we "
+    "belong to Allah.' Patience is rewarded without measure."
+)
+
+
+def test_paraphrase_is_a_near_duplicate():
+    """A lightly reworded example is found; an unrelated one is not"""
+    index = NearDuplicateIndex()
+    index.add(PILLARS)
+
+    assert index.add(PATIENCE) == (1, [])
+    assert index.add(PILLARS_PARAPHRASE) == (2, [0])
+    assert [doc_id for doc_id, _ in index.query(PILLARS)] == [0, 2]
+
+
+def test_signature_is_stable():
+    """Signatures do not depend on the process (no randomized hashing)"""
+    first = NearDuplicateIndex().signature(PILLARS)
+
+    assert first == NearDuplicateIndex().signature(PILLARS)
+    assert len(first) == 128
+    assert NearDuplicateIndex().signature("Zakat") != NearDuplicateIndex().signature("Hajj")
+
+
+def test_clusters_merge_transitively():
+    """Incremental adds grow clusters, largest first"""
+    index = NearDuplicateIndex()
+    index.add_many([PILLARS, PATIENCE, PILLARS_PARAPHRASE])
+    assert index.clusters() == [[0, 2]]
+
+    index.add_many([PATIENCE + " Indeed.", PILLARS])
+    assert index.clusters() == [[0, 2, 4], [1, 3]]
+
+
+def test_example_text_uses_question_and_answer(tmp_path):
+    """Only the user and assistant turns are compared, not the shared system prompt"""
+    corpus = JsonlCorpus(tmp_path / "train.jsonl")
+    corpus.extend([{"messages": [
+        {"role": "system", "content": "You are an Islamic scholar assistant."},
+        {"role": "user", "content": "What is zakat?"},
+        {"role": "assistant", "content": "Obligatory charity."},
+    ]}])
+
+    assert example_text(corpus[0]) == "What is zakat? Obligatory charity."
+
+
+def test_banding_catches_pairs_at_the_threshold():
+    """Pairs at the similarity threshold become LSH candidates almost always"""
+    index = NearDuplicateIndex()
+    candidate = 1 - (1 - index.threshold ** index.rows) ** index.bands
+
+    assert candidate > 0.95
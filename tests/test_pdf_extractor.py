@@ -0,0 +1,125 @@
+"""
+Tests for page-parallel, streaming PDF text extraction
+"""
+
+from concurrent.futures import Future
+
+import pytest
+
+pytest.importorskip("pdfplumber")
+pytest.importorskip("PyPDF2")
+
+import pdf_extractor  # noqa: E402
+from pdf_extractor import extract_pdf_to_file, iter_pdf_pages  # noqa: E402
+
+
+def write_pdf(path, page_texts):
+    """Write a minimal PDF with one line of Helvetica text per page ("" for a blank page)"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in page_texts:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET" if text else ""
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append("<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792]"
+                       f" /Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    path.write_bytes(out)
+
+
+def test_pages_stream_in_order_across_processes(tmp_path):
+    """Pages come back in page order from several worker processes"""
+    pdf_path = tmp_path / "book.pdf"
+    texts = [f"Page number {i}" for i in range(12)]
+    write_pdf(pdf_path, texts)
+
+    progress = []
+    pages = list(iter_pdf_pages(pdf_path, workers=3, batch_size=2,
+                                progress=lambda done, total: progress.append((done, total))))
+
+    assert [number for number, _ in pages] == list(range(12))
+    assert [text.strip() for _, text in pages] == texts
+    assert progress[-1] == (12, 12)
+
+
+def test_extract_to_file_skips_blank_pages(tmp_path):
+    """Blank pages are counted but not written; text follows the header in order"""
+    pdf_path = tmp_path / "mixed.pdf"
+    write_pdf(pdf_path, ["First page", "", "Third page"])
+    output = tmp_path / "out.txt"
+
+    result = extract_pdf_to_file(pdf_path, output, header="HEADER\n", workers=1)
+
+    assert result['pages'] == 3
+    assert result['pages_with_text'] == 2
+    content = output.read_text(encoding='utf-8')
+    assert content.startswith("HEADER\n")
+    assert content.index("First page") < content.index("Third page")
+    assert result['chars'] == len(content) - len("HEADER\n")
+
+
+def test_pypdf2_fallback_for_failed_pages(tmp_path, monkeypatch):
+    """Pages pdfplumber fails on are extracted with PyPDF2; the others are not"""
+    pdf_path = tmp_path / "book.pdf"
+    write_pdf(pdf_path, ["Alpha page", "Beta page", "Gamma page"])
+    plumber_page_text = pdf_extractor._pdfplumber_page_text
+
+    def flaky(pdf, page_number):
+        if page_number == 1:
+            raise ValueError("broken content stream")
+        return plumber_page_text(pdf, page_number)
+
+    monkeypatch.setattr(pdf_extractor, "_pdfplumber_page_text", flaky)
+    pages = list(iter_pdf_pages(pdf_path, workers=1))
+
+    assert [text.strip() for _, text in pages] == ["Alpha page", "Beta page", "Gamma page"]
+
+
+def test_batches_in_flight_are_capped(tmp_path, monkeypatch):
+    """At most two batches per worker are submitted ahead of the consumer"""
+    pdf_path = tmp_path / "book.pdf"
+    write_pdf(pdf_path, [f"Page number {i}" for i in range(20)])
+    in_flight = []
+
+    class InlineExecutor:
+        """Runs batches at submit time and records how many are not yet consumed"""
+
+        def __init__(self, max_workers):
+            self.outstanding = 0
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def submit(self, fn, *args):
+            self.outstanding += 1
+            in_flight.append(self.outstanding)
+            future = Future()
+            future.set_result(fn(*args))
+            executor = self
+
+            def result(timeout=None, _result=future.result):
+                executor.outstanding -= 1
+                return _result(timeout)
+
+            future.result = result
+            return future
+
+    monkeypatch.setattr(pdf_extractor, "ProcessPoolExecutor", InlineExecutor)
+    pages = list(iter_pdf_pages(pdf_path, workers=2, batch_size=1))
+
+    assert [number for number, _ in pages] == list(range(20))
+    assert max(in_flight) == 4
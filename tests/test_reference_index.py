@@ -0,0 +1,102 @@
+"""
+Tests for citation parsing and the reference index
+"""
+
+from reference_index import (
+    AYAH_COUNTS, TOTAL_AYAT, ReferenceIndex, citation_key, format_citation, key_citation,
+    parse_citations, parse_reference,
+)
+
+
+def make_example(question, answer, citation):
+    return {"messages": [
+        {"role": "system", "content": "You are an Islamic scholar assistant."},
+        {"role": "user", "content": question},
+        {"role": "assistant", "content": f"{answer}\n\n**Reference:** {citation}"},
+    ], "category": "General"}
+
+
+def test_parse_normalizes_quran_and_hadith_citations():
+    text = ("Quran 2:255 and Surah Al-Baqarah 2:155-157; see also (Al-Imran 3:18). "
+            "Sahih al-Bukhari 1, Sunan Abu Dawood 4607, Jami at-Tirmidhi 2516, Bukhari, Book 2, Hadith 8. "
+            "Al-Bukhari (520) and Muslim (82) narrated it.")
+
+    assert [format_citation(c) for c in parse_citations(text)] == [
+        "Quran 2:255", "Quran 2:155", "Quran 2:156", "Quran 2:157", "Quran 3:18",
+        "Sahih al-Bukhari 1", "Sunan Abu Dawud 4607", "Jami at-Tirmidhi 2516", "Sahih al-Bukhari 8",
+        "Sahih al-Bukhari 520", "Sahih Muslim 82",
+    ]
+
+
+def test_parse_accepts_square_bracket_citations():
+    text = "there is no blame upon you for shortening the prayer [al-Nisa 4:101]. See also [2:255]."
+    assert [format_citation(c) for c in parse_citations(text)] == ["Quran 4:101", "Quran 2:255"]
+
+
+def test_parse_ignores_times_plain_words_and_invalid_verses():
+    text = "We met at 10:30, the score was 3:1, every Muslim 5 times a day, Quran 2:999 and Surah 115:1."
+    assert parse_citations(text) == []
+
+
+def test_keys_round_trip():
+    assert sum(AYAH_COUNTS) == TOTAL_AYAT == 6236
+    for citation in [("quran", 1, 1), ("quran", 2, 255), ("quran", 114, 6), ("muslim", 2564, 0)]:
+        assert key_citation(citation_key(citation)) == citation
+    assert citation_key(("quran", 114, 6)) == TOTAL_AYAT - 1
+
+
+def test_lookup_and_coverage():
+    index = ReferenceIndex()
+    index.add_example(make_example("What is Ayat al-Kursi?", "The throne verse.", "Quran 2:255"), "train.jsonl", 1)
+    index.add_example(make_example("Patience?", "Give good tidings to the patient.", "Quran 2:155-157"), "train.jsonl", 2)
+    index.add_example(make_example("Intentions?", "Deeds are by intentions.", "Sahih al-Bukhari 1"), "train.jsonl", 3)
+    index.add("Ayat al-Kursi (2:255) is the greatest verse.", "scraped.txt", "https://example.org/kursi")
+
+    assert index.documents_citing("2:255") == [("train.jsonl", 1), ("scraped.txt", "https://example.org/kursi")]
+    assert index.documents_citing("Quran 2:156-160") == [("train.jsonl", 2)]
+    assert index.documents_citing("Bukhari 1") == [("train.jsonl", 3)]
+    assert index.documents_citing("Sahih Muslim 1") == []
+    assert parse_reference("not a reference") == []
+
+    coverage = index.coverage()
+    assert coverage["quran"]["distinct"] == 4
+    assert coverage["quran"]["citations"] == 5
+    assert coverage["bukhari"]["distinct"] == 1
+    assert index.surah_coverage()[1] == (2, 4, 286)
+    assert index.most_cited(1) == [(("quran", 2, 255), 2)]
+
+
+def test_text_files_are_reindexed_and_removed(tmp_path):
+    scraped = tmp_path / "scraped"
+    scraped.mkdir()
+    page = scraped / "scraped_example.txt"
+    page.write_text("URL: https://example.org/a\n---\nSee Quran 2:255.\n\n" + "=" * 80 +
+                    "\n\nURL: https://example.org/b\n---\nSahih Muslim 2564.\n", encoding="utf-8")
+    index = ReferenceIndex()
+    index.add("Quran 2:255", "train.jsonl", 1)
+
+    index.sync_directory(scraped)
+    assert index.documents_citing("2:255") == [("train.jsonl", 1), ("scraped_example.txt", "https://example.org/a")]
+    assert index.documents_citing("Sahih Muslim 2564") == [("scraped_example.txt", "https://example.org/b")]
+
+    page.unlink()
+    index.sync_directory(scraped)
+    assert index.documents_citing("2:255") == [("train.jsonl", 1)]
+    assert index.coverage()["muslim"]["distinct"] == 0
+    assert len(index) == 1
+
+
+def test_reindexing_reclaims_removed_documents():
+    index = ReferenceIndex()
+    index.add("Sahih al-Bukhari 1", "scraped.txt", "https://example.org")
+    for _ in range(5):
+        index.remove_origin("train.jsonl")
+        for i in range(100):
+            index.add(f"Quran 2:255 and Quran 2:{i + 1}", "train.jsonl", i + 1)
+
+    assert len(index) == 101
+    assert len(index._documents) <= 2 * len(index)
+    assert index.documents_citing("Bukhari 1") == [("scraped.txt", "https://example.org")]
+    assert len(index.documents_citing("2:255")) == 100
+    assert index.citations_of("train.jsonl", 3) == [("quran", 2, 3), ("quran", 2, 255)]
+    assert index.coverage()["quran"]["citations"] == 200
@@ -0,0 +1,131 @@
+"""
+Tests for the incremental BM25 retrieval index
+"""
+
+import json
+
+import pytest
+
+from jsonl_store import append_jsonl
+from retrieval_index import RetrievalIndex, example_passage, tokenize
+
+
+def make_example(question, answer, citation):
+    return {"messages": [
+        {"role": "system", "content": "You are an Islamic scholar assistant."},
+        {"role": "user", "content": question},
+        {"role": "assistant", "content": f"{answer}\n\n**Reference:** {citation}"},
+    ], "category": "General"}
+
+
+ZAKAT = make_example("What is zakat?", "Zakat is obligatory charity on savings.", "Quran 2:43")
+HAJJ = make_example("What is hajj?", "Hajj is the pilgrimage to Mecca.", "Quran 3:97")
+PRAYER = make_example("How many daily prayers are there?", "Five daily prayers are obligatory.", "Sahih al-Bukhari 349")
+
+SCRAPED = """
+
+================================================================================
+
+URL: https://example.org/fasting
+Scraped: 2025-06-27 00:10:07
+Content Length: 120 characters
+
+---
+
+Title: Fasting in Ramadan
+
+Fasting in Ramadan is obligatory for every adult Muslim. The fast lasts from dawn until sunset.
+"""
+
+
+def test_tokenize_keeps_verse_numbers():
+    assert tokenize("What does the Quran say in 2:255?") == ["quran", "say", "2:255"]
+
+
+def test_example_passage_splits_citation():
+    passage = example_passage(PRAYER)
+    assert passage == {"text": "Q: How many daily prayers are there?\nA: Five daily prayers are obligatory.",
+                       "source": "Sahih al-Bukhari", "reference": "349"}
+
+
+def test_search_ranks_training_and_scraped_passages(tmp_path):
+    train = tmp_path / "train.jsonl"
+    append_jsonl(train, [ZAKAT, HAJJ, PRAYER])
+    scraped = tmp_path / "scraped"
+    scraped.mkdir()
+    (scraped / "scraped_example_org.txt").write_text(SCRAPED, encoding="utf-8")
+
+    index = RetrievalIndex(tmp_path / "retrieval.sqlite")
+    index.watch_jsonl(train)
+    index.watch_directory(scraped)
+
+    top = index.search("pilgrimage to Mecca", k=2)
+    assert (top[0]["source"], top[0]["reference"]) == ("Quran", "3:97")
+
+    top = index.search("When does the Ramadan fast end?", k=1)
+    assert top[0]["source"] == "https://example.org/fasting"
+    assert top[0]["reference"] == "Fasting in Ramadan"
+    assert top[0]["origin"] == "scraped_example_org.txt"
+    index.close()
+
+
+def test_appends_are_indexed_incrementally(tmp_path):
+    train = tmp_path / "train.jsonl"
+    append_jsonl(train, [ZAKAT, HAJJ])
+    index = RetrievalIndex(tmp_path / "retrieval.sqlite")
+
+    assert index.sync_jsonl(train) == 2
+    assert index.sync_jsonl(train) == 0
+    append_jsonl(train, [PRAYER])
+    assert index.sync_jsonl(train) == 1
+    assert len(index) == 3
+
+    # A rewrite (e.g. after cleaning) replaces the file's passages
+    tmp = tmp_path / "rewritten.jsonl"
+    tmp.write_text(json.dumps(PRAYER) + "\n", encoding="utf-8")
+    tmp.replace(train)
+    assert index.sync_jsonl(train) == 1
+    assert len(index) == 1
+    assert index.search("zakat charity", refresh=False) == []
+    index.close()
+
+    # Postings are rebuilt from the database on reopen
+    reopened = RetrievalIndex(tmp_path / "retrieval.sqlite")
+    assert len(reopened) == 1
+    assert reopened.sync_jsonl(train) == 0
+    reopened.close()
+
+
+def test_deleted_text_files_are_dropped(tmp_path):
+    scraped = tmp_path / "scraped"
+    scraped.mkdir()
+    page = scraped / "page.txt"
+    page.write_text(SCRAPED, encoding="utf-8")
+    index = RetrievalIndex(tmp_path / "retrieval.sqlite")
+
+    assert index.sync_directory(scraped) == 1
+    page.unlink()
+    index.sync_directory(scraped)
+    assert len(index) == 0
+    index.close()
+
+
+class BagOfWordsEmbedder:
+    """Deterministic stand-in for a sentence embedding model"""
+    name = "bag-of-words"
+    vocabulary = ["charity", "pilgrimage", "prayers", "zakat", "hajj", "mecca"]
+
+    def encode(self, texts):
+        return [[float(word in text.lower()) for word in self.vocabulary] for text in texts]
+
+
+def test_dense_ranking_is_fused(tmp_path):
+    pytest.importorskip("numpy")
+    train = tmp_path / "train.jsonl"
+    append_jsonl(train, [ZAKAT, HAJJ, PRAYER])
+    index = RetrievalIndex(tmp_path / "retrieval.sqlite", embedder=BagOfWordsEmbedder())
+    index.watch_jsonl(train)
+
+    # BM25 and the embedding both rank the hajj example first
+    assert index.search("journey to mecca", k=1)[0]["reference"] == "3:97"
+    index.close()
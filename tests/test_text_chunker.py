@@ -0,0 +1,92 @@
+"""
+Tests for the token-budgeted text chunker
+"""
+
+import pytest
+
+from text_chunker import TextChunker
+
+
+def word_count(text):
+    """Deterministic tokenizer for tests: one token per word"""
+    return len(text.split())
+
+
+def test_chunks_respect_budget_and_sentence_boundaries():
+    """No chunk exceeds the budget and every chunk ends a sentence"""
+    text = " ".join(f"Sentence number {i} is here." for i in range(50))
+    chunker = TextChunker(max_tokens=20, overlap_tokens=0, count_tokens=word_count)
+
+    chunks = chunker.split(text)
+
+    assert all(word_count(chunk) <= 20 for chunk in chunks)
+    assert all(chunk.endswith("here.") for chunk in chunks)
+    assert " ".join(chunks) == text
+
+
+def test_overlap_repeats_trailing_sentences():
+    """The next chunk starts with the last sentences of the previous one"""
+    text = " ".join(f"S{i} a b c." for i in range(10))
+    chunker = TextChunker(max_tokens=12, overlap_tokens=4, count_tokens=word_count)
+
+    chunks = chunker.split(text)
+
+    for previous, current in zip(chunks, chunks[1:]):
+        last_sentence = previous.rsplit(" S", 1)[-1]
+        assert current.startswith("S" + last_sentence.lstrip("S"))
+
+
+def test_paragraph_break_preferred_once_chunk_is_full_enough():
+    """A chunk past min_fill is closed at the next paragraph break"""
+    text = "One two three four five six seven eight.\n\nNine ten."
+    chunker = TextChunker(max_tokens=20, overlap_tokens=0, min_fill=0.3, count_tokens=word_count)
+
+    assert chunker.split(text) == ["One two three four five six seven eight.", "Nine ten."]
+
+
+def test_quran_verse_boundaries_split_sentences():
+    """Inline verse references and ayah markers end a segment"""
+    text = "In the name of Allah (1:1) All praise is due to Allah ﴿٢﴾ The Most Merciful"
+    chunker = TextChunker(max_tokens=8, overlap_tokens=0, count_tokens=word_count)
+
+    assert chunker.split(text) == [
+        "In the name of Allah (1:1)",
+        "All praise is due to Allah ﴿٢﴾",
+        "The Most Merciful",
+    ]
+
+
+def test_oversized_sentence_is_split_on_words():
+    """A single sentence longer than the budget is split on words"""
+    text = " ".join(["word"] * 25)
+    chunker = TextChunker(max_tokens=10, overlap_tokens=0, count_tokens=word_count)
+
+    assert [word_count(c) for c in chunker.split(text)] == [10, 10, 5]
+
+
+def test_streamed_pieces_match_whole_text():
+    """Feeding text in small pieces gives the same chunks as one string"""
+    text = "\n\n".join(f"Paragraph {i}. It has two sentences." for i in range(30))
+    chunker = TextChunker(max_tokens=15, overlap_tokens=3, count_tokens=word_count)
+
+    pieces = [text[i:i + 7] for i in range(0, len(text), 7)]
+    assert chunker.split(pieces) == chunker.split(text)
+
+
+def test_overlap_must_be_smaller_than_budget():
+    """Misconfigured overlap is rejected"""
+    with pytest.raises(ValueError):
+        TextChunker(max_tokens=10, overlap_tokens=10)
+
+
+def test_streamed_pieces_split_paragraphs_like_one_string():
+    """Paragraph breaks split across pieces are found; long paragraphs stream in linear time"""
+    text = "First paragraph here.\n \nSecond one.\n\n\nThird."
+    chunker = TextChunker(max_tokens=3, overlap_tokens=0, count_tokens=word_count)
+    pieces = [text[i:i + 3] for i in range(0, len(text), 3)]
+
+    assert list(chunker._iter_paragraphs(pieces)) == list(chunker._iter_paragraphs(text))
+    assert [p.strip() for p in chunker._iter_paragraphs(pieces)] == ["First paragraph here.", "Second one.", "Third."]
+
+    long_pieces = ("word " for _ in range(200000))
+    assert len(list(chunker._iter_paragraphs(long_pieces))) == 1
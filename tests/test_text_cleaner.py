@@ -0,0 +1,29 @@
+from text_cleaner import clean_text, clean_texts
+
+
+def test_whitespace_and_boilerplate():
+    assert clean_text("  Subscribe to our\n\n\tNewsletter  ") == "to our"
+    assert clean_text("Read more. Download the App now") == "Read more.  now"
+    assert clean_text("copyright 2024. all rights RESERVED") == ""
+    assert clean_text("") == "" and clean_text(None) == ""
+
+
+def test_batch_matches_one_by_one():
+    texts = [
+        "  The Prophet\n said:  ",
+        "Download our",
+        "App and Follow us on Twitter",
+        "",
+        "İstanbul Privacy Policy",
+    ]
+
+    assert clean_texts(texts) == [clean_text(text) for text in texts]
+    # A span pattern never joins two elements
+    assert clean_texts(texts)[1] == "Download our"
+
+
+def test_batch_with_separator_in_text():
+    texts = ["a\x00b  c", "Cookie Policy d"]
+
+    assert clean_texts(texts) == [clean_text(text) for text in texts]
+    assert clean_texts([]) == []
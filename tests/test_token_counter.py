@@ -0,0 +1,50 @@
+"""
+Tests for chat token accounting and the fine-tuning cost estimate
+"""
+
+import token_counter
+from token_counter import (ExampleTokenCounter, TOKENS_PER_CONVERSATION, TOKENS_PER_MESSAGE,
+                           count_message_tokens, count_tokens, training_cost)
+
+MESSAGES = [
+    {"role": "system", "content": "You are an Islamic scholar assistant."},
+    {"role": "user", "content": "ما هي أركان الإسلام؟"},
+    {"role": "assistant", "content": "The five pillars are Shahada, Salah, Zakat, Sawm and Hajj."},
+]
+
+
+def test_chat_overhead_is_counted():
+    """Per-message and per-conversation overhead is added to the content tokens"""
+    expected = TOKENS_PER_CONVERSATION + sum(
+        TOKENS_PER_MESSAGE + count_tokens(m["role"]) + count_tokens(m["content"]) for m in MESSAGES
+    )
+
+    assert count_message_tokens(MESSAGES) == expected
+
+
+def test_training_cost_per_epoch():
+    """Cost scales with epochs; unknown models have no price"""
+    assert training_cost(2_000_000) == 6.0
+    assert training_cost(2_000_000, epochs=3) == 18.0
+    assert training_cost(1_000, model="unknown-model") is None
+
+
+def test_counts_are_cached_per_example(tmp_path, monkeypatch):
+    """Counts are stored per example and reused by a new counter"""
+    examples = [{"messages": MESSAGES}, {"messages": MESSAGES[:2]}]
+    counter = ExampleTokenCounter(tmp_path / "counts.sqlite")
+    first = counter.count_corpus(examples)
+    assert counter.misses == 2
+
+    # A new process reuses the stored counts and only tokenizes new examples
+    calls = []
+    original = token_counter.count_message_tokens
+    monkeypatch.setattr(token_counter, "count_message_tokens",
+                        lambda messages, name: calls.append(messages) or original(messages, name))
+    reopened = ExampleTokenCounter(tmp_path / "counts.sqlite")
+    again = reopened.count_corpus(examples + [{"messages": MESSAGES[1:]}])
+
+    assert calls == [MESSAGES[1:]]
+    assert reopened.hits == 2 and reopened.misses == 1
+    assert again["tokens"] == first["tokens"] + count_message_tokens(MESSAGES[1:])
+    assert again["max_tokens"] == count_message_tokens(MESSAGES)